@@ -0,0 +1,110 @@
+"""
+Several boards driven concurrently from one asyncio loop.
+
+Each FpgaStandIn (benchmarks/fpga_standin.py) paces its output at 115200
+baud like the real board. Every board runs the same script through
+AsyncDevice (stats, fetch, input, calc); the run is timed with the boards
+handled one after another and all at once, and the thread cost per port is
+compared with the threaded SerialManager.
+
+    cd client
+    python -m benchmarks.bench_async_device [--boards 8]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from modules.async_device import AsyncDevice
+from modules.protocol import OP_ADD, OP_MUL, OP_TRANSPOSE
+from modules.serial_manager import SerialManager
+from benchmarks.fpga_standin import FpgaStandIn
+
+ROUNDS = 5
+
+
+async def session(board):
+    """One board: browse in display mode, store a matrix, run calculations."""
+    exchanges = 0
+    async with AsyncDevice(board.url) as dev:
+        # Opening the port flushes anything printed before, so flip the
+        # mode switches once connected, as on the real board
+        board.set_mode("dis")
+        await dev.wait_mode("dis", timeout=2)
+        for _ in range(ROUNDS):
+            _, counts = await dev.stats()
+            for (m, n) in counts:
+                await dev.fetch(m, n)
+                exchanges += 1
+            exchanges += 1
+
+        board.set_mode("inp")
+        await dev.wait_mode("inp", timeout=2)
+        stored = await dev.input_matrix([[1, 2], [3, 4]])
+        exchanges += 1
+
+        board.set_mode("cal")
+        await dev.wait_mode("cal", timeout=2)
+        for _ in range(ROUNDS):
+            res = await dev.calc(OP_ADD, stored, stored)
+            assert res.rows[0].split() == ["2", "4"], res
+            await dev.calc(OP_MUL, stored, stored)
+            await dev.calc(OP_TRANSPOSE, stored)
+            exchanges += 3
+    return exchanges
+
+
+async def run(boards, concurrent):
+    t0 = time.perf_counter()
+    if concurrent:
+        counts = await asyncio.gather(*(session(b) for b in boards))
+    else:
+        counts = [await session(b) for b in boards]
+    return time.perf_counter() - t0, sum(counts)
+
+
+async def async_threads(boards):
+    before = threading.active_count()
+    devs = [await AsyncDevice(b.url).open() for b in boards]
+    delta = threading.active_count() - before
+    for dev in devs:
+        await dev.close()
+    return delta
+
+
+def manager_threads(boards):
+    before = threading.active_count()
+    mgrs = []
+    for b in boards:
+        mgr = SerialManager(lambda line: None, lambda connected, msg: None)
+        mgr.connect(b.url, 115200)
+        mgrs.append(mgr)
+    delta = threading.active_count() - before
+    for mgr in mgrs:
+        mgr.disconnect()
+    return delta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boards", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'schedule':<12} {'boards':>6} {'exchanges':>10} {'wall s':>8} {'exch/s':>8}")
+    for concurrent in (False, True):
+        boards = [FpgaStandIn(mode="dis", seed=i) for i in range(args.boards)]
+        wall, exchanges = asyncio.run(run(boards, concurrent))
+        label = "one loop" if concurrent else "sequential"
+        print(f"{label:<12} {len(boards):>6} {exchanges:>10} {wall:8.2f} {exchanges / wall:8.1f}")
+        for b in boards:
+            b.close()
+
+    boards = [FpgaStandIn(mode="dis", seed=i) for i in range(args.boards)]
+    print(f"\nthreads for {len(boards)} ports: AsyncDevice {asyncio.run(async_threads(boards))}, "
+          f"SerialManager {manager_threads(boards)}")
+    for b in boards:
+        b.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Several programs sharing one board through DeviceDaemon.
+
+An FpgaStandIn (display mode, dropping bytes while it prints, like the
+board) is served by a daemon on a temporary socket. Control clients browse
+the board concurrently (stats, then every stored size) and check each
+matrix against the stand-in's storage ("bad" counts mismatches); a raw
+daemon:// SerialManager (what the GUIs use) re-prints the table every
+200 ms, and a monitor counts the lines fanned out to it. The single-client
+run is the ceiling the shared runs are compared with.
+
+    cd client
+    python -m benchmarks.bench_daemon
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from modules.device_daemon import ROLE_MONITOR, DaemonClient, DeviceDaemon
+from modules.protocol import parse_row
+from modules.serial_manager import SerialManager
+from benchmarks.fpga_standin import FpgaStandIn
+
+ROUNDS = 6
+SIZES = ((1, 1), (1, 3), (2, 2), (2, 3), (3, 3), (4, 4), (5, 5))
+
+
+def start_daemon(board, path):
+    daemon = DeviceDaemon(board.url, socket_path=path)
+    thread = threading.Thread(target=asyncio.run, args=(daemon.serve(),), daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + 5
+    while not os.path.exists(path) and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return daemon, thread
+
+
+def browse(path, board, latencies, errors):
+    with DaemonClient(path) as client:
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            _, counts = client.stats()
+            latencies.append(time.perf_counter() - t0)
+            for (m, n), cnt in counts.items():
+                t0 = time.perf_counter()
+                for mat in client.fetch(m, n, cnt):
+                    if [parse_row(line) for line in mat.lines] != board._lookup(mat.id):
+                        errors.append(mat.id)
+                latencies.append(time.perf_counter() - t0)
+
+
+def run(n_clients, with_raw):
+    board = FpgaStandIn(mode="dis", preload=SIZES)
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    daemon, thread = start_daemon(board, path)
+
+    events = {"rx": 0, "tx": 0}
+
+    def count(msg):
+        for key in events:
+            if key in msg:
+                events[key] += 1
+
+    monitor = DaemonClient(path, ROLE_MONITOR, on_event=count)
+    raw = None
+    if with_raw:
+        raw = SerialManager(lambda line: None, lambda connected, msg: None)
+        raw.connect("daemon://" + path, 115200)
+
+    latencies = []
+    errors = []
+    workers = [threading.Thread(target=browse, args=(path, board, latencies, errors)) for _ in range(n_clients)]
+    busy0 = board.busy_seconds
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    raw_sent = 0
+    while any(w.is_alive() for w in workers):
+        if raw:
+            raw.send_bytes(bytes([0, 0]))
+            raw_sent += 1
+        time.sleep(0.2)
+    wall = time.perf_counter() - t0
+    busy = board.busy_seconds - busy0
+    time.sleep(0.1)
+
+    if raw:
+        raw.disconnect()
+    monitor.close()
+    daemon.stop()
+    thread.join(2)
+    board.close()
+    lat = sorted(latencies)
+    return {
+        "exchanges": len(lat),
+        "wall": wall,
+        "util": busy / wall * 100,
+        "p50": statistics.median(lat) * 1000,
+        "p95": lat[int(len(lat) * 0.95)] * 1000,
+        "errors": len(errors),
+        "raw": raw_sent if raw else "-",
+        "monitor": events["rx"],
+        "dropped": board.dropped,
+    }
+
+
+def main():
+    print(f"{'setup':<28} {'exch':>5} {'exch/s':>7} {'util %':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'bad':>4} {'raw sends':>10} {'mon rx':>7} {'dropped':>8}")
+    for label, n_clients, with_raw in (
+        ("1 control client", 1, False),
+        ("3 control clients", 3, False),
+        ("3 control + raw (GUI)", 3, True),
+    ):
+        r = run(n_clients, with_raw)
+        print(f"{label:<28} {r['exchanges']:>5} {r['exchanges'] / r['wall']:7.1f} {r['util']:7.1f} "
+              f"{r['p50']:7.1f} {r['p95']:7.1f} {r['errors']:>4} {r['raw']:>10} {r['monitor']:>7} {r['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
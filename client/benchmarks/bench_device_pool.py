@@ -0,0 +1,85 @@
+"""
+Sharding calculation jobs across several boards with DevicePool.
+
+Every board is an FpgaStandIn on its own pty; one of them runs at a third
+of the baud rate to stand in for a slower link. The pool first scans the
+boards in display mode, stores the same operands on all of them in input
+mode, then runs a batch of mixed calculations in calc mode and checks every
+result. Runs: one board, four boards with static queues, and four boards
+with work stealing.
+
+    cd client
+    python -m benchmarks.bench_device_pool
+"""
+import asyncio
+import random
+import time
+
+from modules.device_pool import DevicePool
+from modules.protocol import parse_row
+from benchmarks.fpga_standin import FpgaStandIn
+
+JOBS = 48
+SLOW_BAUD = 38400
+
+
+def make_jobs(rng):
+    mats = {size: [[rng.randint(-9, 9) for _ in range(size[1])] for _ in range(size[0])]
+            for size in ((2, 2), (2, 3), (3, 2), (3, 3))}
+    ops = [
+        ("add", mats[(2, 2)], mats[(2, 2)]),
+        ("mul", mats[(2, 3)], mats[(3, 2)]),
+        ("transpose", mats[(2, 3)], None),
+        ("scalar", mats[(3, 3)], None),
+        ("mul", mats[(3, 3)], mats[(3, 3)]),
+    ]
+    return list(mats.values()), [ops[i % len(ops)] for i in range(JOBS)]
+
+
+async def run(n_boards, stealing):
+    boards = [FpgaStandIn(mode="dis", baud=SLOW_BAUD if i == n_boards - 1 and n_boards > 1 else 115200)
+              for i in range(n_boards)]
+    operands, jobs = make_jobs(random.Random(7))
+    async with DevicePool([b.url for b in boards], work_stealing=stealing) as pool:
+        for b in boards:
+            b.set_mode("dis")
+        await pool.wait_mode("dis", timeout=5)
+        await pool.scan()
+        for b in boards:
+            b.set_mode("inp")
+        await pool.wait_mode("inp", timeout=5)
+        for rows in operands:
+            await pool.broadcast_input(rows)
+        for b in boards:
+            b.set_mode("cal")
+        await pool.wait_mode("cal", timeout=5)
+
+        pool.reset_stats()
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(pool.submit_calc(*job) for job in jobs), return_exceptions=True)
+        wall = time.perf_counter() - t0
+        report = pool.report()
+
+    bad = 0
+    for (op, a, b), result in zip(jobs, results):
+        code = {"add": "A", "mul": "B", "scalar": "C", "transpose": "T"}[op]
+        if isinstance(result, Exception) or [parse_row(r) for r in result.rows] != boards[0]._compute(code, a, b):
+            bad += 1
+    for b in boards:
+        b.close()
+    return wall, bad, report
+
+
+def main():
+    base = None
+    for label, n, stealing in (("1 board", 1, True), ("4 boards, static queues", 4, False),
+                               ("4 boards, work stealing", 4, True)):
+        wall, bad, report = asyncio.run(run(n, stealing))
+        base = base or wall
+        print(f"{label}: {wall:.2f} s, {JOBS / wall:.1f} calcs/s, speed-up x{base / wall:.2f}, {bad} wrong")
+        print(report)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+How long the serial line stays drained while the UI is slow.
+
+A pty stands in for the board and writes a burst of matrix rows as fast as
+the kernel lets it; the line handler sleeps to emulate Flet work per line.
+With the old inline dispatch the reader thread stalls inside the handler, the
+pty buffer fills and the writer blocks (on real hardware: UART overrun). With
+the dispatch queue the reader keeps draining and the backlog sits in the
+queue instead.
+
+    cd client
+    python -m benchmarks.bench_dispatch_queue
+"""
+import os
+import threading
+import time
+import tty
+
+from modules.serial_manager import SerialManager
+from modules.dispatch_queue import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST
+
+LINES = 2000
+UI_COST = 0.0005  # seconds of "UI work" per line
+
+
+class InlineSerialManager(SerialManager):
+    """Pre-queue behaviour: parsers and UI run on the read thread."""
+    def _process_buffer(self, raw_data):
+        for line in self.framer.feed(raw_data):
+            line = line.strip()
+            if line:
+                self.on_data_received(line.decode("utf-8", errors="replace"))
+
+
+def run(cls, **kwargs):
+    master, slave = os.openpty()
+    tty.setraw(master)
+    done = threading.Event()
+    received = [0]
+
+    def on_line(line):
+        time.sleep(UI_COST)
+        received[0] += 1
+        if line == "END":
+            done.set()
+
+    mgr = cls(on_line, lambda connected, msg: None, **kwargs)
+    mgr.connect(os.ttyname(slave), 115200)
+    payload = b"".join(b"%-5d%-5d%-5d%-5d%-5d\n" % (i, i, i, i, i) for i in range(LINES)) + b"END\n"
+
+    t0 = time.perf_counter()
+    view = memoryview(payload)
+    while view:
+        n = os.write(master, view)
+        view = view[n:]
+    drained = time.perf_counter() - t0
+    # END itself may be dropped by the drop policies: also stop once the
+    # queue is empty and every dequeued line has been handled.
+    while not done.wait(0.01):
+        s = mgr.queue_stats()
+        if s["depth"] == 0 and s["dispatched"] == received[0]:
+            break
+    total = time.perf_counter() - t0
+    stats = mgr.queue_stats()
+    mgr.disconnect()
+    os.close(master)
+    os.close(slave)
+    return drained, total, received[0], stats
+
+
+def main():
+    print(f"{'dispatch':<22} {'line drained ms':>16} {'all handled ms':>15} {'handled':>8} {'max depth':>10} {'dropped':>8}")
+    d, t, n, _ = run(InlineSerialManager)
+    print(f"{'inline (old)':<22} {d * 1000:16.1f} {t * 1000:15.1f} {n:>8} {'-':>10} {'-':>8}")
+    for policy, size in ((OVERFLOW_BLOCK, 4096), (OVERFLOW_BLOCK, 256), (OVERFLOW_DROP_OLDEST, 256), (OVERFLOW_DROP_NEWEST, 256)):
+        d, t, n, s = run(SerialManager, queue_size=size, overflow_policy=policy)
+        label = f"queue {policy}/{size}"
+        print(f"{label:<22} {d * 1000:16.1f} {t * 1000:15.1f} {n:>8} {s['max_depth']:>10} {s['dropped']:>8}")
+
+
+if __name__ == "__main__":
+    main()
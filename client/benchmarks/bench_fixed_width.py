@@ -0,0 +1,107 @@
+"""
+Decoding large synthetic dumps into ints: per-line parsing vs one
+fixed-width pass (modules/fixed_width.py).
+
+- rows: matrix rows as the board prints them (NORM_WIDTH columns, values
+  -128..127, lines stripped by the framer), one block per size 1..5
+  columns. Per line: parse_row (split + int) and a \\-?\\d+ regex; whole
+  block: decode_rows.
+- scan: a device pool scan's StoredMatrix list of one size, as
+  BoardStorage.load() gets it; parse_row per line of each matrix against
+  decode_matrices.
+- fallback: 5-column rows where 1% have a value too wide for its column,
+  which decode_rows redoes the tolerant way.
+
+The decoders are timed to their int arrays; every method must return the
+same numbers (checked after timing, via tolist()).
+
+    cd client
+    python -m benchmarks.bench_fixed_width
+"""
+import random
+import re
+import time
+
+from modules.fixed_width import decode_matrices, decode_rows
+from modules.protocol import StoredMatrix, parse_row
+from benchmarks.fpga_standin import fmt_rows
+
+ROWS = 200_000
+MATRICES = 20_000
+NUM_RE = re.compile(r"-?\d+")
+
+
+def tolists(out):
+    if isinstance(out, tuple):
+        return tuple(tolists(v) for v in out)
+    return out.tolist() if hasattr(out, "tolist") else out
+
+
+def best(fn, repeat=3):
+    result = None
+    wall = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        t = time.perf_counter() - t0
+        wall = t if wall is None else min(wall, t)
+    return wall, result
+
+
+def row_dump(rng, rows, cols):
+    values = [[rng.randint(-128, 127) for _ in range(cols)] for _ in range(rows)]
+    return [line.strip() for line in fmt_rows(values).split("\n")[:-1]], values
+
+
+def scan_dump(rng, count, rows, cols):
+    mats, values = [], []
+    for k in range(count):
+        text, mat = row_dump(rng, rows, cols)
+        mats.append(StoredMatrix(k, rows, cols, text))
+        values.append(mat)
+    return mats, values
+
+
+def report(label, count, unit, results):
+    base = results[0][1]
+    for name, wall, ok in results:
+        print(f"{label:<10} {name:<15} {count:>8} {unit:<6} {wall * 1000:9.1f} ms "
+              f"{count / wall / 1e6:7.2f} M{unit}/s  x{base / wall:5.1f}  {'ok' if ok else 'MISMATCH'}")
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'dump':<10} {'method':<15} {'count':>8} {'':<6} {'time':>12} {'rate':>14} {'speed':>6}")
+
+    for cols in (1, 3, 5):
+        lines, values = row_dump(rng, ROWS, cols)
+        results = []
+        for name, fn in (("parse_row", lambda: [parse_row(line) for line in lines]),
+                         ("regex", lambda: [[int(v) for v in NUM_RE.findall(line)] for line in lines]),
+                         ("decode_rows", lambda: decode_rows(lines, cols))):
+            wall, out = best(fn)
+            results.append((name, wall, tolists(out) == values))
+        report(f"rows x{cols}", ROWS, "rows", results)
+
+    mats, values = scan_dump(rng, MATRICES, 5, 5)
+    results = []
+    for name, fn in (("per line", lambda: [[parse_row(line) for line in mat.lines] for mat in mats]),
+                     ("decode_matrices", lambda: decode_matrices(mats))):
+        wall, out = best(fn)
+        results.append((name, wall, tolists(out) == values))
+    report("scan 5x5", MATRICES, "mats", results)
+
+    lines, values = row_dump(rng, ROWS, 5)
+    for i in range(0, ROWS, 100):
+        lines[i] = lines[i][:20] + "12345"
+        values[i][4] = 12345
+    results = []
+    for name, fn in (("parse_row", lambda: [parse_row(line) for line in lines]),
+                     ("decode_rows", lambda: decode_rows(lines, 5))):
+        wall, out = best(fn)
+        results.append((name, wall, tolists(out) == values))
+    report("fallback", ROWS, "rows", results)
+
+
+if __name__ == "__main__":
+    main()
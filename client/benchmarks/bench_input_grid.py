@@ -0,0 +1,89 @@
+"""
+Resizing the input grid: the old set_dimensions() (a new TextField per
+cell on every resize) vs the pooled MatrixInputGrid, on a headless Flet
+page (benchmarks/flet_headless.py).
+
+Each step is one resize as the rows/cols fields' on_change produces it
+while typing: stepping through every size, growing by one row, and
+retyping the same size. Timings include Flet's diff and JSON encoding;
+"kB" is what would go to the Flutter client, which also has to lay out
+every new TextField. On a remote session that is the part the user waits
+for.
+
+    cd client
+    python -m benchmarks.bench_input_grid
+"""
+import time
+
+import flet as ft
+
+from modules.ui_components import MatrixInputGrid
+from benchmarks.flet_headless import headless_page
+
+ROUNDS = 20
+
+
+class LegacyGrid(ft.Column):
+    def __init__(self):
+        super().__init__()
+        self.inputs = []
+        self.grid_col = ft.Column(spacing=5)
+        self.controls = [self.grid_col]
+
+    def set_dimensions(self, r, c):
+        self.inputs = []
+        self.grid_col.controls.clear()
+        for i in range(r):
+            row_inputs = []
+            for j in range(c):
+                row_inputs.append(ft.TextField(
+                    value="0", width=50, text_align=ft.TextAlign.CENTER, text_size=14, content_padding=10,
+                    border_radius=4, bgcolor=ft.Colors.SURFACE, border_color=ft.Colors.OUTLINE,
+                    focused_border_color=ft.Colors.PRIMARY
+                ))
+            self.inputs.append(row_inputs)
+            self.grid_col.controls.append(ft.Row(row_inputs, alignment=ft.MainAxisAlignment.CENTER))
+        if self.page:
+            self.update()
+
+
+SCENARIOS = {
+    "every size": [(r, c) for r in range(1, 6) for c in range(1, 6)],
+    "add a row": [(3, 3), (4, 3)],
+    "same size": [(3, 3), (3, 3)],
+}
+
+
+def run(cls, steps):
+    page = headless_page()
+    grid = cls()
+    page.add(grid)
+    grid.set_dimensions(3, 3)
+    conn = page._Page__conn
+    sent = conn.bytes
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for r, c in steps:
+            grid.set_dimensions(r, c)
+    count = ROUNDS * len(steps)
+    return (time.perf_counter() - t0) / count, (conn.bytes - sent) / count
+
+
+def main():
+    print(f"{'scenario':<12} {'grid':<7} {'ms/resize':>10} {'kB/resize':>10}")
+    for name, steps in SCENARIOS.items():
+        for label, cls in (("legacy", LegacyGrid), ("pooled", MatrixInputGrid)):
+            wall, sent = run(cls, steps)
+            print(f"{name:<12} {label:<7} {wall * 1000:10.2f} {sent / 1e3:10.2f}")
+
+    grid = MatrixInputGrid()
+    grid.set_dimensions(3, 3)
+    grid.inputs[1][1].value = "42"
+    grid.set_dimensions(2, 2)
+    grid.set_dimensions(4, 4)
+    print()
+    print(f"value typed at (2,2) of a 3x3 grid, after 2x2 and back to 4x4: {grid.inputs[1][1].value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Line framing cost: the old str buffer + split('\\n', 1) loop versus LineFramer.
+
+Feeds synthetic FPGA output (stats tables and generated 5x5 matrices) in
+byte-at-a-time and UART-sized chunks and as single large bursts. The
+gain is in bulk reads: with 1 and 64 byte chunks LineFramer is slower
+than the str loop. Its per-call cost is a method call plus a bytes
+search, and a chunk without a newline is only appended.
+
+    cd client
+    python -m benchmarks.bench_line_framer
+"""
+import time
+
+from modules.line_framer import LineFramer
+
+
+def legacy_frame(chunks):
+    """The pre-LineFramer SerialManager._process_buffer, verbatim."""
+    out = []
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8", errors="replace")
+        if len(buffer) > 10000:
+            out.append(buffer)
+            buffer = ""
+            continue
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            line = line.strip()
+            if line:
+                out.append(line)
+    return out
+
+
+def framer_frame(chunks):
+    out = []
+    framer = LineFramer()
+    for chunk in chunks:
+        for line in framer.feed(chunk):
+            line = line.strip()
+            if line:
+                out.append(line.decode("utf-8", errors="replace"))
+    return out
+
+
+def synthetic_dump(n_matrices):
+    border = "+----+----+------+\n"
+    parts = ["50   \n", border, "|  m |  n |  cnt |\n", border]
+    for i in range(25):
+        parts.append(f"|{i // 5 + 1:<4}|{i % 5 + 1:<4}|{2:<6}|\n")
+        parts.append(border)
+    for k in range(n_matrices):
+        parts.append(f"{k % 50}\n")
+        for r in range(5):
+            parts.append("".join(f"{(k + r + c) % 10:<5}" for c in range(5)) + "\n")
+        parts.append("\n")
+    return "".join(parts).encode()
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def timed(fn, chunks, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        lines = fn(chunks)
+        best = min(best, time.perf_counter() - t0)
+    return best, lines
+
+
+def main():
+    print(f"{'payload':>10} {'chunk':>8} {'impl':<8} {'ms':>9} {'lines':>8} {'longest':>9}")
+    for n in (100, 1000, 10000):
+        data = synthetic_dump(n)
+        expected = len([l for l in data.split(b"\n") if l.strip()])
+        for size in (1, 64, 4096, 8192, len(data)):
+            chunks = chunked(data, size)
+            for name, fn in (("legacy", legacy_frame), ("framer", framer_frame)):
+                t, lines = timed(fn, chunks)
+                longest = max(len(l) for l in lines)
+                flag = "" if len(lines) == expected else "  (lines merged by overflow dump)"
+                print(f"{len(data):>10} {size:>8} {name:<8} {t * 1000:9.2f} {len(lines):>8} {longest:>9}{flag}")
+
+
+if __name__ == "__main__":
+    main()
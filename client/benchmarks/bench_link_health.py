@@ -0,0 +1,121 @@
+"""
+Link health monitor: what it measures, what it catches, what it costs.
+
+- idle / busy: SerialManager pings an FpgaStandIn (display mode) every
+  20 ms, once with nothing else going on and once while a browse keeps the
+  board printing. Pongs arrive mid-line then; every line the browse reads
+  must still parse ("bad" counts those that do not). A pty cannot carry the
+  break that is the ping, so send_ping hands it to the stand-in directly:
+  RTT here is the reply path only.
+- faults: the stand-in drops 10% of pings and flips bits in 0.1% of the
+  bytes it prints while the table is re-requested every 50 ms (unparsed:
+  a damaged reply would stall the browse); the monitor's loss and byte
+  error counts are set against what was injected.
+- strip cost: _process_buffer on 1 MB of board text in 4 kB chunks, with
+  no pongs, with a pong pair in every chunk, and with the monitor attached.
+
+    cd client
+    python -m benchmarks.bench_link_health
+"""
+import time
+
+from modules.dispatch_queue import OVERFLOW_DROP_NEWEST, DispatchQueue
+from modules.link_monitor import LinkMonitor
+from modules.protocol import PONG
+from modules.serial_manager import SerialManager
+from benchmarks.bench_session_replay import Browser
+from benchmarks.fpga_standin import FpgaStandIn, fmt_rows
+
+INTERVAL = 0.02
+DURATION = 3.0
+SIZES = ((1, 1), (2, 2), (2, 3), (3, 3), (4, 4), (5, 5))
+
+
+class CheckedBrowser(Browser):
+    """Browses until stopped and counts lines the parsers would choke on."""
+    def __init__(self):
+        super().__init__(rounds=10 ** 9)
+        self.bad = 0
+
+    def on_line(self, line):
+        if any(not (c.isprintable() or c == "\t") for c in line):
+            self.bad += 1
+        super().on_line(line)
+
+
+def run(busy, byte_error_rate=0.0, ping_loss=0.0, pump=False):
+    board = FpgaStandIn(mode="dis", preload=SIZES, byte_error_rate=byte_error_rate, ping_loss=ping_loss)
+    browser = CheckedBrowser()
+    mgr = SerialManager(browser.on_line, lambda connected, msg: None)
+    mgr.connect(board.url, 115200)
+    time.sleep(0.2)  # entry banner and table
+    if busy:
+        browser.mgr = mgr
+
+    def send_ping(started=None):
+        started()
+        board.ping()
+        return True
+
+    mgr.send_ping = send_ping
+    mgr.start_link_monitor(INTERVAL, timeout=INTERVAL * 0.9)
+    if busy:
+        mgr.send_bytes(bytes([0, 0]))
+    deadline = time.perf_counter() + DURATION
+    while time.perf_counter() < deadline:
+        if pump:
+            mgr.send_bytes(bytes([0, 0]))
+        time.sleep(0.05)
+    s = mgr.link_stats()
+    browser.mgr = None
+    time.sleep(0.3)  # let the board finish printing
+    mgr.disconnect()
+    board.close()
+    return s, board, browser
+
+
+def strip_cost():
+    text = "".join(fmt_rows([[i % 100 - 50] * 5 for i in range(4)]) + "\n" for _ in range(4000)).encode()
+    text = text[:1 << 20]
+    chunks = [text[i:i + 4096] for i in range(0, len(text), 4096)]
+    with_pongs = [c[:2000] + bytes([PONG, 10]) + c[2000:] for c in chunks]
+    results = []
+    for label, data, monitor in (("no pongs", chunks, False), ("pong per chunk", with_pongs, False),
+                                 ("pong per chunk + monitor", with_pongs, True)):
+        mgr = SerialManager(lambda line: None, lambda connected, msg: None)
+        mgr.rx_queue = DispatchQueue(1, OVERFLOW_DROP_NEWEST)
+        if monitor:
+            mgr.link_monitor = LinkMonitor(lambda started: True)
+        best = None
+        for _ in range(5):
+            mgr.framer.reset()
+            t0 = time.perf_counter()
+            for chunk in data:
+                mgr._process_buffer(chunk)
+            wall = time.perf_counter() - t0
+            best = wall if best is None else min(best, wall)
+        results.append((label, len(text) / best / 1e6))
+    return results
+
+
+def main():
+    print(f"{'setup':<16} {'pings':>6} {'lost':>5} {'rtt min ms':>11} {'mean':>6} {'p95':>6} {'jitter':>7} "
+          f"{'byte err':>9} {'lines':>6} {'bad':>4}")
+    for label, busy in (("idle", False), ("busy (browse)", True)):
+        s, board, browser = run(busy)
+        print(f"{label:<16} {s['pings']:>6} {s['lost']:>5} {s['rtt_min'] * 1000:11.2f} {s['rtt_mean'] * 1000:6.2f} "
+              f"{s['rtt_p95'] * 1000:6.2f} {s['jitter'] * 1000:7.2f} {s['byte_errors']:>9} "
+              f"{len(browser.lines):>6} {browser.bad:>4}")
+    print()
+    s, board, browser = run(False, byte_error_rate=0.001, ping_loss=0.1, pump=True)
+    print(f"faults: pings lost {s['lost']}/{s['pings']} ({s['loss'] * 100:.1f}%, injected 10%), "
+          f"byte errors {s['byte_errors']} of {s['rx_bytes']} B ({s['byte_error_rate'] * 100:.3f}%), "
+          f"injected {board.corrupted} ({board.corrupted / max(1, board.bytes_out) * 100:.3f}%)")
+    print()
+    print(f"{'RX strip cost':<26} {'MB/s':>8}")
+    for label, rate in strip_cost():
+        print(f"{label:<26} {rate:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Console memory and per-line cost over a long session: the old unbounded
+ListView (one Text with three TextSpans per line, v1 growing the last span
+of an RX burst) vs LogConsole (records in a LogRing, a window of rows).
+
+"v2" appends one entry per line as matrix_client_v2's log() does. "v1 burst"
+logs RX lines within one second of each other, which the old v1 log() folded
+into one span with `text += "\\n" + msg`. The view is pushed every
+FRAME_LINES lines (before_update, as a 30 Hz flush would) so LogConsole
+builds its rows. Time is measured on its own run; memory is what
+tracemalloc sees after a second run (controls, spans, records). The old
+view is stopped at LEGACY_MAX lines; its cost only grows from there.
+
+    cd client
+    python -m benchmarks.bench_log_console
+"""
+import time
+import tracemalloc
+
+import flet as ft
+
+from modules.log_console import LogConsole
+
+LINES = (10_000, 100_000, 1_000_000)
+LEGACY_MAX = 100_000
+BURST = (1_000, 10_000, 50_000)
+# About a 30 Hz frame of board output at 115200 baud
+FRAME_LINES = 20
+MSG = "12   -7   100  3    55"
+
+
+def spans(timestamp, prefix, msg):
+    return [
+        ft.TextSpan(f"[{timestamp}] ", style=ft.TextStyle(color=ft.Colors.OUTLINE)),
+        ft.TextSpan(f"{prefix} ", style=ft.TextStyle(color=ft.Colors.CYAN, weight=ft.FontWeight.BOLD)),
+        ft.TextSpan(msg, style=ft.TextStyle(color=ft.Colors.ON_SURFACE)),
+    ]
+
+
+def render(record):
+    ts, kind, msg, cont = record
+    if cont:
+        return ft.Text(msg, size=12, font_family="Consolas")
+    timestamp = time.strftime("%H:%M:%S", time.localtime(ts))
+    return ft.Text(spans=spans(timestamp, "RX <", msg), font_family="Consolas", size=12)
+
+
+class Legacy:
+    def __init__(self):
+        self.view = ft.ListView(expand=True, spacing=2, auto_scroll=True)
+        self.last = None
+
+    def log(self, msg, grouped=False):
+        if grouped and self.last is not None:
+            self.last.spans[-1].text += "\n" + msg
+            return
+        timestamp = time.strftime("%H:%M:%S")
+        self.last = ft.Text(spans=spans(timestamp, "RX <", msg), font_family="Consolas", size=12)
+        self.view.controls.append(self.last)
+
+
+class Console:
+    def __init__(self):
+        self.view = LogConsole(render, expand=True)
+
+    def log(self, msg, grouped=False):
+        self.view.append("rx", msg, cont=grouped and self.view.ring.total > 0)
+
+
+def feed(cls, lines, grouped):
+    console = cls()
+    log = console.log
+    push = console.view.before_update
+    for i in range(lines):
+        log(MSG, grouped)
+        if i % FRAME_LINES == FRAME_LINES - 1:
+            push()
+    push()
+    return console
+
+
+def run(cls, lines, grouped=False):
+    t0 = time.perf_counter()
+    console = feed(cls, lines, grouped)
+    wall = time.perf_counter() - t0
+    del console
+    tracemalloc.start()
+    console = feed(cls, lines, grouped)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return wall, memory, console
+
+
+def main():
+    print(f"{'stream':<9} {'console':<8} {'lines':>9} {'s':>7} {'us/line':>8} {'MB':>8} {'rows':>7}")
+    for stream, counts, grouped in (("v2", LINES, False), ("v1 burst", BURST, True)):
+        for lines in counts:
+            for name, cls in (("legacy", Legacy), ("ring", Console)):
+                if cls is Legacy and lines > LEGACY_MAX:
+                    continue
+                wall, memory, console = run(cls, lines, grouped)
+                print(f"{stream:<9} {name:<8} {lines:>9} {wall:7.2f} {wall / lines * 1e6:8.2f} "
+                      f"{memory / 1e6:8.1f} {len(console.view.controls):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Searching the console: LogIndex token queries vs scanning every record
+held, over LINES lines of board traffic in a LogConsole sized to keep
+them all.
+
+Traffic cycles through what a session logs: mode banners, stats tables,
+matrix IDs and rows as the board prints them, TX hex and INF lines with
+"ID: n". "append" is the per-line cost of LogConsole.append() with and
+without indexing. Each query is timed as a token search for all hits and
+for the first SEARCH_LIMIT (what the search bar asks for), as a
+case-insensitive loop over the ring, and as LogConsole's substring search
+(exact, a linear scan newest first). Index memory is the posting arrays
+(8 bytes per entry) plus the token dict.
+
+    cd client
+    python -m benchmarks.bench_log_search
+"""
+import sys
+import time
+
+from modules.log_console import LogConsole
+from modules.log_index import SEARCH_LIMIT
+from benchmarks.fpga_standin import BORDER, HEADER, fmt_rows
+
+LINES = 1_000_000
+QUERIES = ("ID: 7", "mode-cal", "Switching to mode: dis", "-128", "Parse Error")
+
+
+def traffic(count):
+    out = []
+    mode = ("dis", "cal", "gen")
+    i = 0
+    while len(out) < count:
+        m = mode[i % 3]
+        out += [("rx", f"mode-{m}"), ("info", f"Switching to mode: {m}"), ("rx", "50"), ("rx", BORDER),
+                ("rx", HEADER), ("rx", BORDER), ("rx", "|3   |3   |2     |"), ("rx", BORDER), ("tx", "03 03")]
+        for k in range(2):
+            mid = (i * 2 + k) % 50
+            rows = [[(a * 7 + b * 13 + i + k) % 256 - 128 for b in range(3)] for a in range(3)]
+            out.append(("rx", str(mid)))
+            out += [("rx", line.strip()) for line in fmt_rows(rows).strip("\n").split("\n")]
+            out.append(("info", f"Matrix loaded, ID: {mid}"))
+        if i % 97 == 0:
+            out.append(("error", "Calc Parse Error: result ending with '12 x'"))
+        i += 1
+    return out[:count]
+
+
+def best(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+def main():
+    lines = traffic(LINES)
+    render = lambda record: None  # rows are never pushed here
+
+    plain = LogConsole(render, capacity=LINES)
+    plain.index.add = lambda seq, text: None
+    t0 = time.perf_counter()
+    for kind, msg in lines:
+        plain.append(kind, msg)
+    base = time.perf_counter() - t0
+    del plain
+
+    console = LogConsole(render, capacity=LINES)
+    t0 = time.perf_counter()
+    for kind, msg in lines:
+        console.append(kind, msg)
+    indexed = time.perf_counter() - t0
+    print(f"{LINES} lines: append {base / LINES * 1e6:.2f} us/line without index, "
+          f"{indexed / LINES * 1e6:.2f} us/line with")
+
+    st = console.index.stats()
+    dict_bytes = sys.getsizeof(console.index.postings) + sum(sys.getsizeof(t) for t in console.index.postings)
+    print(f"index: {st['tokens']} tokens, {st['postings']} postings, "
+          f"{st['bytes'] / 1e6:.1f} MB arrays + {dict_bytes / 1e6:.2f} MB dict "
+          f"({(st['bytes'] + dict_bytes) / LINES:.1f} B/line)")
+    print()
+
+    ring = console.ring
+    print(f"{'query':<24} {'hits':>6} {'index ms':>9} {'first ms':>9} {'scan ms':>9} {'substring ms':>13} {'first hit'}")
+    for q in QUERIES:
+        t_index, hits = best(lambda: console.search(q, limit=LINES))
+        t_first, _ = best(lambda: console.search(q, limit=SEARCH_LIMIT))
+        # A hand-written loop over the ring, case-insensitive like the token search
+        ql = q.lower()
+        t_scan, _ = best(lambda: [seq for seq, r in ring.range(0, LINES) if ql in r[2].lower()], 1)
+        t_sub, sub = best(lambda: console.search(q, limit=LINES, substring=True))
+        first = ring.get(hits[0])[2] if hits else "-"
+        print(f"{q:<24} {len(hits):>6} {t_index * 1000:9.2f} {t_first * 1000:9.2f} {t_scan * 1000:9.1f} "
+              f"{t_sub * 1000:13.1f}  {first}")
+
+
+if __name__ == "__main__":
+    main()
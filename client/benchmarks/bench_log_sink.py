@@ -0,0 +1,117 @@
+"""
+Persistent logging cost on the threads that produce the lines, LogSink vs
+writing each record straight to a gzip file from the caller.
+
+Traffic is board output (matrix rows as the board prints them, stats
+tables) with the TX bytes that requested it, about what a display-mode
+browse logs. "inline" json-encodes and writes every record to a GzipFile
+on the caller's thread, flushing once a second like the sink; "sink"
+calls LogSink.put() (queue large enough for the whole run) and lets its
+writer thread do the rest. "caller us" is what the reader / UI thread
+pays per record; "drain s" is how long close() then takes to get
+everything on disk.
+
+The burst test puts records as fast as one thread can against a small
+queue: put() must never wait for room; what does not fit is counted as
+dropped and noted in the file. Its worst put times are GIL hand-offs to
+the writer thread (one switch interval, 5 ms), not waits for the queue.
+
+    cd client
+    python -m benchmarks.bench_log_sink
+"""
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import zlib
+
+from modules.log_sink import LogSink, read_log
+from benchmarks.fpga_standin import BORDER, HEADER, fmt_rows
+
+RECORDS = 200_000
+BURST = 100_000
+BURST_QUEUE = 1024
+
+
+def traffic(count):
+    rows = [line.strip() for line in fmt_rows([[(i * 7 + j * 13) % 256 - 128 for j in range(5)]
+                                               for i in range(5)]).strip("\n").split("\n")]
+    cycle = [("tx", bytes([5, 5])), ("rx", "10")] + [("rx", r) for r in rows] + \
+            [("rx", BORDER), ("rx", HEADER), ("rx", "|5   |5   |2     |"), ("info", "Switching to mode: dis")]
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+def inline(directory, records):
+    f = open(os.path.join(directory, "inline.jsonl.gz"), "wb")
+    gz = gzip.GzipFile(fileobj=f, mode="wb")
+    flushed = time.perf_counter()
+    t0 = time.perf_counter()
+    for kind, msg in records:
+        if isinstance(msg, bytes):
+            msg = msg.hex(" ").upper()
+        gz.write((json.dumps({"t": round(time.time(), 6), "kind": kind, "msg": msg}) + "\n").encode())
+        now = time.perf_counter()
+        if now - flushed >= 1.0:
+            gz.flush(zlib.Z_SYNC_FLUSH)
+            flushed = now
+    caller = time.perf_counter() - t0
+    gz.close()
+    f.close()
+    return caller, time.perf_counter() - t0 - caller
+
+
+def sink(directory, records):
+    s = LogSink(directory, queue_size=len(records))
+    put = s.put
+    t0 = time.perf_counter()
+    for kind, msg in records:
+        put(kind, msg)
+    caller = time.perf_counter() - t0
+    s.close()
+    return caller, time.perf_counter() - t0 - caller, s
+
+
+def main():
+    records = traffic(RECORDS)
+    raw = sum(len(m) for _, m in records)
+    print(f"{'writer':<7} {'records':>8} {'caller us':>10} {'drain s':>8} {'file kB':>8} {'dropped':>8}")
+    for name in ("inline", "sink"):
+        directory = tempfile.mkdtemp()
+        try:
+            if name == "inline":
+                caller, drain = inline(directory, records)
+                dropped = 0
+            else:
+                caller, drain, s = sink(directory, records)
+                dropped = s.stats()["dropped"]
+            size = sum(os.path.getsize(os.path.join(directory, p)) for p in os.listdir(directory))
+            print(f"{name:<7} {RECORDS:>8} {caller / RECORDS * 1e6:10.2f} {drain:8.2f} {size / 1e3:8.1f} {dropped:>8}")
+        finally:
+            shutil.rmtree(directory)
+    print(f"(payload {raw / 1e3:.1f} kB of text / bytes)")
+
+    directory = tempfile.mkdtemp()
+    try:
+        s = LogSink(directory, queue_size=BURST_QUEUE)
+        times = []
+        for kind, msg in traffic(BURST):
+            t0 = time.perf_counter()
+            s.put(kind, msg)
+            times.append(time.perf_counter() - t0)
+        s.close()
+        times.sort()
+        st = s.stats()
+        kept = [r for p in os.listdir(directory) for r in read_log(os.path.join(directory, p))]
+        notes = [r["msg"] for r in kept if r["kind"] == "sink"]
+        print()
+        print(f"burst of {BURST} into a {BURST_QUEUE}-record queue: put median {times[len(times) // 2] * 1e6:.1f} us, "
+              f"p99.9 {times[int(len(times) * 0.999)] * 1e6:.0f} us, worst {times[-1] * 1e6:.0f} us, "
+              f"{st['records']} written, {st['dropped']} dropped, {len(notes)} drop note(s) in the file")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
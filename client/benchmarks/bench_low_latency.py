@@ -0,0 +1,96 @@
+"""
+Echo round-trip time with and without the low-latency connection profile.
+
+By default a local pty pair is used, with a thread echoing every line back
+from the master side; the report shows how the profile falls back on a pty.
+Pass --port with a USB-UART adapter whose TX is looped back to RX to measure
+the adapter's latency timer for real.
+
+The TX coalescing window is disabled here so only the tty path is measured.
+
+    cd client
+    python -m benchmarks.bench_low_latency [--port /dev/ttyUSB0] [--baud 115200]
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+import tty
+
+from modules.serial_manager import SerialManager
+
+SAMPLES = 300
+
+
+class PtyEcho:
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        self.url = os.ttyname(self.slave)
+        threading.Thread(target=self._echo, daemon=True).start()
+
+    def _echo(self):
+        while True:
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def measure(url, baud, low_latency):
+    got = threading.Event()
+
+    mgr = SerialManager(lambda line: got.set(), lambda connected, msg: None, coalesce_window=0)
+    if not mgr.connect(url, baud, low_latency=low_latency):
+        raise RuntimeError(f"cannot open {url}")
+    report = mgr.low_latency_report
+    rtts = []
+    try:
+        for i in range(SAMPLES):
+            got.clear()
+            t0 = time.perf_counter()
+            mgr.send_bytes(b"%d\n" % i)
+            if not got.wait(1.0):
+                raise RuntimeError("echo lost (is TX looped back to RX?)")
+            rtts.append((time.perf_counter() - t0) * 1000.0)
+            time.sleep(0.001)
+    finally:
+        mgr.disconnect()
+    rtts.sort()
+    return rtts, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", help="looped-back serial adapter (default: local pty pair)")
+    parser.add_argument("--baud", type=int, default=115200)
+    args = parser.parse_args()
+
+    pty_echo = None
+    url = args.port
+    if not url:
+        pty_echo = PtyEcho()
+        url = pty_echo.url
+
+    print(f"{'profile':<10} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for low_latency in (False, True):
+            rtts, report = measure(url, args.baud, low_latency)
+            label = "low" if low_latency else "default"
+            print(f"{label:<10} {statistics.mean(rtts):8.3f} {rtts[len(rtts) // 2]:8.3f} "
+                  f"{rtts[int(len(rtts) * 0.99) - 1]:8.3f}")
+            if report:
+                print(f"  {report}")
+    finally:
+        if pty_echo:
+            pty_echo.close()
+
+
+if __name__ == "__main__":
+    main()
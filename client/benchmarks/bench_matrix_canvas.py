@@ -0,0 +1,98 @@
+"""
+Rendering a matrix: MatrixDisplay's old grid of one Container + Text per
+cell vs MatrixCanvas (the whole matrix as one SVG image), on a headless
+Flet page (benchmarks/flet_headless.py), by matrix size.
+
+"render" puts a new matrix of that size on screen (a new request), as
+update_matrix() did: clear the grid, build it and update. "cell" changes
+one value and pushes it: the canvas re-renders that cell's fragment and
+sends its one property. That property is the whole image, so "cell kB"
+equals "render kB"; the saving is in building and diffing. The old grid
+had no way to do this short of a rebuild, so its column repeats "render".
+Timings include Flet's diff and JSON encoding; "kB" is what would go to
+the Flutter client; "controls" is what the matrix costs in Flet's
+control tree.
+
+    cd client
+    python -m benchmarks.bench_matrix_canvas
+"""
+import random
+import time
+
+import flet as ft
+
+from modules.matrix_canvas import MatrixCanvas
+from benchmarks.flet_headless import headless_page
+
+SIZES = ((3, 3), (8, 8), (16, 16), (32, 32))
+ROUNDS = 20
+
+
+def legacy_grid(rows):
+    out = []
+    for row in rows:
+        row_controls = []
+        for val in row:
+            row_controls.append(
+                ft.Container(
+                    content=ft.Text(str(val), text_align=ft.TextAlign.CENTER, size=12),
+                    width=40, height=30,
+                    alignment=ft.alignment.center,
+                    bgcolor="background",
+                    border_radius=4
+                )
+            )
+        out.append(ft.Row(row_controls, alignment=ft.MainAxisAlignment.CENTER))
+    return out
+
+
+def measure(fn, conn):
+    sent = conn.bytes
+    t0 = time.perf_counter()
+    for i in range(ROUNDS):
+        fn(i)
+    return (time.perf_counter() - t0) / ROUNDS, (conn.bytes - sent) / ROUNDS
+
+
+def main():
+    rng = random.Random(5)
+    print(f"{'size':<7} {'view':<7} {'render ms':>10} {'render kB':>10} {'cell ms':>8} {'cell kB':>8} {'controls':>9}")
+    for r, c in SIZES:
+        size = f"{r}x{c}"
+        mats = [[[rng.randint(-2000, 2000) for _ in range(c)] for _ in range(r)] for _ in range(ROUNDS)]
+
+        page = headless_page()
+        conn = page._Page__conn
+        grid = ft.Column(spacing=5)
+        page.add(grid)
+
+        def legacy_render(i):
+            grid.controls = legacy_grid(mats[i])
+            grid.update()
+
+        t_render, b_render = measure(legacy_render, conn)
+        controls = r * c * 2 + r
+        print(f"{size:<7} {'legacy':<7} {t_render * 1000:10.2f} {b_render / 1e3:10.1f} "
+              f"{t_render * 1000:8.2f} {b_render / 1e3:8.1f} {controls:>9}")
+
+        page = headless_page()
+        conn = page._Page__conn
+        canvas = MatrixCanvas(heatmap=True)
+        page.add(canvas)
+
+        def canvas_render(i):
+            canvas.set_matrix(mats[i])
+            canvas.update()
+
+        def canvas_cell(i):
+            canvas.set_cell(i % r, i % c, rng.randint(-1000, 1000))
+            canvas.update()
+
+        t_render, b_render = measure(canvas_render, conn)
+        t_cell, b_cell = measure(canvas_cell, conn)
+        print(f"{size:<7} {'canvas':<7} {t_render * 1000:10.2f} {b_render / 1e3:10.1f} "
+              f"{t_cell * 1000:8.2f} {b_cell / 1e3:8.1f} {1:>9}")
+
+
+if __name__ == "__main__":
+    main()
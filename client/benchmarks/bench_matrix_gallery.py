@@ -0,0 +1,146 @@
+"""
+Showing thousands of matrices: the old wrapping Row of fresh card trees vs
+MatrixGallery (one page of pooled cards refilled in place), on a headless
+Flet page (benchmarks/flet_headless.py). The timings include building the
+controls and Flet's diff and JSON encoding; "kB sent" is what would go to
+the Flutter client.
+
+"fetch N" is one display request returning N matrices. "repeat" is ROUNDS
+requests of REPEAT_N matrices each, a user browsing sizes back and forth.
+The view is pushed every FRAME cards, as the 30 Hz update scheduler does
+while the board prints. "legacy" clears the Row and builds one Container
+/ Column / Divider / Text / BoxShadow tree per matrix, as DisplayMode did.
+"page through" turns the gallery through every page of the largest fetch.
+The legacy "fetch 5000" row alone takes a few minutes: every push diffs
+all the cards built so far.
+
+    cd client
+    python -m benchmarks.bench_matrix_gallery
+"""
+import random
+import time
+
+import flet as ft
+
+from modules.matrix import Matrix
+from modules.matrix_gallery import MatrixGallery
+from benchmarks.flet_headless import headless_page
+
+FETCH = (100, 1000, 5000)
+ROUNDS, REPEAT_N = 10, 200
+FRAME = 20
+
+
+def matrices(rng, count):
+    out = []
+    for i in range(count):
+        r, c = rng.randint(1, 5), rng.randint(1, 5)
+        out.append(Matrix(r, c, [rng.randint(-128, 127) for _ in range(r * c)], i % 256))
+    return out
+
+
+def legacy_card(matrix):
+    return ft.Container(
+        content=ft.Column([
+            ft.Container(
+                content=ft.Text(f"ID: {matrix.id}", weight=ft.FontWeight.BOLD, size=12, color="primary"),
+                alignment=ft.alignment.center
+            ),
+            ft.Divider(height=1, color="outlineVariant"),
+            ft.Container(
+                content=ft.Text(matrix.text(), font_family="Consolas", size=16, weight=ft.FontWeight.BOLD),
+                alignment=ft.alignment.center,
+                padding=5
+            )
+        ], spacing=5),
+        bgcolor="surfaceVariant",
+        padding=10,
+        border_radius=8,
+        border=ft.border.all(1, "outlineVariant"),
+        shadow=ft.BoxShadow(
+            spread_radius=1,
+            blur_radius=3,
+            color="#4D000000",
+            offset=ft.Offset(0, 2),
+        )
+    )
+
+
+class Legacy:
+    def __init__(self, page):
+        self.wrap = ft.Row(wrap=True, spacing=15, run_spacing=15, alignment=ft.MainAxisAlignment.START)
+        self.view = ft.Column([self.wrap], scroll=ft.ScrollMode.AUTO, expand=True)
+        page.add(self.view)
+        self.cards = 0
+
+    def request(self):
+        self.wrap.controls.clear()
+        self.view.update()
+
+    def add(self, matrix):
+        self.wrap.controls.append(legacy_card(matrix))
+        self.cards += 1
+
+
+class Pooled:
+    def __init__(self, page):
+        self.view = MatrixGallery(title=lambda m: f"ID: {m.id}", expand=True)
+        page.add(self.view)
+
+    @property
+    def cards(self):
+        return self.view.cards_created
+
+    def request(self):
+        self.view.clear()
+        self.view.update()
+
+    def add(self, matrix):
+        self.view.add(matrix)
+
+
+def run(cls, requests):
+    page = headless_page()
+    gallery = cls(page)
+    conn = page._Page__conn
+    sent = conn.bytes
+    t0 = time.perf_counter()
+    for batch in requests:
+        gallery.request()
+        for i, matrix in enumerate(batch):
+            gallery.add(matrix)
+            if i % FRAME == FRAME - 1:
+                gallery.view.update()
+        gallery.view.update()
+    return time.perf_counter() - t0, conn.bytes - sent, gallery
+
+
+def main():
+    rng = random.Random(3)
+    scenarios = [(f"fetch {n}", [matrices(rng, n)]) for n in FETCH]
+    scenarios.append((f"repeat {ROUNDS}x{REPEAT_N}", [matrices(rng, REPEAT_N) for _ in range(ROUNDS)]))
+    print(f"{'scenario':<15} {'gallery':<8} {'ms':>8} {'us/matrix':>10} {'kB sent':>9} {'cards built':>12}")
+    for name, requests in scenarios:
+        count = sum(len(b) for b in requests)
+        for label, cls in (("legacy", Legacy), ("pooled", Pooled)):
+            wall, sent, gallery = run(cls, requests)
+            print(f"{name:<15} {label:<8} {wall * 1000:8.1f} {wall / count * 1e6:10.1f} {sent / 1e3:9.1f} "
+                  f"{gallery.cards:>12}")
+
+    _, _, pooled = run(Pooled, scenarios[len(FETCH) - 1][1])
+    view = pooled.view
+    conn = view.page._Page__conn
+    sent = conn.bytes
+    pages = 0
+    t0 = time.perf_counter()
+    while view.first + view.page_size < len(view.matrices):
+        view.turn(1)
+        pages += 1
+    wall = time.perf_counter() - t0
+    print()
+    print(f"page through {len(view.matrices)} matrices: {pages} turns, {wall / pages * 1000:.2f} ms "
+          f"and {(conn.bytes - sent) / pages / 1e3:.1f} kB per turn, {view.cards_created} cards in the pool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+The v1 console's 0xAA packet parser: old list-based process_rx_data vs the
+streaming PacketFramer.
+
+Bursts of N packets (170, rows, cols, values; random sizes up to 5x5,
+'|'-separated like the board's text) are delivered as one chunk, as 16 kB
+reads (a UI stall at full baud) and as 256-character reads. "received"
+counts the packets of the burst that came out intact. "legacy" is the
+old process_rx_data with the log call replaced by a list append: it
+rescans its token list from the front, deletes consumed packets from it
+and truncates its buffers at 20000 characters / 1000 tokens. A noisy stream (stray numbers, invalid headers,
+garbage words between packets) checks that both agree where the old parser
+does not truncate, and what PacketFramer reports.
+
+    cd client
+    python -m benchmarks.bench_packet_framer
+"""
+import collections
+import random
+import time
+
+from modules.packet_framer import PacketFramer
+
+BURSTS = (1_000, 10_000, 50_000)
+CHUNKS = (16384, 256)
+
+
+def make_stream(rng, count, noise=False):
+    parts, packets = [], []
+    for _ in range(count):
+        r, c = rng.randint(1, 5), rng.randint(1, 5)
+        values = [rng.randint(0, 255) for _ in range(r * c)]
+        if noise and rng.random() < 0.2:
+            parts.append(rng.choice(["7 9", "170 9 3", "170 0", "mode-dis", "170 170 2 2", "x|y"]))
+        parts.append(" | ".join(map(str, [170, r, c] + values)))
+        packets.append((r, c, values))
+    return "\n".join(parts) + "\n", packets
+
+
+class Legacy:
+    """process_rx_data from matrix_client.py before the streaming framer."""
+    def __init__(self):
+        self.rx_buffer = ""
+        self.rx_numbers = []
+        self.out = []
+
+    def feed(self, new_data):
+        self.rx_buffer += new_data
+        if len(self.rx_buffer) > 20000: self.rx_buffer = self.rx_buffer[-10000:]
+        last_sep_index = -1
+        for i in range(len(self.rx_buffer) - 1, -1, -1):
+            if self.rx_buffer[i] in ' \n\r|':
+                last_sep_index = i
+                break
+        if last_sep_index == -1:
+            return
+        complete_part = self.rx_buffer[:last_sep_index]
+        self.rx_buffer = self.rx_buffer[last_sep_index+1:]
+        tokens = complete_part.replace('|', ' ').split()
+        rx_numbers = self.rx_numbers
+        for t in tokens:
+            try:
+                rx_numbers.append(int(t))
+            except:
+                pass
+        while True:
+            try:
+                idx = rx_numbers.index(170)
+            except ValueError:
+                if len(rx_numbers) > 1000:
+                    rx_numbers.clear()
+                break
+            if len(rx_numbers) < idx + 3:
+                break
+            r = rx_numbers[idx+1]
+            c = rx_numbers[idx+2]
+            if r <= 0 or c <= 0 or r > 5 or c > 5:
+                del rx_numbers[:idx+1]
+                continue
+            expected_len = 3 + r*c
+            if len(rx_numbers) < idx + expected_len:
+                break
+            self.out.append((r, c, rx_numbers[idx+3 : idx+expected_len]))
+            del rx_numbers[:idx+expected_len]
+
+
+class Streaming:
+    def __init__(self):
+        self.framer = PacketFramer()
+        self.out = []
+
+    def feed(self, new_data):
+        self.out += self.framer.feed(new_data)
+
+
+def received(out, packets):
+    """How many of packets came out intact."""
+    def count(items):
+        return collections.Counter((r, c, tuple(values)) for r, c, values in items)
+    return sum((count(out) & count(packets)).values())
+
+
+def run(cls, chunks):
+    parser = cls()
+    t0 = time.perf_counter()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return time.perf_counter() - t0, parser
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'packets':>8} {'delivery':<12} {'parser':<10} {'ms':>9} {'us/packet':>10} {'received':>9}")
+    for count in BURSTS:
+        text, packets = make_stream(rng, count)
+        deliveries = [("one chunk", [text])]
+        for size in CHUNKS:
+            deliveries.append((f"{size} chars", [text[i:i + size] for i in range(0, len(text), size)]))
+        for delivery, chunks in deliveries:
+            for name, cls in (("legacy", Legacy), ("streaming", Streaming)):
+                wall, parser = run(cls, chunks)
+                got = received(parser.out, packets)
+                print(f"{count:>8} {delivery:<12} {name:<10} {wall * 1000:9.1f} {wall / count * 1e6:10.2f} "
+                      f"{got:>9}")
+
+    text, packets = make_stream(rng, 2000, noise=True)
+    chunks = [text[i:i + 256] for i in range(0, len(text), 256)]
+    _, legacy = run(Legacy, chunks)
+    _, streaming = run(Streaming, chunks)
+    f = streaming.framer
+    print()
+    print(f"noisy stream: {len(packets)} packets sent, legacy {len(legacy.out)}, streaming {f.packets}, "
+          f"same output {legacy.out == streaming.out}; skipped {f.skipped}, resyncs {f.resyncs}, "
+          f"truncated {f.truncated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+UART link utilization while browsing every stored matrix size.
+
+The workload is "stats, then fetch every size it lists", repeated, against
+an FpgaStandIn paced at 115200 baud. Utilization is the share of wall time
+the board spends transmitting; the rest is the link idling while the host
+reacts. Flows:
+
+  - SerialManager lock-step: the current GUI path. The line handler on the
+    dispatch thread parses each reply and only then sends the next command.
+  - AsyncDevice, one await per request.
+  - AsyncDevice.fetch_many, depth 1: the next command is written from the
+    RX path as soon as the previous reply is complete.
+  - fetch_many, depth 4, against a stand-in that buffers input like a board
+    with an RX FIFO would (the real board drops bytes while printing, which
+    is why depth 1 is the default).
+
+    cd client
+    python -m benchmarks.bench_pipeline
+"""
+import asyncio
+import threading
+import time
+
+from modules.async_device import AsyncDevice
+from modules.protocol import MatrixBlockResponse, StatsResponse
+from modules.serial_manager import SerialManager
+from benchmarks.fpga_standin import FpgaStandIn
+
+ROUNDS = 10
+SIZES = ((1, 1), (1, 3), (2, 2), (2, 3), (2, 5), (3, 2), (3, 3), (4, 4), (5, 1), (5, 5))
+
+
+class LockStepBrowser:
+    """DisplayMode-style flow: parse on the dispatch thread, then send the next command."""
+    def __init__(self, board):
+        self.done = threading.Event()
+        self.rounds = 0
+        self.exchanges = 0
+        self.response = None
+        self.todo = []
+        self.mgr = SerialManager(self.on_line, lambda connected, msg: None)
+        self.mgr.connect(board.url, 115200)
+
+    def start(self):
+        self.send(bytes([0, 0]), StatsResponse())
+
+    def send(self, data, response):
+        self.response = response
+        self.mgr.send_bytes(data)
+
+    def on_line(self, line):
+        if self.response is None or not self.response.feed(line):
+            return
+        self.exchanges += 1
+        if isinstance(self.response, StatsResponse):
+            self.todo = [(size, cnt) for size, cnt in self.response.counts.items() if cnt]
+        if self.todo:
+            (m, n), cnt = self.todo.pop(0)
+            self.send(bytes([m, n]), MatrixBlockResponse(m, n, cnt))
+            return
+        self.rounds += 1
+        if self.rounds == ROUNDS:
+            self.response = None
+            self.done.set()
+        else:
+            self.start()
+
+
+def run_lockstep(board):
+    browser = LockStepBrowser(board)
+    board.set_mode("dis")
+    time.sleep(0.5)  # let the entry table go by
+    busy0 = board.busy_seconds
+    t0 = time.perf_counter()
+    browser.start()
+    browser.done.wait(60)
+    wall = time.perf_counter() - t0
+    browser.mgr.disconnect()
+    return wall, board.busy_seconds - busy0, browser.exchanges
+
+
+async def run_async(board, flow, depth):
+    async with AsyncDevice(board.url, pipeline_depth=depth) as dev:
+        board.set_mode("dis")
+        await dev.wait_mode("dis", timeout=2)
+        busy0 = board.busy_seconds
+        exchanges = 0
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            if flow == "await":
+                _, counts = await dev.stats()
+                for (m, n), cnt in counts.items():
+                    if cnt:
+                        await dev.fetch(m, n, cnt)
+                        exchanges += 1
+            else:
+                _, mats = await dev.fetch_many()
+                exchanges += len(mats)
+            exchanges += 1
+        wall = time.perf_counter() - t0
+    return wall, board.busy_seconds - busy0, exchanges
+
+
+def main():
+    print(f"{'flow':<30} {'wall s':>7} {'busy s':>7} {'util %':>7} {'idle ms/exch':>13} {'dropped':>8}")
+    cases = (
+        ("SerialManager lock-step", None, 1, True),
+        ("AsyncDevice await each", "await", 1, True),
+        ("fetch_many depth 1", "many", 1, True),
+        ("fetch_many depth 4 (RX FIFO)", "many", 4, False),
+    )
+    for label, flow, depth, drops in cases:
+        board = FpgaStandIn(mode="dis", drop_while_busy=drops, preload=SIZES)
+        if flow is None:
+            wall, busy, n = run_lockstep(board)
+        else:
+            wall, busy, n = asyncio.run(run_async(board, flow, depth))
+        print(f"{label:<30} {wall:7.2f} {busy:7.2f} {busy / wall * 100:7.1f} "
+              f"{(wall - busy) / n * 1000:13.2f} {board.dropped:>8}")
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Auto-connect time and accuracy with several serial adapters attached.
+
+Ptys stand in for the adapters: one FpgaStandIn (display mode, or --mode),
+a few silent devices and one that streams unrelated text, with the board
+listed last. The old try_auto_connect (0.5 s settle, then 0.1 s per port,
+first port that opens wins) is compared with concurrent probing, and with
+the cached-port fast path. A pty cannot carry the break the probe pings
+with, so the break on the board's port is handed to the stand-in directly.
+
+    cd client
+    python -m benchmarks.bench_port_probe [--silent 4] [--mode inp]
+"""
+import argparse
+import os
+import threading
+import time
+import tty
+
+import serial
+
+from modules import port_probe
+from modules.port_probe import find_board, probe_port, QUICK_PROBE
+from benchmarks.fpga_standin import FpgaStandIn
+
+
+class OtherDevice:
+    """A pty that is not the board: silent, or chattering unrelated lines."""
+    def __init__(self, chatty=False):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        self.url = os.ttyname(self.slave)
+        self.stop = threading.Event()
+        if chatty:
+            threading.Thread(target=self._chatter, daemon=True).start()
+
+    def _chatter(self):
+        while not self.stop.wait(0.01):
+            try:
+                os.write(self.master, b"GPS $GPGGA,123519,4807.038,N\r\n")
+            except OSError:
+                return
+
+    def close(self):
+        self.stop.set()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def old_auto_connect(devices):
+    time.sleep(0.5)
+    for device in devices:
+        time.sleep(0.1)
+        try:
+            serial.Serial(device, 115200, timeout=0.1).close()
+            return device
+        except Exception:
+            continue
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--silent", type=int, default=4)
+    parser.add_argument("--mode", choices=("dis", "inp", "gen", "cal"), default="dis")
+    args = parser.parse_args()
+
+    others = [OtherDevice() for _ in range(args.silent)] + [OtherDevice(chatty=True)]
+    board = FpgaStandIn(mode=args.mode)
+    devices = [o.url for o in others] + [board.url]
+
+    def send_break(ser, started=None):
+        ser.flush()
+        if ser.port == board.url:
+            board.ping()
+
+    port_probe.send_break = send_break
+
+    print(f"{'strategy':<22} {'ms':>8} {'picked board':>13}")
+    t0 = time.perf_counter()
+    picked = old_auto_connect(devices)
+    print(f"{'sequential (old)':<22} {(time.perf_counter() - t0) * 1000:8.0f} {str(picked == board.url):>13}")
+
+    t0 = time.perf_counter()
+    picked, results = find_board(use_cache=False, ports=devices)
+    print(f"{'concurrent probe':<22} {(time.perf_counter() - t0) * 1000:8.0f} {str(picked == board.url):>13}")
+
+    t0 = time.perf_counter()
+    r = probe_port(board.url, deadline=time.perf_counter() + QUICK_PROBE)
+    print(f"{'cached port':<22} {(time.perf_counter() - t0) * 1000:8.0f} {str(r.identified):>13}")
+
+    print()
+    for r in results:
+        print(f"  {r}")
+    board.close()
+    for o in others:
+        o.close()
+
+
+if __name__ == "__main__":
+    main()
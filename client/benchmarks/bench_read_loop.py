@@ -0,0 +1,113 @@
+"""
+Wake-up latency and idle CPU of the SerialManager reader loops.
+
+Drives a local pty pair (and a loopback socket:// server) and compares the
+legacy 10 ms polling loop against the event-driven reader.
+
+    cd client
+    python -m benchmarks.bench_read_loop
+"""
+import os
+import socket
+import statistics
+import threading
+import time
+import tty
+
+from modules.serial_manager import SerialManager, READ_MODE_EVENT, READ_MODE_POLL
+
+SAMPLES = 200
+IDLE_SECONDS = 2.0
+
+
+class PtyLink:
+    """Serial port backed by a pty; the benchmark writes on the master side."""
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        self.url = os.ttyname(self.slave)
+
+    def write(self, data):
+        os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class SocketLink:
+    """socket:// stand-in: a loopback TCP server with a single peer."""
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.url = "socket://127.0.0.1:%d" % self.server.getsockname()[1]
+        self.peer = None
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        self.peer, _ = self.server.accept()
+        self.peer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def write(self, data):
+        while self.peer is None:
+            time.sleep(0.001)
+        self.peer.sendall(data)
+
+    def close(self):
+        if self.peer:
+            self.peer.close()
+        self.server.close()
+
+
+def run(link_factory, read_mode):
+    link = link_factory()
+    arrived = threading.Event()
+    stamps = []
+
+    def on_line(line):
+        stamps.append(time.perf_counter())
+        arrived.set()
+
+    mgr = SerialManager(on_line, lambda connected, msg: None, read_mode=read_mode)
+    if not mgr.connect(link.url, 115200):
+        raise RuntimeError(f"cannot open {link.url}")
+
+    latencies = []
+    try:
+        for i in range(SAMPLES):
+            arrived.clear()
+            # Random phase relative to the poll period
+            time.sleep(0.002 + (i % 7) * 0.0013)
+            t0 = time.perf_counter()
+            link.write(b"%d\n" % i)
+            if not arrived.wait(1.0):
+                raise RuntimeError("line lost")
+            latencies.append((stamps[-1] - t0) * 1000.0)
+
+        cpu0 = time.process_time()
+        time.sleep(IDLE_SECONDS)
+        idle_cpu = (time.process_time() - cpu0) / IDLE_SECONDS * 100.0
+    finally:
+        mgr.disconnect()
+        link.close()
+
+    latencies.sort()
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "idle_cpu": idle_cpu,
+    }
+
+
+def main():
+    print(f"{'link':<8} {'mode':<6} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'idle CPU %':>11}")
+    for name, factory in (("pty", PtyLink), ("socket", SocketLink)):
+        for mode in (READ_MODE_POLL, READ_MODE_EVENT):
+            r = run(factory, mode)
+            print(f"{name:<8} {mode:<6} {r['mean']:8.3f} {r['p50']:8.3f} {r['p99']:8.3f} {r['idle_cpu']:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Showing a matrix while its rows arrive, on a headless Flet page
+(benchmarks/flet_headless.py), by row count:
+
+  rejoin   what InputMode.handle_line did before the tokenizer: join all
+           rows received so far and re-render the whole MatrixDisplay
+           text for every new row
+  final    what the modes did since: nothing until the last row, then
+           the whole matrix at once
+  stream   MatrixRowView: append the row to the current block of lines
+           and push that block only
+
+Rows are COLS values wide and arrive at the board's 115200 baud.
+"first row" is when the first row is on screen after the first byte
+arrived (line time plus render time). "row 1" / "last row" are the cost
+of pushing the first and the last row (ms and bytes sent); for "final"
+only the last push exists.
+
+    cd client
+    python -m benchmarks.bench_row_streaming
+"""
+import random
+import time
+
+from modules.matrix import Matrix, format_row
+from modules.ui_components import MatrixDisplay
+from benchmarks.flet_headless import headless_page
+
+BAUD = 115200
+COLS = 8
+ROWS = (5, 8, 32, 128)
+ROUNDS = 10
+
+
+def rejoin(display, lines, matrix, push):
+    collected = []
+    for line in lines:
+        collected.append(line)
+        push(lambda: display.update_matrix("\n".join(collected)))
+
+
+def final(display, lines, matrix, push):
+    for i, line in enumerate(lines):
+        if i == len(lines) - 1:
+            push(lambda: display.update_matrix(matrix))
+        else:
+            push(None)
+
+
+def stream(display, lines, matrix, push):
+    view = display.start_rows()
+
+    def show(i, line):
+        changed = view.append_row(list(map(int, line.split())))
+        # The first row also puts the new view on screen
+        (display if i == 0 else changed).update()
+
+    for i, line in enumerate(lines):
+        push(lambda: show(i, line))
+
+
+def run(strategy, rows, rng):
+    """Per-row (seconds, bytes) of the pushes, averaged over ROUNDS."""
+    page = headless_page()
+    display = MatrixDisplay("Result")
+    page.add(display)
+    conn = page._Page__conn
+    costs = [[0.0, 0] for _ in range(rows)]
+    for _ in range(ROUNDS):
+        matrix = Matrix(rows, COLS, [rng.randint(-999, 999) for _ in range(rows * COLS)])
+        lines = [format_row(matrix.row(i)) for i in range(rows)]
+        pushed = iter(range(rows))
+
+        def push(fn):
+            i = next(pushed)
+            if fn is None:
+                return
+            sent = conn.bytes
+            t0 = time.perf_counter()
+            fn()
+            costs[i][0] += time.perf_counter() - t0
+            costs[i][1] += conn.bytes - sent
+
+        strategy(display, lines, matrix, push)
+    return [(t / ROUNDS, b / ROUNDS) for t, b in costs]
+
+
+def main():
+    rng = random.Random(9)
+    line_time = (len(format_row([-999] * COLS)) + 2) * 10 / BAUD
+    print(f"{'rows':>4} {'view':<7} {'first row ms':>13} {'row 1 ms':>9} {'row 1 kB':>9} "
+          f"{'last row ms':>12} {'last row kB':>12}")
+    for rows in ROWS:
+        for name, strategy in (("rejoin", rejoin), ("final", final), ("stream", stream)):
+            costs = run(strategy, rows, rng)
+            first = next(i for i, (t, b) in enumerate(costs) if b)
+            first_ms = ((first + 1) * line_time + costs[first][0]) * 1000
+            t1, b1 = costs[0]
+            tn, bn = costs[-1]
+            print(f"{rows:>4} {name:<7} {first_ms:13.1f} {t1 * 1000:9.2f} {b1 / 1e3:9.2f} "
+                  f"{tn * 1000:12.2f} {bn / 1e3:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Session recording cost and replay speed.
+
+A display-mode browse (stats, then every stored size, repeated) runs
+against an FpgaStandIn through SerialManager, once plain and once recording
+to a session file. The recording is then replayed through a fresh
+SerialManager into the same line handler at 1x, 10x and full speed, and the
+handler must see exactly the lines it saw live.
+
+    cd client
+    python -m benchmarks.bench_session_replay
+"""
+import os
+import tempfile
+import threading
+import time
+
+from modules.protocol import MatrixBlockResponse, StatsResponse
+from modules.serial_manager import SerialManager
+from modules.session_recorder import summarize
+from benchmarks.fpga_standin import FpgaStandIn
+
+ROUNDS = 8
+SIZES = ((1, 1), (2, 2), (2, 3), (3, 3), (4, 4), (5, 5))
+
+
+class Browser:
+    """Lock-step display browse; send=False only parses (for replay)."""
+    def __init__(self, rounds=ROUNDS):
+        self.rounds = rounds
+        self.lines = []
+        self.done = threading.Event()
+        self.response = StatsResponse()
+        self.todo = []
+        self.mgr = None
+
+    def on_line(self, line):
+        self.lines.append(line)
+        if self.mgr is None or self.response is None or not self.response.feed(line):
+            return
+        if isinstance(self.response, StatsResponse):
+            self.todo = [(size, cnt) for size, cnt in self.response.counts.items() if cnt]
+        if self.todo:
+            (m, n), cnt = self.todo.pop(0)
+            self.response = MatrixBlockResponse(m, n, cnt)
+            self.mgr.send_bytes(bytes([m, n]))
+            return
+        self.rounds -= 1
+        if self.rounds == 0:
+            self.response = None
+            self.done.set()
+        else:
+            self.response = StatsResponse()
+            self.mgr.send_bytes(bytes([0, 0]))
+
+
+def live(path):
+    board = FpgaStandIn(mode="dis", preload=SIZES)
+    browser = Browser()
+    browser.mgr = SerialManager(browser.on_line, lambda connected, msg: None)
+    browser.mgr.connect(board.url, 115200)
+    if path:
+        browser.mgr.start_recording(path)
+    t0 = time.perf_counter()
+    browser.mgr.send_bytes(bytes([0, 0]))
+    browser.done.wait(60)
+    wall = time.perf_counter() - t0
+    browser.mgr.disconnect()
+    board.close()
+    return wall, browser.lines
+
+
+def replay(path, speed):
+    lines = []
+    finished = threading.Event()
+    mgr = SerialManager(lines.append, lambda connected, msg: msg.startswith("Replay finished") and finished.set())
+    t0 = time.perf_counter()
+    mgr.replay(path, speed)
+    finished.wait(120)
+    mgr.disconnect()
+    mgr.dispatch_thread.join(5)
+    return time.perf_counter() - t0, lines
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench.fpgarec")
+    wall_plain, _ = live(None)
+    wall_rec, live_lines = live(path)
+    print(f"live browse: {wall_plain:.2f} s plain, {wall_rec:.2f} s recording ({len(live_lines)} lines)")
+    print(summarize(path))
+    text_log = sum(len("[hh:mm:ss] RX < ") + len(line) for line in live_lines)  # console entries
+    print(f"recording is {os.path.getsize(path) / text_log * 100:.0f}% the size of the RX text log alone")
+    print()
+    print(f"{'replay speed':<14} {'wall ms':>8} {'lines/s':>9} {'identical':>10}")
+    for speed in (1.0, 10.0, None):
+        wall, lines = replay(path, speed)
+        label = f"{speed:g}x" if speed else "max"
+        print(f"{label:<14} {wall * 1000:8.1f} {len(lines) / wall:9.0f} {str(lines == live_lines):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Client startup: time until matrix_client_v2's session handler main()
+has returned, i.e. until Flet starts handling the user's clicks. Each of
+RUNS runs (medians shown) is a fresh interpreter, so module imports are
+counted, driving main() on a headless Flet page
+(benchmarks/flet_headless.py) with the persistent log off.
+
+  import    importing matrix_client_v2 and everything it pulls in
+  main      main(page): building the UI (and, before the lazy startup,
+            all four mode panels, the port list and the board probe)
+  probe     how long the background port listing and auto-connect
+            thread ran after main() returned (0 when done inline)
+
+"no device" is this machine as it is: no USB serial ports. "silent
+device" offers a pseudo-terminal as the only USB candidate; it opens but
+never answers the ping, so the probe waits PROBE_DEADLINE
+(modules/port_probe.py) and then gives up on it.
+
+Each scenario also runs "before": the startup this client had, rebuilt on
+the current code. serial.tools.list_ports is imported eagerly, main()
+builds all four mode panels, and the auto-connect runs inline: a fixed
+0.5 s sleep for the ports to settle, then 0.1 s per USB port, the first
+one that opens wins.
+
+    cd client
+    python -m benchmarks.bench_startup
+"""
+import json
+import subprocess
+import sys
+
+RUNS = 5
+SCENARIOS = ("no device", "silent device")
+PATHS = ("before", "now")
+
+CHILD = r"""
+import json, os, pty, sys, threading, time, types
+before = sys.argv[2] == "before"
+t0 = time.perf_counter()
+if before:
+    import serial.tools.list_ports
+import matrix_client_v2 as app
+t1 = time.perf_counter()
+from modules import port_probe
+if sys.argv[1] == "silent device":
+    master, slave = pty.openpty()
+    port_probe.candidate_ports = lambda: [os.ttyname(slave)]
+if before:
+    import serial
+    from modules.calc_mode import CalcMode
+    from modules.display_mode import DisplayMode
+    from modules.gen_mode import GenMode
+    from modules.input_mode import InputMode
+    from modules.serial_manager import SerialManager
+
+    class InlineThread:
+        def __init__(self, target, **kwargs):
+            self.target = target
+
+        def start(self):
+            self.target()
+
+    def old_auto_connect(baudrate):
+        time.sleep(0.5)
+        for port in port_probe.candidate_ports():
+            device = getattr(port, "device", port)
+            time.sleep(0.1)
+            try:
+                serial.Serial(device, baudrate, timeout=0.1).close()
+                return device, []
+            except Exception:
+                continue
+        return None, []
+
+    app.threading = types.SimpleNamespace(Thread=InlineThread)
+    app.find_board = old_auto_connect
+from benchmarks.flet_headless import headless_page
+page = headless_page()
+app.log_options["dir"] = ""
+t2 = time.perf_counter()
+app.main(page)
+if before:
+    mgr = SerialManager(lambda line: None, lambda connected, msg: None)
+    panels = [InputMode(mgr, {"min_val": 0, "max_val": 9}), GenMode(mgr), DisplayMode(mgr), CalcMode(mgr)]
+t3 = time.perf_counter()
+for t in threading.enumerate():
+    if t.name == "auto-connect":
+        t.join()
+t4 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "main": t3 - t2, "probe": t4 - t3}))
+"""
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    print(f"{'scenario':<14} {'path':<7} {'import ms':>10} {'main ms':>8} {'probe ms':>9} {'to interactive ms':>18}")
+    for scenario in SCENARIOS:
+        for path in PATHS:
+            runs = []
+            for _ in range(RUNS):
+                out = subprocess.run([sys.executable, "-c", CHILD, scenario, path],
+                                     capture_output=True, text=True, check=True).stdout
+                runs.append(json.loads(out.strip().splitlines()[-1]))
+            imp, main_, probe = (median([r[k] for r in runs]) for k in ("import", "main", "probe"))
+            total = median([r["import"] + r["main"] for r in runs])
+            print(f"{scenario:<14} {path:<7} {imp * 1000:10.1f} {main_ * 1000:8.1f} {probe * 1000:9.1f} "
+                  f"{total * 1000:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
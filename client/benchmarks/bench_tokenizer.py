@@ -0,0 +1,223 @@
+"""
+Per-line cost of classifying the board's output: string heuristics in each
+mode (as the GUI modes did) vs one LineTokenizer pass.
+
+Two streams, each repeated:
+- display: what a browse produces; the summary table, then every stored
+  size as ID + rows blocks.
+- calc: an addition of two 5x5 matrices; A's summary table and block, B's
+  table and block, the echo of both operands, the result rows.
+
+"legacy" re-implements the old path for them (process_line's strip +
+"mode-" check; the "+----" test, isdigit and stats / header regexes of the
+table parsers; the ID regex and line counting of the block parsers;
+CalcMode's digit regex on echo lines). "tokenizer" feeds the same lines to
+LineTokenizer with the expectations the modes now set. Both must extract
+the same stats rows, IDs and row lines. A block is only wanted whole (as
+in display mode and the operand browse of calc mode): its rows come as
+MatrixLine until the last MatrixRow, whose lines are the block's rows.
+That row can also give its Matrix, parsed on first use; neither stream
+asks.
+
+    cd client
+    python -m benchmarks.bench_tokenizer
+"""
+import re
+import time
+
+from modules.line_tokenizer import LineTokenizer, MatrixId, MatrixLine, MatrixRow, ModeSwitch, StatsRow
+from benchmarks.fpga_standin import BORDER, HEADER, MAX_DIM, PER_DIM, fmt_rows
+
+ROUNDS = 200
+SIZES = [(m, n) for m in range(1, MAX_DIM + 1) for n in range(1, MAX_DIM + 1)]
+
+
+def table():
+    lines = [f"{len(SIZES) * PER_DIM}", BORDER, HEADER, BORDER]
+    for m, n in SIZES:
+        lines += [f"|{m:<4}|{n:<4}|{PER_DIM:<6}|", BORDER]
+    return lines
+
+
+def matrix(m, n, seed):
+    rows = [[(i * 7 + j * 13 + seed) % 256 - 128 for j in range(n)] for i in range(m)]
+    return [line.strip() for line in fmt_rows(rows).strip("\n").split("\n")]
+
+
+def block(m, n):
+    base = ((m - 1) * MAX_DIM + (n - 1)) * PER_DIM
+    lines = []
+    for k in range(PER_DIM):
+        lines += [str(base + k)] + matrix(m, n, k)
+    return lines
+
+
+# [(state, request, lines)]: what the mode is waiting for, what it asked, what comes back
+def display_stream():
+    steps = [("stats", None, ["mode-dis"] + table())]
+    for m, n in SIZES:
+        steps.append(("block", (m, n, PER_DIM), block(m, n)))
+    return steps
+
+
+def calc_stream():
+    a, b = matrix(5, 5, 0), matrix(5, 5, 1)
+    return [
+        ("stats", None, ["mode-cal"] + table()),
+        ("block", (5, 5, PER_DIM), block(5, 5)),
+        ("stats", None, table()),
+        ("block", (5, 5, PER_DIM), block(5, 5)),
+        ("echo", (5, 5), ["48"] + a + ["49"] + b),
+        ("result", 5, matrix(5, 5, 2)),
+    ]
+
+
+class Legacy:
+    def __init__(self):
+        self.out = []
+
+    def request(self, state, req):
+        self.state = state
+        self.parsing_table = False
+        self.left = 0
+        if state == "block":
+            self.m = req[0]
+        elif state == "echo":
+            self.echo = list(req)
+            self.waiting_id = True
+
+    def feed(self, line):
+        line = line.strip()
+        if line.startswith("mode-"):
+            return
+        if self.state == "stats":
+            self.stats(line)
+        elif self.state == "block":
+            self.block(line)
+        elif self.state == "echo":
+            self.echo_line(line)
+        elif line.strip():
+            self.out.append(("row", line))
+
+    def stats(self, line):
+        line = line.strip()
+        if not line:
+            return
+        if not self.parsing_table and line.isdigit():
+            self.total = int(line)
+            return
+        if "+----" in line:
+            self.parsing_table = True
+            return
+        if self.parsing_table:
+            match = re.search(r'\|\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|', line)
+            if match:
+                self.out.append(("stat",) + tuple(map(int, match.groups())))
+                return
+            if re.search(r'\|\s*[a-zA-Z]', line):
+                return
+            self.parsing_table = False
+
+    def block(self, line):
+        if self.left == 0:
+            if not line.strip():
+                return
+            self.out.append(("id", int(re.search(r'\d+', line.strip()).group())))
+            self.left = self.m
+        else:
+            self.out.append(("row", line))
+            self.left -= 1
+
+    def echo_line(self, line):
+        line = line.strip()
+        if not line or not re.search(r'\d', line):
+            return
+        if self.waiting_id:
+            self.waiting_id = False
+            self.out.append(("id", int(line)))
+            return
+        self.out.append(("row", line))
+        self.echo[0] -= 1
+        if self.echo[0] <= 0:
+            self.echo.pop(0)
+            self.waiting_id = True
+
+
+class Tokenized:
+    def __init__(self):
+        self.out = []
+        self.whole = False
+        self.tokens = LineTokenizer()
+
+    def request(self, state, req):
+        tokens = self.tokens
+        tokens.clear_expected()
+        self.whole = state == "block"
+        if state == "block":
+            tokens.expect_matrices(req[0], req[2], each_row=False)
+        elif state == "echo":
+            for rows in req:
+                tokens.expect_matrices(rows)
+        elif state == "result":
+            tokens.expect_matrices(req, ids=False)
+
+    def feed(self, line):
+        event = self.tokens.feed(line)
+        kind = event.__class__
+        if kind is MatrixLine:
+            return
+        if kind is MatrixRow:
+            if self.whole:
+                if event.last:
+                    self.out.append(("rows", event.lines))
+            else:
+                self.out.append(("row", event.text))
+        elif kind is MatrixId:
+            self.out.append(("id", event.id))
+        elif kind is StatsRow:
+            self.out.append(("stat", event.m, event.n, event.count))
+        elif kind is ModeSwitch:
+            pass
+
+
+def run(cls, steps):
+    parser = cls()
+    lines = 0
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for state, req, printed in steps:
+            parser.request(state, req)
+            feed = parser.feed
+            for line in printed:
+                feed(line)
+            lines += len(printed)
+    return time.perf_counter() - t0, lines, parser.out
+
+
+def flatten(out):
+    """Whole blocks as their rows, to compare with the legacy output."""
+    flat = []
+    for item in out:
+        if item[0] == "rows":
+            flat += [("row", text) for text in item[1]]
+        else:
+            flat.append(item)
+    return flat
+
+
+def main():
+    print(f"{'stream':<9} {'parser':<10} {'lines':>7} {'ms':>7} {'us/line':>8} {'same':>5}")
+    for stream, steps in (("display", display_stream()), ("calc", calc_stream())):
+        legacy = None
+        for name, cls in (("legacy", Legacy), ("tokenizer", Tokenized)):
+            wall, lines, out = min((run(cls, steps) for _ in range(3)), key=lambda r: r[0])
+            same = ""
+            if legacy is None:
+                legacy = out
+            else:
+                same = str(flatten(out) == legacy)
+            print(f"{stream:<9} {name:<10} {lines:>7} {wall * 1000:7.1f} {wall / lines * 1e6:8.2f} {same:>5}")
+
+
+if __name__ == "__main__":
+    main()
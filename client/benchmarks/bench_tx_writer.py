@@ -0,0 +1,91 @@
+"""
+Caller-side cost and syscall count of SerialManager.send_bytes.
+
+Replays a CalcMode-style burst of one-byte commands (opcode, dims, IDs,
+0xFF confirm) plus a bulk 5x5 matrix upload over a pty, and compares the old
+synchronous write-and-format path with the coalescing writer thread. The TX
+log consumer gets every send either way: hex-formatted on the caller by the
+old path, as raw bytes from the writer thread (the console only formats the
+rows it shows).
+
+    cd client
+    python -m benchmarks.bench_tx_writer
+"""
+import os
+import threading
+import time
+import tty
+
+from modules.serial_manager import SerialManager
+
+ROUNDS = 300
+
+
+class SyncSendSerialManager(SerialManager):
+    """Pre-writer-thread send_bytes: write and hex-format on the caller."""
+    def send_bytes(self, data: bytes):
+        if self.ser and self.ser.is_open:
+            self.ser.write(data)
+            self.tx_writes += 1
+            if self.on_data_sent:
+                hex_str = " ".join([f"{b:02X}" for b in data])
+                self.on_data_sent(hex_str)
+            return True
+        return False
+
+
+def workload():
+    sends = []
+    for _ in range(ROUNDS):
+        sends += [b"A", bytes([2, 2]), bytes([4]), bytes([2, 2]), bytes([5]), bytes([0xFF])]
+        sends.append(bytes([5, 5] + [7] * 25))
+    return sends
+
+
+def run(cls):
+    master, slave = os.openpty()
+    tty.setraw(master)
+    sink_stop = threading.Event()
+
+    def sink():
+        # Keep the pty drained like the board would
+        while not sink_stop.is_set():
+            try:
+                os.read(master, 65536)
+            except OSError:
+                break
+
+    threading.Thread(target=sink, daemon=True).start()
+    logged = [0]
+
+    def on_tx(msg):
+        logged[0] += 1
+
+    mgr = cls(lambda line: None, lambda connected, msg: None, on_tx)
+    mgr.connect(os.ttyname(slave), 115200)
+    sends = workload()
+
+    t0 = time.perf_counter()
+    results = [mgr.send_bytes(data) for data in sends]
+    caller = time.perf_counter() - t0
+    for r in results:
+        if hasattr(r, "result"):
+            r.result(5)
+    total = time.perf_counter() - t0
+    writes = mgr.tx_writes
+    mgr.disconnect()
+    sink_stop.set()
+    os.close(master)
+    os.close(slave)
+    return caller, total, len(sends), writes, logged[0]
+
+
+def main():
+    print(f"{'path':<26} {'caller us/send':>15} {'all flushed ms':>15} {'sends':>6} {'writes':>7} {'logged':>7}")
+    for name, cls in (("sync (old)", SyncSendSerialManager), ("writer thread", SerialManager)):
+        c, t, n, w, l = run(cls)
+        print(f"{name:<26} {c / n * 1e6:15.2f} {t * 1000:15.1f} {n:>6} {w:>7} {l:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+A Flet page without a client, for measuring UI update cost.
+
+HeadlessConnection handles commands the way Flet's socket server does (it
+assigns control IDs and builds and JSON-encodes the message batch) but
+drops the result instead of sending it. page.update() therefore runs
+Flet's real diff and serialization, and bytes / messages count what would
+have gone over the socket to the Flutter client.
+
+    page = headless_page()
+    page.add(control)
+"""
+import asyncio
+import json
+
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import ClientActions, ClientMessage, CommandEncoder, PageCommandsBatchResponsePayload
+
+
+class HeadlessConnection(LocalConnection):
+    def __init__(self):
+        super().__init__()
+        self.bytes = 0
+        self.messages = 0
+
+    def send_commands(self, session_id, commands):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ("add", "get"):
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            batch = ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages)
+            self.bytes += len(json.dumps(batch, cls=CommandEncoder, separators=(",", ":")))
+            self.messages += 1
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def headless_page():
+    return ft.Page(HeadlessConnection(), "bench", asyncio.new_event_loop())
@@ -0,0 +1,304 @@
+"""
+Software stand-in for the board's UART side, served on a local pty.
+
+Models the text protocol of display, input and calc mode closely enough for
+client benchmarks: same line layout as matrix_uart_sender.sv, the same ID
+scheme, output paced at the configured baud rate, and (like the board, which
+has no RX FIFO) bytes that arrive while it is still printing are dropped.
+Link pings are breaks on the board's RX line, which a pty cannot carry:
+the harness calls ping() instead, and the PONG + count reply goes out in
+any mode, busy or not, like uart_ping_responder.sv. byte_error_rate and
+ping_loss inject faults.
+
+    board = FpgaStandIn(mode="dis")
+    dev = AsyncDevice(board.url)
+"""
+import os
+import random
+import re
+import select
+import threading
+import time
+import tty
+
+NORM_WIDTH = 5
+MAX_DIM = 5
+PER_DIM = 2
+SLOTS = MAX_DIM * MAX_DIM * PER_DIM
+BORDER = "+----+----+------+"
+HEADER = "|  m |  n |  cnt |"
+IMAGE_ROWS, IMAGE_COLS = 10, 12
+# Matrices stored at power-up, as (rows, cols)
+PRELOAD = ((2, 2), (2, 3), (3, 2), (3, 3), (3, 3))
+
+LINE_RE = re.compile(rb"[^\n]+\n*|\n+")
+
+CONFIRM = 0xFF
+ESC = 0xFE
+PONG = 0x06
+
+
+def fmt_rows(rows):
+    return "".join("".join(f"{v:<{NORM_WIDTH}}" for v in row) + "\n" for row in rows)
+
+
+class FpgaStandIn:
+    def __init__(self, mode="dis", baud=115200, drop_while_busy=True, scalar=2, seed=1, preload=PRELOAD,
+                 byte_error_rate=0.0, ping_loss=0.0):
+        self.baud = baud
+        self.drop_while_busy = drop_while_busy
+        self.scalar = scalar
+        self.byte_error_rate = byte_error_rate
+        self.ping_loss = ping_loss
+        self.rng = random.Random(seed)
+        self.faults = random.Random(seed + 1)
+        self.pings = 0
+        self.corrupted = 0
+        self.store = {}  # (m, n) -> [rows or None] * PER_DIM
+        self.next_slot = {}
+        self.image = [[self.rng.randint(0, 9) for _ in range(IMAGE_COLS)] for _ in range(IMAGE_ROWS)]
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+        for m, n in preload:
+            self._store([[self.rng.randint(0, 9) for _ in range(n)] for _ in range(m)])
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.url = os.ttyname(self.slave)
+        self._lock = threading.Lock()
+        self._ping_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flow = None
+        self.mode = None
+        self.set_mode(mode)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # --- harness controls ---
+
+    def set_mode(self, mode):
+        """Flip the mode switches: announce the mode and restart its flow."""
+        with self._lock:
+            self.mode = mode
+            self._flow = {"dis": self._display_flow, "inp": self._input_flow, "gen": self._gen_flow,
+                          "cal": self._calc_flow}[mode]()
+            next(self._flow)
+
+    def ping(self):
+        """A break on the RX line: answered at once, whatever the board is doing."""
+        with self._ping_lock:
+            if self.ping_loss and self.faults.random() < self.ping_loss:
+                return
+            self.pings += 1
+            os.write(self.master, bytes([PONG, self.pings & 0xFF]))
+
+    def close(self):
+        self._stop.set()
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    # --- I/O ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self.master], [], [], 0.1)
+                if not ready:
+                    continue
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            with self._lock:
+                for b in data:
+                    self.bytes_in += 1
+                    self._flow.send(b)
+
+    def _emit(self, text):
+        # Lines go out one at a time, each after its wire time, so the client
+        # never sees the end of a reply before the board would have sent it.
+        # Anything the client sends before that is lost, as on the board.
+        # Blank separator lines ride along with the line before them.
+        t0 = time.perf_counter()
+        sent = 0
+        for line in LINE_RE.findall(text.encode()):
+            if self.baud:
+                sent += len(line)
+                # 10 bit times per byte on the wire
+                delay = t0 + sent * 10 / self.baud - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if self.drop_while_busy:
+                self._drop_pending()
+            if self.byte_error_rate:
+                line = self._corrupt(line)
+            view = memoryview(line)
+            while view:
+                n = os.write(self.master, view)
+                view = view[n:]
+            self.bytes_out += len(line)
+        self.busy_seconds += time.perf_counter() - t0
+
+    def _drop_pending(self):
+        while select.select([self.master], [], [], 0)[0]:
+            data = os.read(self.master, 4096)
+            self.dropped += len(data)
+
+    def _corrupt(self, line):
+        # A flipped top bit: the kind of damage the client can detect
+        out = bytearray(line)
+        for i in range(len(out)):
+            if self.faults.random() < self.byte_error_rate:
+                out[i] |= 0x80
+                self.corrupted += 1
+        return bytes(out)
+
+    # --- storage ---
+
+    def _store(self, rows):
+        m, n = len(rows), len(rows[0])
+        slots = self.store.setdefault((m, n), [None] * PER_DIM)
+        k = self.next_slot.get((m, n), 0)
+        slots[k] = rows
+        self.next_slot[(m, n)] = (k + 1) % PER_DIM
+        return ((m - 1) * MAX_DIM + (n - 1)) * PER_DIM + k
+
+    def _lookup(self, mid):
+        base, k = divmod(mid, PER_DIM)
+        m, n = base // MAX_DIM + 1, base % MAX_DIM + 1
+        slots = self.store.get((m, n))
+        return slots[k] if slots else None
+
+    def _stats_text(self):
+        counts = [(m, n, sum(s is not None for s in slots)) for (m, n), slots in sorted(self.store.items())]
+        counts = [c for c in counts if c[2]]
+        out = [f"{sum(c for _, _, c in counts):<{NORM_WIDTH}}\n", BORDER + "\n", HEADER + "\n", BORDER + "\n"]
+        for m, n, cnt in counts:
+            out.append(f"|{m:<4}|{n:<4}|{cnt:<6}|\n{BORDER}\n")
+        out.append("\n")
+        return "".join(out)
+
+    def _block_text(self, m, n):
+        out = []
+        base = ((m - 1) * MAX_DIM + (n - 1)) * PER_DIM
+        for k, rows in enumerate(self.store.get((m, n), [])):
+            if rows is not None:
+                out.append(f"{base + k}\n{fmt_rows(rows)}\n")
+        return "".join(out)
+
+    def _single_text(self, mid):
+        return f"{mid}\n{fmt_rows(self._lookup(mid))}\n"
+
+    # --- mode flows (generators fed one byte at a time) ---
+
+    def _display_flow(self):
+        self._emit("mode-dis\n")
+        self._emit(self._stats_text())
+        while True:
+            m = yield
+            n = yield
+            if m == 0 and n == 0:
+                self._emit(self._stats_text())
+            elif 1 <= m <= MAX_DIM and 1 <= n <= MAX_DIM:
+                self._emit(self._block_text(m, n))
+
+    def _input_flow(self):
+        self._emit("mode-inp\n")
+        while True:
+            r = yield
+            c = yield
+            values = []
+            for _ in range(r * c):
+                b = yield
+                values.append(b - 256 if b > 127 else b)
+            if not (1 <= r <= MAX_DIM and 1 <= c <= MAX_DIM):
+                continue
+            rows = [values[i * c:(i + 1) * c] for i in range(r)]
+            mid = self._store(rows)
+            self._emit(self._single_text(mid))
+
+    def _gen_flow(self):
+        self._emit("mode-gen\n")
+        while True:
+            m = yield
+            if not 1 <= m <= MAX_DIM:
+                continue
+            n = yield
+            if not 1 <= n <= MAX_DIM:
+                continue
+            k = yield
+            out = []
+            # k == 0 wraps around to 256 matrices on the board
+            for _ in range(k or 256):
+                rows = [[self.rng.randint(-128, 127) for _ in range(n)] for _ in range(m)]
+                self._store(rows)
+                out.append(fmt_rows(rows))
+            # One blank line between matrices, none after the last
+            self._emit("\n".join(out))
+
+    def _select(self):
+        """SEL_SHOW_SUM .. SEL_WAIT_ID; returns the chosen ID or None on ESC."""
+        self._emit(self._stats_text())
+        while True:
+            m = yield
+            if m == ESC:
+                return None
+            if m >= SLOTS:
+                continue
+            n = yield
+            if n == ESC:
+                return None
+            if n >= SLOTS:
+                continue
+            self._emit(self._block_text(m, n))
+            while True:
+                mid = yield
+                if mid == ESC:
+                    return None
+                if mid < SLOTS and self._lookup(mid) is not None:
+                    return mid
+
+    def _calc_flow(self):
+        self._emit("mode-cal\n")
+        while True:
+            op = yield
+            op = chr(op).upper() if op < 128 else ""
+            if op not in "ABCTJ" or not op:
+                continue
+            a_id = yield from self._select()
+            if a_id is None:
+                continue
+            b_id = None
+            if op in "AB":
+                b_id = yield from self._select()
+                if b_id is None:
+                    continue
+            elif op == "C":
+                if (yield) != CONFIRM:
+                    continue
+            self._emit(self._single_text(a_id))
+            if b_id is not None:
+                self._emit(self._single_text(b_id))
+            if (yield) != CONFIRM:
+                continue
+            result = self._compute(op, self._lookup(a_id), self._lookup(b_id) if b_id is not None else None)
+            self._emit(fmt_rows(result) + "\n")
+            while (yield) not in (CONFIRM, ESC):
+                pass
+
+    def _compute(self, op, a, b):
+        if op == "A":
+            return [[x + y for x, y in zip(ra, rb)] for ra, rb in zip(a, b)]
+        if op == "B":
+            return [[sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))] for i in range(len(a))]
+        if op == "C":
+            return [[x * self.scalar for x in row] for row in a]
+        if op == "T":
+            return [list(col) for col in zip(*a)]
+        return [[sum(a[di][dj] * self.image[i + di][j + dj] for di in range(3) for dj in range(3))
+                 for j in range(IMAGE_COLS - 2)] for i in range(IMAGE_ROWS - 2)]
@@ -1,9 +1,16 @@
 import flet as ft
+import argparse
 import serial
-import serial.tools.list_ports
 import time
 import threading
 import datetime
+import atexit
+from modules.packet_framer import PacketFramer
+from modules.protocol_daemon import DEFAULT_URL, daemon_running
+from modules.ui_scheduler import UpdateScheduler
+from modules.log_console import LogConsole, LogSearchBar
+from modules.log_sink import LogSink
+from modules.ui_components import MatrixInputGrid
 
 # ==============================================================================
 # UI Styles & Components
@@ -18,6 +25,9 @@ COLOR_TEXT = "#f3f4f6"      # 主要文字颜色
 COLOR_TEXT_DIM = "#9ca3af"  # 次要文字颜色
 COLOR_TERMINAL = "#0f172a"  # 终端背景
 
+# Filled from the command line (see bottom of file)
+log_options = {"dir": None}
+
 # ==============================================================================
 # Logic / Backend (逻辑保持完全不变)
 # ==============================================================================
@@ -33,11 +43,16 @@ class SerialManager:
         self.read_thread = None
 
     def get_ports(self):
-        return [port.device for port in serial.tools.list_ports.comports()]
+        import serial.tools.list_ports  # 首次使用时才导入
+        ports = [port.device for port in serial.tools.list_ports.comports()]
+        # 由 device daemon 共享的板卡
+        if daemon_running():
+            ports.append(DEFAULT_URL)
+        return ports
 
     def connect(self, port, baudrate):
         try:
-            self.ser = serial.Serial(port, baudrate, timeout=0.1)
+            self.ser = serial.serial_for_url(port, baudrate=baudrate, timeout=0.1)
             self.is_connected = True
             self.stop_event.clear()
             self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
@@ -121,7 +136,8 @@ class MatrixInput(ft.Column):
         self.rows_field = self._build_dim_field("Rows", "3")
         self.cols_field = self._build_dim_field("Cols", "3")
         
-        self.grid_container = ft.Column(spacing=8, alignment=ft.MainAxisAlignment.CENTER)
+        # Cells are pooled: resizing only toggles visibility
+        self.grid = MatrixInputGrid(on_change=self.validate_cell)
         self.inputs = []
 
         self.controls = [
@@ -135,7 +151,7 @@ class MatrixInput(ft.Column):
                 padding=ft.padding.only(bottom=10)
             ),
             ft.Container(
-                content=self.grid_container,
+                content=self.grid,
                 padding=20,
                 bgcolor="#0DFFFFFF", # 动态背景色
                 border_radius=10,
@@ -198,33 +214,8 @@ class MatrixInput(ft.Column):
         except:
             return
 
-        self.inputs = []
-        grid_controls = []
-        
-        for i in range(r):
-            row_inputs = []
-            row_controls = []
-            for j in range(c):
-                tf = ft.TextField(
-                    value="0", 
-                    width=50, 
-                    text_align=ft.TextAlign.CENTER,
-                    text_size=14,
-                    content_padding=10, # 移除 height
-                    border_radius=4,
-                    bgcolor=ft.Colors.SURFACE, # 动态背景
-                    border_color=ft.Colors.OUTLINE,
-                    focused_border_color=ft.Colors.PRIMARY,
-                    on_change=self.validate_cell
-                )
-                row_inputs.append(tf)
-                row_controls.append(tf)
-            self.inputs.append(row_inputs)
-            grid_controls.append(ft.Row(row_controls, alignment=ft.MainAxisAlignment.CENTER))
-        
-        self.grid_container.controls = grid_controls
-        if self.page:
-            self.update()
+        self.grid.set_dimensions(r, c)
+        self.inputs = self.grid.inputs
 
     def send_data(self, e):
         try:
@@ -419,15 +410,18 @@ def main(page: ft.Page):
     page.theme_mode = ft.ThemeMode.DARK
 
     # --- Logs System ---
-    log_view = ft.ListView(expand=True, spacing=2, auto_scroll=True)
-    
-    last_rx_time = 0
-    last_rx_control = None
+    def render_log_line(record):
+        ts, type, msg, cont = record
+        # Explicitly set font family for all spans to ensure alignment
+        # Try a stricter font stack
+        font_family = "Consolas" 
 
-    def log(msg, type="info"):
-        nonlocal last_rx_time, last_rx_control
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        current_time = time.time()
+        if cont:
+            # Later line of a grouped RX burst: message only
+            return ft.Text(msg, size=12, selectable=True, font_family=font_family,
+                           color=ft.Colors.ON_SURFACE)
+
+        timestamp = datetime.datetime.fromtimestamp(ts).strftime("%H:%M:%S")
         
         # 根据当前模式选择日志颜色，保证可见性
         is_dark = page.theme_mode == ft.ThemeMode.DARK
@@ -445,23 +439,7 @@ def main(page: ft.Page):
             color = ft.Colors.ON_SURFACE_VARIANT
             prefix = "INF *"
         
-        # Group RX logs if within 1 second
-        if type == "rx" and last_rx_control and (current_time - last_rx_time < 1.0):
-            try:
-                # Append to the last span (message part)
-                last_rx_control.spans[-1].text += "\n" + msg
-                last_rx_time = current_time
-                page.update()
-                return
-            except:
-                pass
-
-        # New log entry
-        # Explicitly set font family for all spans to ensure alignment
-        # Try a stricter font stack
-        font_family = "Consolas" 
-        
-        new_control = ft.Text(
+        return ft.Text(
             spans=[
                 ft.TextSpan(f"[{timestamp}] ", style=ft.TextStyle(color=ft.Colors.OUTLINE)),
                 ft.TextSpan(f"{prefix} ", style=ft.TextStyle(color=color, weight=ft.FontWeight.BOLD)),
@@ -471,84 +449,42 @@ def main(page: ft.Page):
             selectable=True,
             font_family=font_family, # Set globally for the Text control
         )
+
+    # Bounded: old lines are kept as records and paged in on scroll
+    log_view = LogConsole(render_log_line, expand=True)
+    # Log lines of a burst share one page update per frame
+    ui = UpdateScheduler()
+    # With --log-dir, everything logged is also kept on disk, compressed (see modules/log_sink.py)
+    log_sink = LogSink(log_options["dir"]) if log_options["dir"] else None
+    if log_sink:
+        atexit.register(log_sink.close)
+    
+    last_rx_time = 0
+
+    def log(msg, type="info"):
+        nonlocal last_rx_time
+        current_time = time.time()
+        if log_sink:
+            log_sink.put(type, msg)
         
-        log_view.controls.append(new_control)
-        
-        if type == "rx":
-            last_rx_time = current_time
-            last_rx_control = new_control
-        else:
-            last_rx_control = None
+        # Group RX logs if within 1 second: the burst continues the last entry
+        # as rows of its own instead of growing one text
+        grouped = type == "rx" and current_time - last_rx_time < 1.0
+        log_view.append(type, msg, cont=grouped)
+        last_rx_time = current_time if type == "rx" else 0
             
-        page.update()
+        ui.mark(page)
 
     # --- Parser Logic ---
-    rx_buffer = ""
-    rx_numbers = []
-    
+    packet_framer = PacketFramer()
+
     def process_rx_data(new_data):
-        nonlocal rx_buffer, rx_numbers
-        rx_buffer += new_data
-        if len(rx_buffer) > 20000: rx_buffer = rx_buffer[-10000:] # Prevent overflow
-        
-        # Find the last separator index to ensure we only process complete tokens
-        last_sep_index = -1
-        for i in range(len(rx_buffer) - 1, -1, -1):
-            if rx_buffer[i] in ' \n\r|':
-                last_sep_index = i
-                break
-        
-        if last_sep_index == -1:
-            return # No complete tokens yet
-            
-        # Extract complete part
-        complete_part = rx_buffer[:last_sep_index]
-        rx_buffer = rx_buffer[last_sep_index+1:] # Keep remainder
-        
-        # Tokenize
-        tokens = complete_part.replace('|', ' ').split()
-        for t in tokens:
-            try:
-                rx_numbers.append(int(t))
-            except:
-                pass
-        
-        # Process rx_numbers state machine
-        while True:
-            # Search for header 170 (0xAA)
-            try:
-                idx = rx_numbers.index(170)
-            except ValueError:
-                # No header found yet. 
-                # If buffer is too large, discard old garbage, but be careful not to discard a partial packet.
-                if len(rx_numbers) > 1000: 
-                    rx_numbers.clear()
-                break
-            
-            # Found 170 at idx. Check if we have dimensions.
-            if len(rx_numbers) < idx + 3:
-                break # Wait for R and C
-            
-            r = rx_numbers[idx+1]
-            c = rx_numbers[idx+2]
-            
-            # Basic validation (Max dimensions 5x5)
-            if r <= 0 or c <= 0 or r > 5 or c > 5:
-                # Invalid header/dimensions, discard this 170 and retry
-                del rx_numbers[:idx+1]
-                continue
-
-            # Check if we have enough data
-            expected_len = 3 + r*c
-            if len(rx_numbers) < idx + expected_len:
-                break # Wait for data
-            
-            # Extract data
-            data = rx_numbers[idx+3 : idx+expected_len]
+        resyncs, truncated = packet_framer.resyncs, packet_framer.truncated
+        for r, c, data in packet_framer.feed(new_data):
             log(f"Received Matrix {r}x{c}: {data}", "rx")
-            
-            # Remove processed packet
-            del rx_numbers[:idx+expected_len]
+        if packet_framer.resyncs != resyncs or packet_framer.truncated != truncated:
+            log(f"Parser resync: {packet_framer.resyncs - resyncs} invalid header(s), "
+                f"{packet_framer.truncated - truncated} truncated packet(s)", "error")
 
     # --- Serial Callbacks ---
     log_buffer = ""
@@ -558,6 +494,8 @@ def main(page: ft.Page):
         status_text.value = "ONLINE" if connected else "OFFLINE"
         status_text.color = "green" if connected else "red"
         status_detail.value = msg
+        if connected:
+            packet_framer.reset()
         
         connect_btn.visible = not connected
         disconnect_btn.visible = connected
@@ -872,8 +810,9 @@ def main(page: ft.Page):
             ft.Icon(ft.Icons.TERMINAL, size=14, color=ft.Colors.ON_SURFACE_VARIANT),
             ft.Text("System Console", size=12, color=ft.Colors.ON_SURFACE_VARIANT, weight=ft.FontWeight.BOLD),
             ft.Container(expand=True),
+            LogSearchBar(log_view),
             ft.IconButton(ft.Icons.DELETE_OUTLINE, icon_size=16, icon_color=ft.Colors.ON_SURFACE_VARIANT, 
-                          tooltip="Clear Log", on_click=lambda e: log_view.controls.clear() or page.update())
+                          tooltip="Clear Log", on_click=lambda e: log_view.clear() or page.update())
         ])
     )
     
@@ -931,4 +870,8 @@ def main(page: ft.Page):
     try_auto_connect()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FPGA Matrix Controller")
+    parser.add_argument("--log-dir", help="keep a compressed console/traffic log in this directory (off by default)")
+    args = parser.parse_args()
+    log_options.update(dir=args.log_dir)
     ft.app(target=main)
\ No newline at end of file
@@ -1,13 +1,25 @@
 import flet as ft
+import argparse
+import atexit
 import datetime
-import time
-import serial.tools.list_ports
+import threading
 from modules.serial_manager import SerialManager
+from modules.session_recorder import new_session_path
+from modules.port_probe import find_board, save_last_port
 from modules.input_mode import InputMode
 from modules.gen_mode import GenMode
 from modules.display_mode import DisplayMode
 from modules.calc_mode import CalcMode
+from modules.line_tokenizer import LineTokenizer, ModeSwitch
+from modules.ui_scheduler import UpdateScheduler, DEFAULT_RATE
 from modules.ui_components import StyledCard
+from modules.log_console import LogConsole, LogSearchBar, message_text
+from modules.log_sink import LogSink
+
+# Filled from the command line (see bottom of file)
+replay_options = {"path": None, "speed": 1.0}
+ui_options = {"fps": DEFAULT_RATE}
+log_options = {"dir": None}
 
 def main(page: ft.Page):
     page.title = "FPGA Matrix Controller v2"
@@ -30,11 +42,13 @@ def main(page: ft.Page):
     )
     page.theme_mode = ft.ThemeMode.DARK
 
+    # RX-driven changes are marked here and pushed at most fps times a second
+    ui = UpdateScheduler(ui_options["fps"])
+
     # --- Logging ---
-    log_view = ft.ListView(expand=True, spacing=2, auto_scroll=True)
-    
-    def log(msg, type="info"):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    def render_log_line(record):
+        ts, type, msg, _ = record
+        timestamp = datetime.datetime.fromtimestamp(ts).strftime("%H:%M:%S")
         color = ft.Colors.ON_SURFACE
         prefix = "INF"
         if type == "rx": 
@@ -47,25 +61,40 @@ def main(page: ft.Page):
             color = ft.Colors.RED
             prefix = "ERR !"
         
-        log_view.controls.append(
-            ft.Text(
-                spans=[
-                    ft.TextSpan(f"[{timestamp}] ", style=ft.TextStyle(color=ft.Colors.OUTLINE)),
-                    ft.TextSpan(f"{prefix} ", style=ft.TextStyle(color=color, weight=ft.FontWeight.BOLD)),
-                    ft.TextSpan(msg, style=ft.TextStyle(color=ft.Colors.ON_SURFACE))
-                ],
-                font_family="Consolas", 
-                size=12
-            )
+        return ft.Text(
+            spans=[
+                ft.TextSpan(f"[{timestamp}] ", style=ft.TextStyle(color=ft.Colors.OUTLINE)),
+                ft.TextSpan(f"{prefix} ", style=ft.TextStyle(color=color, weight=ft.FontWeight.BOLD)),
+                ft.TextSpan(message_text(msg), style=ft.TextStyle(color=ft.Colors.ON_SURFACE))
+            ],
+            font_family="Consolas", 
+            size=12
         )
-        page.update()
+
+    # Bounded: old lines are kept as records and paged in on scroll
+    log_view = LogConsole(render_log_line, expand=True)
+
+    # Persistent compressed log (--log-dir), written on its own thread (see modules/log_sink.py)
+    log_sink = LogSink(log_options["dir"]) if log_options["dir"] else None
+    if log_sink:
+        atexit.register(log_sink.close)
+    
+    def log(msg, type="info"):
+        log_view.append(type, msg)
+        ui.mark(log_view)
+        # RX / TX reach the sink from SerialManager, even with the console closed
+        if log_sink and type not in ("rx", "tx"):
+            log_sink.put(type, msg)
 
     # --- Serial Manager ---
+    # Runs on the SerialManager dispatch thread, never on the port reader
     def on_serial_data(line):
         log(f"{line}", "rx")
         process_line(line)
 
     def on_serial_status(connected, msg):
+        if log_sink:
+            log_sink.put("status", msg)
         color = "green" if connected else "red"
         status_text.value = "ONLINE" if connected else "OFFLINE"
         status_text.color = color
@@ -79,12 +108,17 @@ def main(page: ft.Page):
         disconnect_btn.visible = connected
         port_dropdown.disabled = connected
         baud_input.disabled = connected
+        low_latency_switch.disabled = connected
+        record_switch.disabled = connected
+        link_switch.disabled = connected
         page.update()
 
-    def on_serial_tx(msg):
-        log(msg, "tx")
+    def on_serial_tx(data):
+        # Kept as bytes; the console formats the rows it shows
+        log(data, "tx")
 
     serial_manager = SerialManager(on_serial_data, on_serial_status, on_serial_tx)
+    serial_manager.log_sink = log_sink
 
     # --- Global Config ---
     app_config = {
@@ -93,10 +127,9 @@ def main(page: ft.Page):
     }
 
     # --- Modes ---
-    input_mode = InputMode(serial_manager, app_config)
-    gen_mode = GenMode(serial_manager)
-    display_mode = DisplayMode(serial_manager)
-    calc_mode = CalcMode(serial_manager)
+    # Every RX line is classified once here; the modes consume the events
+    # and tell it which replies are matrices
+    tokenizer = LineTokenizer()
     
     idle_content = ft.Container(
         content=ft.Column([
@@ -107,13 +140,21 @@ def main(page: ft.Page):
         alignment=ft.alignment.center
     )
 
-    modes = {
-        "ide": idle_content,
-        "inp": input_mode,
-        "gen": gen_mode,
-        "dis": display_mode,
-        "cal": calc_mode
+    # Mode panels are built on first switch, not at startup
+    mode_factories = {
+        "ide": lambda: idle_content,
+        "inp": lambda: InputMode(serial_manager, app_config, tokenizer, ui),
+        "gen": lambda: GenMode(serial_manager, tokenizer, ui),
+        "dis": lambda: DisplayMode(serial_manager, tokenizer, ui),
+        "cal": lambda: CalcMode(serial_manager, tokenizer, ui)
     }
+    modes = {"ide": idle_content}
+
+    def get_mode(key):
+        mode = modes.get(key)
+        if mode is None:
+            mode = modes[key] = mode_factories[key]()
+        return mode
     
     current_mode_key = "ide"
     mode_container = ft.Container(
@@ -135,36 +176,30 @@ def main(page: ft.Page):
         if current_mode_key == new_mode:
             return
             
-        if new_mode in modes:
+        if new_mode in mode_factories:
+            mode = get_mode(new_mode)
             current_mode_key = new_mode
-            mode_container.content = modes[new_mode]
+            mode_container.content = mode
             mode_label.value = f"Current Mode: {new_mode.upper()}"
-            page.update()
+            ui.mark(page)
             
             # Reset state if needed
             if new_mode == "dis":
-                display_mode.parsing_table = False # Reset table parser
-                display_mode.request_stats()       # Auto-refresh stats on entry
+                mode.parsing_table = False # Reset table parser
+                mode.request_stats()       # Auto-refresh stats on entry
 
     def process_line(line):
-        line = line.strip()
-        # Update: Check for "mode-xxx" format
-        if line.startswith("mode-"):
-            new_mode = line.split("-")[-1]
-            if new_mode in modes:
-                log(f"Switching to mode: {new_mode}", "info")
-                switch_mode(new_mode)
-                return
+        # Lines arrive stripped and non-empty (SerialManager)
+        event = tokenizer.feed(line)
+        if event.__class__ is ModeSwitch:
+            if event.mode in mode_factories:
+                log(f"Switching to mode: {event.mode}", "info")
+                switch_mode(event.mode)
+            return
 
         # Pass data to current active mode controller
-        if current_mode_key == "inp":
-            input_mode.handle_line(line)
-        elif current_mode_key == "gen":
-            gen_mode.handle_line(line)
-        elif current_mode_key == "dis":
-            display_mode.handle_line(line)
-        elif current_mode_key == "cal":
-            calc_mode.handle_line(line)
+        if current_mode_key != "ide":
+            modes[current_mode_key].handle_event(event)
 
     # --- Sidebar ---
     # Header
@@ -195,6 +230,10 @@ def main(page: ft.Page):
     )
     status_text = ft.Text("OFFLINE", color="red", weight=ft.FontWeight.BOLD, size=12)
     status_detail = ft.Text("Ready", size=10, color=ft.Colors.OUTLINE, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)
+    queue_stats_text = ft.Text("", size=10, color=ft.Colors.OUTLINE)
+    link_stats_text = ft.Text("", size=10, color=ft.Colors.OUTLINE)
+    ui_stats_text = ft.Text("", size=10, color=ft.Colors.OUTLINE)
+    sink_stats_text = ft.Text("", size=10, color=ft.Colors.OUTLINE)
     
     # Status Dots
     appbar_status_dot = ft.Container(width=8, height=8, border_radius=4, bgcolor="red")
@@ -207,10 +246,26 @@ def main(page: ft.Page):
         if options: port_dropdown.value = options[0].key
         page.update()
 
+    low_latency_switch = ft.Switch(label="Low latency (USB-UART tuning)", value=False)
+    record_switch = ft.Switch(label="Record session (replay with --replay FILE)", value=False)
+    link_switch = ft.Switch(label="Link monitor (ping RTT / errors)", value=False)
+
+    def connect_click(e):
+        if serial_manager.connect(port_dropdown.value, int(baud_input.value), low_latency=low_latency_switch.value):
+            save_last_port(port_dropdown.value)
+            if serial_manager.low_latency_report:
+                log(str(serial_manager.low_latency_report), "info")
+            if record_switch.value:
+                path = new_session_path()
+                serial_manager.start_recording(path)
+                log(f"Recording session to {path}", "info")
+            if link_switch.value:
+                serial_manager.start_link_monitor()
+
     connect_btn = ft.ElevatedButton(
         "Connect", icon=ft.Icons.USB, 
         style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN, color="white", shape=ft.RoundedRectangleBorder(radius=8)),
-        on_click=lambda e: serial_manager.connect(port_dropdown.value, int(baud_input.value)),
+        on_click=connect_click,
         width=1000
     )
     disconnect_btn = ft.ElevatedButton(
@@ -237,6 +292,13 @@ def main(page: ft.Page):
                 ft.Divider(),
                 ft.Row([port_dropdown, ft.IconButton(ft.Icons.REFRESH, on_click=refresh_ports, icon_color=ft.Colors.PRIMARY)]),
                 baud_input,
+                low_latency_switch,
+                record_switch,
+                link_switch,
+                queue_stats_text,
+                link_stats_text,
+                ui_stats_text,
+                sink_stats_text,
                 ft.Container(height=10),
                 connect_btn,
                 disconnect_btn
@@ -245,6 +307,14 @@ def main(page: ft.Page):
     )
 
     def open_connection_dialog(e):
+        qs = serial_manager.queue_stats()
+        queue_stats_text.value = (
+            f"RX queue: {qs['depth']}/{qs['capacity']} (peak {qs['max_depth']}), "
+            f"{qs['dispatched']} dispatched, {qs['dropped']} dropped [{qs['policy']}]"
+        )
+        link_stats_text.value = serial_manager.link_monitor.summary() if serial_manager.link_monitor else ""
+        ui_stats_text.value = ui.summary()
+        sink_stats_text.value = log_sink.summary() if log_sink else ""
         page.open(connection_dialog)
 
     # 2. Console Bottom Sheet (Hidden by default)
@@ -254,10 +324,11 @@ def main(page: ft.Page):
                 ft.Row([
                     ft.Text("System Console", weight=ft.FontWeight.BOLD, size=16),
                     ft.Container(expand=True),
+                    LogSearchBar(log_view),
                     ft.IconButton(ft.Icons.DELETE_OUTLINE, tooltip="Clear Log", 
-                                  on_click=lambda e: log_view.controls.clear() or page.update()),
+                                  on_click=lambda e: log_view.clear() or page.update()),
                     ft.IconButton(ft.Icons.CLOSE, tooltip="Close", 
-                                  on_click=lambda e: page.close(console_bottom_sheet))
+                                  on_click=lambda e: close_console(e))
                 ]),
                 ft.Divider(),
                 ft.Container(content=log_view, expand=True, bgcolor="surface", border_radius=8, padding=10)
@@ -271,6 +342,9 @@ def main(page: ft.Page):
     def open_console(e):
         page.open(console_bottom_sheet)
 
+    def close_console(e):
+        page.close(console_bottom_sheet)
+
     # 3. Settings Dialog
     min_val_input = ft.TextField(label="Min Value", value="0", width=100, text_align=ft.TextAlign.RIGHT)
     max_val_input = ft.TextField(label="Max Value", value="9", width=100, text_align=ft.TextAlign.RIGHT)
@@ -360,47 +434,55 @@ def main(page: ft.Page):
         )
     )
     
-    refresh_ports(None)
-
     # Auto-connect logic
     def try_auto_connect():
-        # Use detailed port info to filter
-        ports = serial.tools.list_ports.comports()
-        # Scan in reverse order to prioritize higher COM ports (like COM4)
-        for port in reversed(ports):
-            # Filter logic: Look for "USB" in description or HWID
-            if "USB" not in port.description and "USB" not in port.hwid:
-                continue
-
-            log(f"Checking {port.device} ({port.description})...", "info")
-            
-            # Small delay to ensure port is ready/stable
-            time.sleep(0.1)
-            
-            # Try to connect
-            if serial_manager.connect(port.device, 115200):
-                log(f"Auto-connected to {port.device}", "info")
-                # Update dropdown to show connected port
-                port_dropdown.value = port.device
-                page.update()
-                return
-            else:
-                # Connection failed (e.g. PermissionError if busy)
-                log(f"Skipping {port.device}: {status_detail.value}", "info")
-        
+        # Probe every USB serial port at once and pick the one that answers
+        # like the matrix calculator (see modules/port_probe.py)
+        device, results = find_board(115200)
+        for r in results:
+            log(f"Probe {r}", "info")
+
+        if device and serial_manager.connect(device, 115200):
+            log(f"Auto-connected to {device}", "info")
+            if link_switch.value:
+                serial_manager.start_link_monitor()
+            # Update dropdown to show connected port
+            port_dropdown.value = device
+            page.update()
+            return
+
         # Failed
+        status_detail.value = "Ready"
         dlg = ft.AlertDialog(
             title=ft.Text("Auto-Connect Failed"),
-            content=ft.Text("Could not auto-connect to any USB Serial device.\nPlease check connection or connect manually."),
+            content=ft.Text("Could not identify the FPGA on any USB Serial device.\nPlease check connection or connect manually."),
             actions=[
                 ft.TextButton("OK", on_click=lambda e: page.close(dlg))
             ],
         )
         page.open(dlg)
 
-    # Wait for ports to stabilize
-    time.sleep(0.5)
-    try_auto_connect()
+    def start_up():
+        # Port listing and probing run here so the window is usable meanwhile
+        refresh_ports(None)
+        if replay_options["path"]:
+            # Profile parsers and UI on captured traffic, no board needed
+            serial_manager.replay(replay_options["path"], replay_options["speed"] or None)
+        else:
+            try_auto_connect()
+
+    status_detail.value = "Looking for the FPGA..."
+    page.update()
+    threading.Thread(target=start_up, name="auto-connect", daemon=True).start()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FPGA Matrix Controller v2")
+    parser.add_argument("--replay", metavar="FILE", help="play a session recording instead of connecting")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor, 0 = as fast as possible")
+    parser.add_argument("--fps", type=int, default=DEFAULT_RATE, help="max UI refreshes per second, 0 = refresh on every change")
+    parser.add_argument("--log-dir", help="keep a compressed console/traffic log in this directory (off by default)")
+    args = parser.parse_args()
+    replay_options.update(path=args.replay, speed=args.speed)
+    log_options.update(dir=args.log_dir)
+    ui_options.update(fps=args.fps)
     ft.app(target=main)
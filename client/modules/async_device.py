@@ -0,0 +1,425 @@
+"""
+asyncio front end for one board.
+
+Unlike SerialManager (reader, dispatcher and writer threads plus callbacks),
+AsyncDevice registers the port's fd with the running event loop and turns
+every board interaction into an awaitable that resolves once the matching
+FPGA output has been parsed:
+
+    async with AsyncDevice("/dev/ttyUSB0") as dev:
+        await dev.wait_mode("dis")
+        total, counts = await dev.stats()
+        mats = await dev.fetch(2, 2)
+
+Many devices can be driven from one loop without a thread per port. It is
+meant for scripts and tools (the device pool is built on it); the
+GUI clients and their modes still talk to the board through SerialManager.
+on_line is called on the loop thread for every received line.
+
+Commands are scheduled rather than sent by each caller: a queued command is
+written from the RX path the moment the reply ahead of it is complete,
+commands the board answers with nothing (IDs, confirms) go out together with
+the next one, and replies are matched to requests in issue order and checked
+against them (see protocol.py). pipeline_depth bounds how many replies may be
+outstanding; the board has no RX FIFO and ignores bytes while it prints, so
+anything above 1 is only for receivers that buffer input.
+"""
+import asyncio
+import collections
+import threading
+
+import serial
+
+from .line_framer import LineFramer
+from . import protocol_daemon  # noqa: F401  registers daemon:// ports
+from .low_latency import apply_low_latency
+from .protocol import (
+    CMD_CONFIRM, CMD_ESC, MAX_DIM, MODE_PREFIX, OP_ADD, OP_MUL, OP_SCALAR, OP_CODES,
+    MatrixBlockResponse, RowsResponse, StatsResponse, CalcResult, StoredMatrix,
+    check_operands, result_rows,
+)
+
+READ_CHUNK = 4096
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_PIPELINE_DEPTH = 1
+
+
+class AsyncDevice:
+    def __init__(self, port, baudrate=115200, on_line=None, timeout=DEFAULT_TIMEOUT, low_latency=False,
+                 pipeline_depth=DEFAULT_PIPELINE_DEPTH):
+        self.port = port
+        self.baudrate = baudrate
+        self.on_line = on_line
+        self.timeout = timeout
+        self.low_latency = low_latency
+        self.low_latency_report = None
+        self.pipeline_depth = pipeline_depth
+        self.ser = None
+        self.mode = None
+        self.last_stats = None
+        self.framer = LineFramer()
+        self._loop = None
+        self._lock = None
+        # (data, response, future): queued = not written yet, inflight = written,
+        # reply pending (oldest first)
+        self._queued = collections.deque()
+        self._inflight = collections.deque()
+        self._mode_waiters = []
+        self._entry = None
+        self._reader_fd = None
+        self._reader_thread = None
+        self._stop = threading.Event()
+
+    @property
+    def is_connected(self):
+        return self.ser is not None and self.ser.is_open
+
+    @property
+    def ready_mode(self):
+        """The board's mode once it accepts input (None while unknown or busy entering it)."""
+        return self.mode if self._entry is None else None
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self.framer.reset()
+        self._stop.clear()
+        self.ser = serial.serial_for_url(self.port, baudrate=self.baudrate, timeout=0)
+        if self.low_latency:
+            self.low_latency_report = apply_low_latency(self.ser, self.port)
+        try:
+            self._loop.add_reader(self.ser.fileno(), self._on_readable)
+            self._reader_fd = self.ser.fileno()
+        except (NotImplementedError, AttributeError):
+            # Proactor loops (Windows) cannot watch a COM handle: fall back
+            # to one blocking reader thread that hands data to the loop.
+            self.ser.timeout = 0.1
+            self._reader_thread = threading.Thread(target=self._thread_reader, daemon=True)
+            self._reader_thread.start()
+        return self
+
+    async def close(self):
+        self._stop.set()
+        if self._reader_fd is not None:
+            self._loop.remove_reader(self._reader_fd)
+            self._reader_fd = None
+        if self._reader_thread:
+            await self._loop.run_in_executor(None, self._reader_thread.join, 1.0)
+            self._reader_thread = None
+        if self.ser and self.ser.is_open:
+            self.ser.close()
+        self._fail(serial.SerialException("Device closed"))
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- RX path ---
+
+    def _on_readable(self):
+        try:
+            data = self.ser.read(READ_CHUNK)
+        except Exception as e:
+            print(f"Serial Read Error: {e}")
+            self._loop.remove_reader(self._reader_fd)
+            self._reader_fd = None
+            self._fail(e)
+            return
+        if data:
+            self._feed(data)
+
+    def _thread_reader(self):
+        while not self._stop.is_set():
+            try:
+                data = self.ser.read(1)
+                if data and self.ser.in_waiting:
+                    data += self.ser.read(self.ser.in_waiting)
+            except Exception as e:
+                if not self._stop.is_set():
+                    print(f"Serial Read Error: {e}")
+                    self._loop.call_soon_threadsafe(self._fail, e)
+                return
+            if data:
+                self._loop.call_soon_threadsafe(self._feed, data)
+
+    def _feed(self, data):
+        for raw in self.framer.feed(data):
+            raw = raw.strip()
+            if raw:
+                self._handle_line(raw.decode("utf-8", errors="replace"))
+
+    def _handle_line(self, line):
+        if self.on_line:
+            try:
+                self.on_line(line)
+            except Exception as e:
+                print(f"Error handling serial line: {e}")
+
+        if line.startswith(MODE_PREFIX):
+            self.mode = line[len(MODE_PREFIX):]
+            self.last_stats = None
+            if self.mode == "dis":
+                # Display mode prints the summary table on entry; the board
+                # ignores input until it is done, so hold the waiters until then
+                self._entry = StatsResponse()
+            else:
+                self._entry = None
+                self._resolve_mode_waiters()
+            return
+
+        if self._entry is not None:
+            if self._entry.feed(line):
+                self.last_stats = self._entry.result()
+                self._entry = None
+                self._resolve_mode_waiters()
+            return
+
+        advanced = False
+        while self._inflight:
+            _, response, fut = self._inflight[0]
+            try:
+                done = response.feed(line)
+            except ValueError as e:
+                # Not the reply this request expects (a command lost on the
+                # way, or a reply out of step): fail it and offer the line
+                # to the next request already in flight
+                self._inflight.popleft()
+                if not fut.done():
+                    fut.set_exception(ValueError(f"Unexpected line {line!r}: {e}"))
+                advanced = True
+                continue
+            if done:
+                self._inflight.popleft()
+                if not fut.done():
+                    fut.set_result(response.result())
+                advanced = True
+            break
+        # With nothing in flight the line is unsolicited output (board
+        # buttons, stray echoes)
+        if advanced:
+            self._pump()
+
+    def _resolve_mode_waiters(self):
+        for mode, fut in self._mode_waiters:
+            if mode == self.mode and not fut.done():
+                fut.set_result(mode)
+
+    def _fail(self, exc):
+        while self._inflight or self._queued:
+            _, response, fut = (self._inflight or self._queued).popleft()
+            if fut.done():
+                continue
+            if response is None:
+                fut.cancel()  # nobody waits on reply-less commands
+            else:
+                fut.set_exception(exc)
+
+    # --- command scheduling ---
+
+    def _write(self, data):
+        if not self.is_connected:
+            raise serial.SerialException("Device not open")
+        self.ser.write(data)
+
+    def _submit(self, data, response=None):
+        """
+        Queue a command (data may be empty to just expect a reply). Returns a
+        future for the parsed reply; commands without a response resolve to
+        None once written.
+        """
+        fut = self._loop.create_future()
+        self._queued.append((data, response, fut))
+        self._pump()
+        return fut
+
+    def _pump(self):
+        """Write every queued command the pipeline has room for, in one write."""
+        out = []
+        while True:
+            while self._queued and len(self._inflight) < self.pipeline_depth:
+                data, response, fut = self._queued.popleft()
+                if fut.done():
+                    continue  # timed out or cancelled while queued
+                out.append(data)
+                if response is None:
+                    fut.set_result(None)
+                else:
+                    self._inflight.append((data, response, fut))
+            # A reply that needs no lines (nothing stored of a size) is
+            # complete as soon as it reaches the head
+            if self._inflight and self._inflight[0][1].finished():
+                _, response, fut = self._inflight.popleft()
+                if not fut.done():
+                    fut.set_result(response.result())
+                continue
+            break
+        if out:
+            try:
+                self._write(b"".join(out))
+            except Exception as e:
+                print(f"Serial Write Error: {e}")
+                self._fail(e)
+
+    async def _request(self, data, response):
+        """Send data (may be empty) and wait until response has been parsed."""
+        return await self._wait(self._submit(data, response))
+
+    async def _wait(self, fut):
+        try:
+            return await asyncio.wait_for(fut, self.timeout)
+        except asyncio.TimeoutError:
+            self._drop(fut)
+            raise
+
+    def _drop(self, fut):
+        for q in (self._queued, self._inflight):
+            for item in list(q):
+                if item[2] is fut:
+                    q.remove(item)
+        self._pump()
+
+    def _require_mode(self, mode, what):
+        if self.mode is not None and self.mode != mode:
+            raise RuntimeError(f"{what} needs mode-{mode}, board is in mode-{self.mode}")
+
+    async def wait_mode(self, mode, timeout=None):
+        """
+        Wait until the board has entered mode-<mode> and is ready for input
+        (returns at once if it already has).
+        """
+        if self.mode == mode and self._entry is None:
+            return mode
+        fut = self._loop.create_future()
+        entry = (mode, fut)
+        self._mode_waiters.append(entry)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._mode_waiters.remove(entry)
+
+    # --- board operations ---
+
+    async def stats(self):
+        """Display mode: re-print the summary table. Returns (total, {(m, n): count})."""
+        self._require_mode("dis", "stats()")
+        self.last_stats = await self._request(bytes([0, 0]), StatsResponse())
+        return self.last_stats
+
+    async def fetch(self, m, n, count=None):
+        """
+        Display mode: list the stored m x n matrices as StoredMatrix tuples.
+        The board prints no count of its own, so it comes from the last
+        stats() (fetched first if needed) unless given.
+        """
+        if count is None:
+            if self.last_stats is None:
+                await self.stats()
+            count = self.last_stats[1].get((m, n), 0)
+        self._require_mode("dis", "fetch()")
+        return await self._request(bytes([m, n]), MatrixBlockResponse(m, n, count))
+
+    async def fetch_many(self, sizes=None):
+        """
+        Display mode: stats followed by a fetch of each (m, n) in sizes (every
+        stored size when omitted), queued back to back. Returns
+        (stats, {(m, n): [StoredMatrix, ...]}).
+        """
+        self._require_mode("dis", "fetch_many()")
+        stats = StatsResponse()
+        stats_fut = self._submit(bytes([0, 0]), stats)
+        futs = {}
+        try:
+            if sizes is None:
+                # Which sizes exist is only known from the stats reply
+                self.last_stats = await self._wait(stats_fut)
+                for size, cnt in self.last_stats[1].items():
+                    if cnt:
+                        futs[size] = self._submit(bytes(size), MatrixBlockResponse(*size, count=cnt))
+            else:
+                # Counts are read from the stats reply once it is complete
+                for size in sizes:
+                    futs[size] = self._submit(bytes(size), MatrixBlockResponse(*size, stats=stats))
+                self.last_stats = await self._wait(stats_fut)
+            return self.last_stats, {size: await self._wait(fut) for size, fut in futs.items()}
+        except BaseException:
+            for fut in futs.values():
+                self._drop(fut)
+            raise
+
+    async def input_matrix(self, rows):
+        """Input mode: store rows (list of lists of ints); returns the echoed StoredMatrix."""
+        r, c = len(rows), len(rows[0])
+        values = [v for row in rows for v in row]
+        if len(values) != r * c:
+            raise ValueError("Rows must all have the same length")
+        self._require_mode("inp", "input_matrix()")
+        payload = bytes([x & 0xFF for x in [r, c] + values])
+        mats = await self._request(payload, MatrixBlockResponse(r, c, 1))
+        self.last_stats = None
+        return mats[0]
+
+    async def generate(self, m, n, count=1):
+        """
+        Generation mode: have the board create and store count random m x n
+        matrices. The board prints their rows but not their IDs, so the
+        returned StoredMatrix tuples have id None.
+        """
+        if not (1 <= m <= MAX_DIM and 1 <= n <= MAX_DIM):
+            raise ValueError(f"Cannot generate a {m}x{n} matrix")
+        if not 1 <= count <= 255:
+            raise ValueError("count must be 1..255")
+        self._require_mode("gen", "generate()")
+        lines = await self._request(bytes([m, n, count]), RowsResponse(m * count))
+        self.last_stats = None
+        return [StoredMatrix(None, m, n, lines[i * m:(i + 1) * m]) for i in range(count)]
+
+    async def calc(self, op, a, b=None):
+        """
+        Calc mode: run op on stored operands a (and b), StoredMatrix tuples
+        as returned by fetch()/input_matrix(). Scalar multiplication uses the
+        scalar set on the board switches. Returns CalcResult with the board's
+        echo of the operands and the result rows.
+        """
+        check_operands(op, a, b)
+        binary = op in (OP_ADD, OP_MUL)
+        async with self._lock:
+            self._require_mode("cal", "calc()")
+            # The whole exchange is queued up front; each step goes out as
+            # soon as the board has finished the reply before it.
+            blocks = []
+            steps = []
+            data = OP_CODES[op]
+            for mat in ((a, b) if binary else (a,)):
+                stats = StatsResponse()
+                steps.append(self._submit(data, stats))
+                blocks.append((mat, self._submit(bytes([mat.rows, mat.cols]),
+                                                 MatrixBlockResponse(mat.rows, mat.cols, stats=stats))))
+                steps.append(blocks[-1][1])
+                steps.append(self._submit(bytes([mat.id])))
+                data = b""  # operand B's table follows the ID of A unprompted
+            # Scalar mul first waits for the switch value to be confirmed;
+            # then the board echoes the operands and waits for a confirm
+            echo_a = self._submit(bytes([CMD_CONFIRM]) if op == OP_SCALAR else b"",
+                                  MatrixBlockResponse(a.rows, a.cols, 1))
+            echo_b = self._submit(b"", MatrixBlockResponse(b.rows, b.cols, 1)) if binary else None
+            rows = self._submit(bytes([CMD_CONFIRM]), RowsResponse(result_rows(op, a, b)))
+            # DONE_WAIT -> SELECT_OP, ready for the next calculation
+            steps += [echo_a] + ([echo_b] if binary else []) + [rows, self._submit(bytes([CMD_CONFIRM]))]
+            try:
+                for mat, fut in blocks:
+                    if mat.id not in [m.id for m in await self._wait(fut)]:
+                        raise ValueError(f"No stored matrix with ID {mat.id} on the board")
+                echo_a = (await self._wait(echo_a))[0]
+                echo_b = (await self._wait(echo_b))[0] if binary else None
+                rows = await self._wait(rows)
+                await self._wait(steps[-1])
+                return CalcResult(op, echo_a, echo_b, rows)
+            except (asyncio.TimeoutError, ValueError):
+                # Back the board out of the selection flow before giving up
+                for fut in steps:
+                    self._drop(fut)
+                if self.is_connected:
+                    self._submit(bytes([CMD_ESC]))
+                raise
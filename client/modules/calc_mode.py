@@ -1,12 +1,16 @@
 import flet as ft
-import re
-import time
-from .ui_components import StyledCard, MatrixDisplay
+from .line_tokenizer import LineTokenizer, MatrixRow, StatsRow, StatsTotal, TableBorder, TableHeader
+from .ui_components import StyledCard, MatrixRowView
+from .matrix_canvas import MatrixCanvas
+from .matrix_gallery import MatrixGallery
+from .ui_scheduler import UpdateScheduler
 
 class CalcMode(ft.Container):
-    def __init__(self, serial_manager):
+    def __init__(self, serial_manager, tokenizer=None, scheduler=None):
         super().__init__()
         self.serial = serial_manager
+        self.tokens = tokenizer or LineTokenizer()
+        self.ui = scheduler or UpdateScheduler(rate=0)
         self.expand = True
         self.padding = 5
         
@@ -32,15 +36,16 @@ class CalcMode(ft.Container):
         self.matrices_to_receive = 0
         self.current_req_m = 0
         self.current_req_n = 0
-        self.current_matrix_lines_left = 0
-        self.current_matrix_buffer = []
-        self.current_id = ""
         
-        self.echo_a_buffer = []
-        self.echo_b_buffer = []
-        self.echo_lines_left = 0
+        # Echoed operands and the result, as Matrix values
+        self.echo_a = None
+        self.echo_b = None
+        # Views the echo and result rows are streamed into
+        self.echo_rows = None
+        self.echo_view = None
+        self.result_rows = None
         
-        self.result_buffer = []
+        self.result = None
         self.expected_result_rows = 0
 
         # UI Components
@@ -67,6 +72,10 @@ class CalcMode(ft.Container):
         
         # Dynamic Content Area
         self.content_area = ft.Column(expand=True, scroll=ft.ScrollMode.AUTO)
+        # Operand picker, reused by every request (content_area scrolls it)
+        self.gallery = MatrixGallery(title=lambda m: f"{m.id}", size=14, scroll=None,
+                                     on_select=lambda m: self.select_matrix(m.id, self.gallery_is_a))
+        self.gallery_is_a = True
         
         # Main Layout
         self.content = StyledCard(
@@ -86,6 +95,7 @@ class CalcMode(ft.Container):
 
     def reset(self, e=None):
         self.state = "SELECT_OP"
+        self.tokens.clear_expected()
         self.current_op = None
         self.op_dropdown.value = None
         self.op_dropdown.disabled = False
@@ -111,6 +121,10 @@ class CalcMode(ft.Container):
         if op_char and self.serial.is_connected:
             self.serial.send_bytes(op_char)
         
+        # The board answers with the summary table
+        self.tokens.clear_expected()
+        self.parsing_table = False
+
         # Reset stats counters
         self.total_matrices_expected = 0
         self.current_matrices_found = 0
@@ -123,53 +137,44 @@ class CalcMode(ft.Container):
         )
         self.update()
 
-    def handle_line(self, line):
+    def handle_event(self, event):
         if self.state == "SELECT_OP":
             return
 
         # --- Phase A: Select First Matrix ---
         if self.state == "WAIT_STATS_A":
-            self.parse_stats(line, is_a=True)
+            self.parse_stats(event, is_a=True)
         
         elif self.state == "WAIT_MATRICES_A":
-            self.parse_matrices(line, is_a=True)
+            self.parse_matrices(event, is_a=True)
             
         # --- Phase B: Select Second Matrix (If needed) ---
         elif self.state == "WAIT_STATS_B":
-            self.parse_stats(line, is_a=False)
+            self.parse_stats(event, is_a=False)
             
         elif self.state == "WAIT_MATRICES_B":
-            self.parse_matrices(line, is_a=False)
+            self.parse_matrices(event, is_a=False)
             
         # --- Phase C: Result ---
-        elif self.state == "WAIT_ECHO_A":
-            self.parse_echo(line, is_a=True)
-            
-        elif self.state == "WAIT_ECHO_B":
-            self.parse_echo(line, is_a=False)
+        elif self.state in ("WAIT_ECHO_A", "WAIT_ECHO_B"):
+            self.parse_echo(event)
             
         elif self.state == "WAIT_RESULT":
-            self.parse_result(line)
+            self.parse_result(event)
 
     # --- Parsing Logic ---
 
-    def parse_stats(self, line, is_a):
-        line = line.strip()
-        if not line: return
-
-        # Try to parse Total count if not in table
-        if not self.parsing_table:
-            # User specified: Plain number indicating total count
-            if line.isdigit():
-                try:
-                    self.total_matrices_expected = int(line)
-                    self.current_matrices_found = 0
-                    return
-                except:
-                    pass
+    def parse_stats(self, event, is_a):
+        kind = event.__class__
+
+        # Plain number above the table: total count
+        if kind is StatsTotal and not self.parsing_table:
+            self.total_matrices_expected = event.total
+            self.current_matrices_found = 0
+            return
 
         # Detect table start or separator
-        if "+----" in line:
+        if kind is TableBorder:
             if not self.parsing_table:
                 self.stats_buffer = []
                 # Clear loading indicator
@@ -178,13 +183,13 @@ class CalcMode(ft.Container):
                 # Special handling for Conv A: Don't show UI, just show loading
                 if self.current_op == self.OP_CONV and is_a:
                     self.content_area.controls.append(ft.Text("Auto-selecting 3x3 Kernels...", italic=True))
-                    self.update()
+                    self.ui.mark(self)
                 else:
                     label = "Matrix A" if is_a else "Matrix B"
                     self.content_area.controls.append(ft.Text(f"Select Dimensions for {label}:", weight=ft.FontWeight.BOLD))
                     self.stats_grid = ft.Row(wrap=True, spacing=10)
                     self.content_area.controls.append(self.stats_grid)
-                    self.update()
+                    self.ui.mark(self)
                 self.parsing_table = True
             else:
                 # It's a separator line. Check if we have found all matrices.
@@ -198,10 +203,8 @@ class CalcMode(ft.Container):
             return
 
         if self.parsing_table:
-            # Regex: | m | n | cnt |
-            match = re.search(r'\|\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|', line)
-            if match:
-                m, n, cnt = map(int, match.groups())
+            if kind is StatsRow:
+                m, n, cnt = event.m, event.n, event.count
                 
                 self.current_matrices_found += cnt
                 
@@ -221,8 +224,7 @@ class CalcMode(ft.Container):
                     self.add_dim_button(m, n, cnt, is_a)
                 return
 
-            # Ignore header rows containing text
-            if re.search(r'\|\s*[a-zA-Z]', line):
+            if kind is TableHeader:
                 return
 
             # Fallback: If we reach here, it's not a separator, not data, not header -> End of Table
@@ -240,13 +242,15 @@ class CalcMode(ft.Container):
             on_click=lambda e: self.request_matrices(m, n, cnt, is_a)
         )
         self.stats_grid.controls.append(btn)
-        self.update()
+        self.ui.mark(self)
 
     def request_matrices(self, m, n, count, is_a):
         if not self.serial.is_connected: return
         
         # Send [m, n]
         self.serial.send_bytes(bytes([m, n]))
+        self.tokens.clear_expected()
+        self.tokens.expect_matrices(m, count, each_row=False)
         
         # Update State
         self.state = "WAIT_MATRICES_A" if is_a else "WAIT_MATRICES_B"
@@ -259,9 +263,10 @@ class CalcMode(ft.Container):
         self.content_area.controls.clear()
         label = "Matrix A" if is_a else ("Kernel" if self.current_op == self.OP_CONV else "Matrix B")
         self.content_area.controls.append(ft.Text(f"Select {label} ({m}x{n}):", weight=ft.FontWeight.BOLD))
-        self.matrix_wrap = ft.Row(wrap=True, spacing=15, run_spacing=15)
-        self.content_area.controls.append(self.matrix_wrap)
-        self.update()
+        self.gallery.clear()
+        self.gallery_is_a = is_a
+        self.content_area.controls.append(self.gallery)
+        self.ui.mark(self)
         
         # Setup parsing
         self.matrices_to_receive = count # Note: For Conv auto-select, this might be wrong if we didn't parse stats. 
@@ -271,81 +276,29 @@ class CalcMode(ft.Container):
                                          # Here we just keep parsing.
         self.current_req_m = m
         self.current_req_n = n
-        self.current_matrix_lines_left = 0
-        self.current_matrix_buffer = []
-        self.current_id = ""
 
-    def parse_matrices(self, line, is_a):
+    def parse_matrices(self, event, is_a):
         # Logic similar to DisplayMode
-        if self.current_matrix_lines_left == 0:
-            # Expecting ID
-            if not line.strip(): return
-            self.current_id = line.strip()
-            self.current_matrix_buffer = []
-            self.current_matrix_lines_left = self.current_req_m
-        else:
-            self.current_matrix_buffer.append(line)
-            self.current_matrix_lines_left -= 1
-            
-            if self.current_matrix_lines_left == 0:
-                # Matrix Done
-                self.add_matrix_card(self.current_id, self.current_matrix_buffer, is_a)
-                # We don't strictly decrement count here because we might not know it for Conv auto-select
-                # But it's fine.
-
-    def add_matrix_card(self, mid, lines, is_a):
-        # Parse ID from string "ID: 1" or just "1"? 
-        # DisplayMode receives "ID: 1" or just "1"? 
-        # In DisplayMode: `self.current_id = line.strip()`.
-        # We need to extract the numeric ID to send back.
-        # Assuming ID is just the number or "Matrix #1".
-        # Let's try to extract digits.
-        try:
-            id_val = int(re.search(r'\d+', mid).group())
-        except:
-            id_val = 0 # Fallback
-
-        text_block = "\n".join(lines)
-        
-        def on_select(e):
-            self.select_matrix(id_val, is_a)
+        if event.__class__ is MatrixRow and event.last:
+            # Matrix Done
+            if event.matrix is None or event.matrix.id is None:
+                print(f"Calc Parse Error: matrix ending with {event.text!r}")
+                return
+            self.add_matrix_card(event.matrix, is_a)
+            # We don't strictly decrement count here because we might not know it for Conv auto-select
+            # But it's fine.
 
-        card = ft.Container(
-            content=ft.Column([
-                ft.Container(
-                    content=ft.Text(f"{mid}", weight=ft.FontWeight.BOLD, size=12, color="primary"),
-                    alignment=ft.alignment.center
-                ),
-                ft.Divider(height=1, color="outlineVariant"),
-                ft.Container(
-                    content=ft.Text(text_block, font_family="Consolas", size=14, weight=ft.FontWeight.BOLD),
-                    alignment=ft.alignment.center,
-                    padding=5
-                ),
-                ft.Container(
-                    content=ft.Text("SELECT", size=10, weight=ft.FontWeight.BOLD, color="onPrimary"),
-                    bgcolor="primary", padding=5, border_radius=4,
-                    alignment=ft.alignment.center
-                )
-            ], spacing=5),
-            bgcolor="surfaceVariant",
-            padding=10,
-            border_radius=8,
-            border=ft.border.all(1, "outlineVariant"),
-            shadow=ft.BoxShadow(
-                spread_radius=1, blur_radius=3, color="#4D000000", offset=ft.Offset(0, 2)
-            ),
-            on_click=on_select,
-            animate_scale=ft.Animation(100, ft.AnimationCurve.EASE_OUT),
-        )
-        self.matrix_wrap.controls.append(card)
-        self.update()
+    def add_matrix_card(self, matrix, is_a):
+        self.gallery.add(matrix)
+        self.ui.mark(self.gallery)
 
     def select_matrix(self, id_val, is_a):
         if not self.serial.is_connected: return
         
         # Send ID
         self.serial.send_bytes(bytes([id_val]))
+        self.tokens.clear_expected()
+        self.parsing_table = False
         
         # Determine next state
         if is_a:
@@ -364,50 +317,61 @@ class CalcMode(ft.Container):
 
     def prepare_wait_echo(self):
         self.state = "WAIT_ECHO_A"
-        self.echo_a_buffer = []
-        self.echo_b_buffer = []
-        self.echo_lines_left = self.matrix_a_dims[0]
-        self.echo_waiting_id = True
+        self.echo_a = None
+        self.echo_b = None
+        # The board echoes each operand as its ID and rows
+        self.tokens.expect_matrices(self.matrix_a_dims[0])
+        if self.current_op in [self.OP_ADD, self.OP_MUL]:
+            self.tokens.expect_matrices(self.matrix_b_dims[0])
         
         self.status_text.value = "Receiving echo from FPGA..."
         self.content_area.controls.clear()
+        # Echoed rows are shown as they arrive
+        self.echo_rows = ft.Row(wrap=True, alignment=ft.MainAxisAlignment.CENTER, spacing=10)
         self.content_area.controls.append(
             ft.Column([
                 ft.ProgressBar(width=None, color="orange", bgcolor="surfaceVariant"),
-                ft.Text("Reading echoed matrices...", italic=True)
+                ft.Text("Reading echoed matrices...", italic=True),
+                self.echo_rows
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER)
         )
         self.update()
 
-    def parse_echo(self, line, is_a):
-        line = line.strip()
-        if not line: return
-        # Heuristic: Check if line has numbers (ignore headers like "Matrix A:")
-        if not re.search(r'\d', line): return 
+    def append_row(self, view, event):
+        try:
+            changed = view.append_row(event.values)
+        except ValueError:
+            changed = view.append_row(event.text)
+        self.ui.mark(changed)
 
-        if self.echo_waiting_id:
-            self.echo_waiting_id = False
+    def parse_echo(self, event):
+        if event.__class__ is not MatrixRow or event.row is None:
             return
+        if event.row == 0:
+            title = "Operand A" if self.state == "WAIT_ECHO_A" else "Operand B"
+            self.echo_view = MatrixRowView(size=10)
+            self.echo_rows.controls.append(self.create_mini_matrix_card(title, self.echo_view))
+            self.ui.mark(self.echo_rows)
+        self.append_row(self.echo_view, event)
+        # The row completing an operand carries it
+        if not event.last:
+            return
+        if event.matrix is None:
+            print(f"Calc Parse Error: echo ending with {event.text!r}")
 
-        if is_a:
-            self.echo_a_buffer.append(line)
-            self.echo_lines_left -= 1
-            if self.echo_lines_left <= 0:
-                # Done with A
-                if self.current_op in [self.OP_ADD, self.OP_MUL]:
-                    # Move to B
-                    self.state = "WAIT_ECHO_B"
-                    self.echo_lines_left = self.matrix_b_dims[0]
-                    self.echo_waiting_id = True
-                else:
-                    # Unary or Conv (A only) -> Done
-                    self.show_pre_result_ui()
+        if self.state == "WAIT_ECHO_A":
+            self.echo_a = event.matrix
+            # Done with A
+            if self.current_op in [self.OP_ADD, self.OP_MUL]:
+                # Move to B
+                self.state = "WAIT_ECHO_B"
+            else:
+                # Unary or Conv (A only) -> Done
+                self.show_pre_result_ui()
         else:
             # Parsing B
-            self.echo_b_buffer.append(line)
-            self.echo_lines_left -= 1
-            if self.echo_lines_left <= 0:
-                self.show_pre_result_ui()
+            self.echo_b = event.matrix
+            self.show_pre_result_ui()
 
     def send_confirm(self, e=None):
         if self.serial.is_connected:
@@ -431,18 +395,22 @@ class CalcMode(ft.Container):
         echo_view = ft.Row(wrap=True, alignment=ft.MainAxisAlignment.CENTER, spacing=10)
         
         # Card A
-        echo_view.controls.append(self.create_mini_matrix_card("Operand A", self.echo_a_buffer))
+        echo_view.controls.append(self.create_mini_matrix_card("Operand A", self.echo_a))
         
         # Op Symbol
         op_sym = "+" if self.current_op == self.OP_ADD else ("*" if self.current_op == self.OP_MUL else "->")
         echo_view.controls.append(ft.Text(op_sym, size=20, weight=ft.FontWeight.BOLD))
         
         # Card B (if exists)
-        if self.echo_b_buffer:
-            echo_view.controls.append(self.create_mini_matrix_card("Operand B", self.echo_b_buffer))
+        if self.current_op in [self.OP_ADD, self.OP_MUL]:
+            echo_view.controls.append(self.create_mini_matrix_card("Operand B", self.echo_b))
             
         echo_view.controls.append(ft.Text("=", size=20, weight=ft.FontWeight.BOLD))
-        echo_view.controls.append(ft.Text("?", size=30, weight=ft.FontWeight.BOLD, color="outline"))
+        # Result rows are appended here as they arrive
+        self.result_rows = MatrixRowView(
+            size=12 if self.current_op == self.OP_CONV else 16, weight=ft.FontWeight.BOLD, placeholder="?"
+        )
+        echo_view.controls.append(self.result_rows)
 
         self.content_area.controls.append(echo_view)
         self.content_area.controls.append(ft.Divider())
@@ -467,7 +435,7 @@ class CalcMode(ft.Container):
             spacing=20
         )
         self.content_area.controls.append(actions)
-        self.update()
+        self.ui.mark(self)
         
         # Prepare for result
         if self.current_op == self.OP_CONV:
@@ -479,13 +447,21 @@ class CalcMode(ft.Container):
         else:
             self.expected_result_rows = self.matrix_a_dims[0]
             
-        self.result_buffer = []
-
-    def create_mini_matrix_card(self, title, lines):
+        self.result = None
+        # Result rows come without an ID
+        self.tokens.clear_expected()
+        self.tokens.expect_matrices(self.expected_result_rows, ids=False)
+
+    def create_mini_matrix_card(self, title, matrix):
+        """matrix: a Matrix, None, or a control showing it (rows still arriving)."""
+        if isinstance(matrix, ft.Control):
+            body = matrix
+        else:
+            body = ft.Text(matrix.text() if matrix is not None else "?", font_family="Consolas", size=10)
         return ft.Container(
             content=ft.Column([
                 ft.Text(title, size=10, color="outline"),
-                ft.Text("\n".join(lines), font_family="Consolas", size=10)
+                body
             ]),
             bgcolor="surface", padding=10, border_radius=5, border=ft.border.all(1, "outlineVariant")
         )
@@ -494,16 +470,21 @@ class CalcMode(ft.Container):
         # Deprecated by show_pre_result_ui, but kept for safety if called elsewhere
         pass
 
-    def parse_result(self, line):
-        # Collect lines until we have enough rows
-        # Note: Result lines might be empty or headers? 
-        # Assuming raw matrix data lines.
-        if not line.strip(): return
-        
-        self.result_buffer.append(line)
+    def parse_result(self, event):
+        if event.__class__ is not MatrixRow or event.row is None:
+            return
+        if event.row == 0:
+            self.status_text.value = "Receiving result..."
+            self.ui.mark(self.status_text)
+        self.append_row(self.result_rows, event)
+        # The row completing the result carries it
+        if not event.last:
+            return
+        if event.matrix is None:
+            print(f"Calc Parse Error: result ending with {event.text!r}")
         
-        if len(self.result_buffer) >= self.expected_result_rows:
-            self.show_result()
+        self.result = event.matrix
+        self.show_result()
 
     def show_result(self):
         self.state = "SHOW_RESULT"
@@ -514,25 +495,32 @@ class CalcMode(ft.Container):
         result_view = ft.Row(wrap=True, alignment=ft.MainAxisAlignment.CENTER, vertical_alignment=ft.CrossAxisAlignment.CENTER, spacing=10)
         
         # Operand A
-        result_view.controls.append(self.create_mini_matrix_card("Operand A", self.echo_a_buffer))
+        result_view.controls.append(self.create_mini_matrix_card("Operand A", self.echo_a))
         
         # Op Symbol
         op_sym = "+" if self.current_op == self.OP_ADD else ("*" if self.current_op == self.OP_MUL else "->")
         result_view.controls.append(ft.Text(op_sym, size=20, weight=ft.FontWeight.BOLD))
         
         # Operand B (if exists)
-        if self.echo_b_buffer:
-            result_view.controls.append(self.create_mini_matrix_card("Operand B", self.echo_b_buffer))
+        if self.current_op in [self.OP_ADD, self.OP_MUL]:
+            result_view.controls.append(self.create_mini_matrix_card("Operand B", self.echo_b))
             
         result_view.controls.append(ft.Text("=", size=20, weight=ft.FontWeight.BOLD))
         
-        # Result Matrix (Large)
-        font_size = 12 if self.current_op == self.OP_CONV else 16
+        # Result Matrix (Large), one image; heatmap on by default for convolution
+        header = [ft.Text("Result", size=12, color="green", weight=ft.FontWeight.BOLD)]
+        if self.result is not None:
+            conv = self.current_op == self.OP_CONV
+            body = MatrixCanvas(self.result, cell=44 if conv else 40, font_size=12 if conv else 16, heatmap=conv)
+            header.append(ft.Switch(label="Heatmap", value=conv, scale=0.8,
+                                    on_change=lambda e: self.toggle_heatmap(body, e.control.value)))
+        else:
+            body = ft.Text("?", font_family="Consolas", size=16, weight=ft.FontWeight.BOLD)
         result_card = ft.Container(
             content=ft.Column([
-                ft.Text("Result", size=12, color="green", weight=ft.FontWeight.BOLD),
+                ft.Row(header, alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
                 ft.Divider(),
-                ft.Text("\n".join(self.result_buffer), font_family="Consolas", size=font_size, weight=ft.FontWeight.BOLD, selectable=True)
+                body
             ]),
             bgcolor="surfaceVariant",
             padding=20,
@@ -547,4 +535,8 @@ class CalcMode(ft.Container):
         self.content_area.controls.append(
             ft.ElevatedButton("New Calculation", on_click=self.on_new_calc, icon=ft.Icons.ADD)
         )
-        self.update()
\ No newline at end of file
+        self.ui.mark(self)
+
+    def toggle_heatmap(self, canvas, on):
+        canvas.set_heatmap(on)
+        self.ui.mark(canvas)
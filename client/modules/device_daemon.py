@@ -0,0 +1,524 @@
+"""
+Share one board between several local programs.
+
+Only one process can own the serial port, so the GUI, the older client and
+batch scripts cannot use the board at the same time. DeviceDaemon owns the
+port (through SerialManager) and serves clients on a Unix domain socket:
+
+    python -m modules.device_daemon /dev/ttyUSB0     # no port: auto-detect
+    python -m modules.device_daemon --monitor        # tail a running daemon
+
+A client greets with one JSON line naming its role, {"hello": "control"}:
+
+  control  JSON lines both ways. Requests are queued per client and served
+           round-robin, one at a time: a request is written to the board and
+           owns every line that comes back until its reply parser (see
+           protocol.py) is done, so replies never get mixed between clients.
+               {"id": 1, "send": "0000", "expect": {"type": "stats"}}
+               -> {"reply": 1, "lines": [...]}  or  {"reply": 1, "error": "..."}
+           expect is {"type": "stats"}, {"type": "block", "rows": m,
+           "cols": n, "count": k}, {"type": "rows", "count": k} or
+           {"type": "none"} (nothing comes back); without it the request
+           ends once the board has been quiet for QUIET_GAP.
+           {"id": 2, "lock": true} waits for its turn, then keeps the board
+           for this client until {"lock": false} or disconnect (multi-step
+           flows such as calc). With "subscribe": true in the greeting every
+           received line is also pushed as {"rx": line}.
+  monitor  read-only: rx lines, {"tx": hex, "client": n}, status changes and
+           client join/leave. Requests are answered with an error.
+  raw      after the greeting a plain byte stream: writes are queued like
+           requests without expect, received lines come back as text. This
+           is what daemon:// ports use (protocol_daemon.py), so pyserial code
+           such as the GUIs works unchanged.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import socket
+import threading
+
+import serial
+
+from .protocol import MODE_PREFIX, MatrixBlockResponse, RowsResponse, StatsResponse
+from .protocol_daemon import DEFAULT_SOCKET, daemon_running
+from .serial_manager import SerialManager
+
+DEFAULT_TIMEOUT = 5.0
+QUIET_GAP = 0.05
+# Bytes queued for a client that does not read before it is disconnected
+MAX_BACKLOG = 1 << 20
+
+ROLE_CONTROL = "control"
+ROLE_MONITOR = "monitor"
+ROLE_RAW = "raw"
+ROLES = (ROLE_CONTROL, ROLE_MONITOR, ROLE_RAW)
+
+
+def make_response(expect):
+    """Reply parser for a request's expect field; None means no parser."""
+    kind = expect["type"]
+    if kind == "stats":
+        return StatsResponse()
+    if kind == "block":
+        return MatrixBlockResponse(expect["rows"], expect["cols"], expect["count"])
+    if kind == "rows":
+        return RowsResponse(expect["count"])
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown expect type {kind!r}")
+
+
+class _Client:
+    def __init__(self, cid, role, writer, subscribed):
+        self.id = cid
+        self.role = role
+        self.writer = writer
+        self.subscribed = subscribed
+        self.pending = collections.deque()
+
+
+class _Request:
+    def __init__(self, client, rid, data, response=None, settle=False, lock=None):
+        self.client = client
+        self.id = rid
+        self.data = data
+        self.response = response
+        # No parser: done once the board has been quiet for QUIET_GAP
+        self.settle = settle
+        self.lock = lock
+        self.lines = []
+        self.deadline = None
+        self.timer = None
+
+
+class DeviceDaemon:
+    def __init__(self, port, baudrate=115200, socket_path=DEFAULT_SOCKET, timeout=DEFAULT_TIMEOUT,
+                 low_latency=False):
+        self.port = port
+        self.baudrate = baudrate
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.low_latency = low_latency
+        self.mgr = SerialManager(self._on_line_threadsafe, self._on_status_threadsafe)
+        self.status = ""
+        self.mode = None
+        self.clients = []  # connection order, also the round-robin order
+        self.served = 0
+        self._ids = itertools.count(1)
+        self._active = None
+        self._owner = None  # client holding the lock
+        self._rr = 0
+        self._entry = None
+        self._loop = None
+        self._server = None
+        self._stopped = None
+        self._tasks = set()
+
+    async def serve(self):
+        """Open the port and serve clients until stop() (or cancellation)."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._claim_socket()
+        if not self.mgr.connect(self.port, self.baudrate, low_latency=self.low_latency):
+            raise serial.SerialException(self.status)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=self.socket_path)
+            await self._stopped.wait()
+        finally:
+            if self._server:
+                self._server.close()
+            for client in list(self.clients):
+                client.writer.close()
+            # Closed connections end their handlers at the next read
+            if self._tasks:
+                await asyncio.wait(self._tasks, timeout=1.0)
+            self.mgr.disconnect()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Stop serving; safe to call from any thread."""
+        if self._loop and self._stopped:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    def _claim_socket(self):
+        if daemon_running(self.socket_path):
+            raise OSError(f"Another daemon is already serving {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # left over from a daemon that died
+
+    # --- clients ---
+
+    async def _serve_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            await self._run_client(reader, writer)
+        finally:
+            self._tasks.discard(task)
+
+    async def _run_client(self, reader, writer):
+        try:
+            hello = json.loads(await reader.readline())
+            role = hello.get("hello")
+        except (ValueError, AttributeError, ConnectionError):
+            role = None
+        if role not in ROLES:
+            writer.close()
+            return
+        client = _Client(next(self._ids), role, writer, role != ROLE_CONTROL or bool(hello.get("subscribe")))
+        self.clients.append(client)
+        self._event({"join": client.id, "role": role})
+        try:
+            if role == ROLE_RAW:
+                while True:
+                    data = await reader.read(4096)
+                    if not data:
+                        break
+                    self._enqueue(_Request(client, None, data, settle=True))
+            else:
+                async for line in reader:
+                    self._handle_message(client, line)
+        except (ConnectionError, ValueError) as e:
+            print(f"Daemon client {client.id} error: {e}")
+        finally:
+            self._drop_client(client)
+
+    def _handle_message(self, client, line):
+        try:
+            msg = json.loads(line)
+            rid = msg.get("id")
+        except (ValueError, AttributeError):
+            self._send(client, {"error": f"Not a JSON object: {line[:80]!r}"})
+            return
+        if client.role == ROLE_MONITOR:
+            self._send(client, {"reply": rid, "error": "Monitor clients are read-only"})
+            return
+        if "lock" in msg:
+            self._enqueue(_Request(client, rid, b"", lock=bool(msg["lock"])))
+            return
+        try:
+            data = bytes.fromhex(msg.get("send", ""))
+            expect = msg.get("expect")
+            response = make_response(expect) if expect is not None else None
+        except (ValueError, TypeError, KeyError) as e:
+            self._send(client, {"reply": rid, "error": f"Bad request: {e}"})
+            return
+        self._enqueue(_Request(client, rid, data, response, settle=expect is None))
+
+    def _drop_client(self, client):
+        if client not in self.clients:
+            return
+        index = self.clients.index(client)
+        self.clients.remove(client)
+        if index < self._rr:
+            self._rr -= 1
+        if self._owner is client:
+            self._owner = None
+        client.pending.clear()
+        # A request of theirs still in progress runs to the end so its reply
+        # is not taken for someone else's
+        client.writer.close()
+        self._event({"leave": client.id})
+        self._pump()
+
+    def _write(self, client, data):
+        writer = client.writer
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+            print(f"Daemon client {client.id} is not reading, disconnecting it")
+            writer.close()
+            return
+        writer.write(data)
+
+    def _send(self, client, msg):
+        self._write(client, (json.dumps(msg) + "\n").encode())
+
+    def _event(self, msg):
+        for client in self.clients:
+            if client.role == ROLE_MONITOR:
+                self._send(client, msg)
+
+    # --- scheduling ---
+
+    def _enqueue(self, request):
+        request.client.pending.append(request)
+        self._pump()
+
+    def _next_request(self):
+        if self._owner is not None:
+            return self._owner.pending.popleft() if self._owner.pending else None
+        count = len(self.clients)
+        for i in range(count):
+            client = self.clients[(self._rr + i) % count]
+            if client.pending:
+                self._rr = (self._rr + i + 1) % count
+                return client.pending.popleft()
+        return None
+
+    def _pump(self):
+        while self._active is None:
+            request = self._next_request()
+            if request is None:
+                return
+            self._start(request)
+
+    def _start(self, request):
+        if request.lock is not None:
+            self._owner = request.client if request.lock else None
+            self._reply(request, locked=request.lock)
+            return
+        if request.data:
+            if self.mgr.send_bytes(request.data) is False:
+                self._reply(request, error="Board not connected")
+                return
+            self._event({"tx": request.data.hex(" ").upper(), "client": request.client.id})
+        self.served += 1
+        if request.response is None and not request.settle:
+            self._reply(request, lines=[])
+            return
+        if request.response is not None and request.response.finished():
+            self._reply(request, lines=[])  # nothing stored of that size
+            return
+        self._active = request
+        request.deadline = self._loop.time() + self.timeout
+        request.timer = self._loop.call_later(QUIET_GAP if request.settle else self.timeout, self._on_timer)
+
+    def _on_timer(self):
+        request = self._active
+        if request.settle:
+            self._finish(request)
+        else:
+            self._finish(request, "Timed out waiting for the board")
+
+    def _finish(self, request, error=None):
+        request.timer.cancel()
+        self._active = None
+        if error:
+            self._reply(request, error=error, lines=request.lines)
+        else:
+            self._reply(request, lines=request.lines)
+        self._pump()
+
+    def _reply(self, request, **fields):
+        client = request.client
+        if client.role == ROLE_RAW or client not in self.clients:
+            return
+        self._send(client, {"reply": request.id, **fields})
+
+    # --- RX path (SerialManager threads hand over to the loop) ---
+
+    def _on_line_threadsafe(self, line):
+        try:
+            self._loop.call_soon_threadsafe(self._on_line, line)
+        except RuntimeError:
+            pass  # loop already closed, daemon is gone
+
+    def _on_status_threadsafe(self, connected, msg):
+        self.status = msg
+        print(f"Daemon: {msg}")
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._on_status, connected, msg)
+
+    def _on_status(self, connected, msg):
+        for client in self.clients:
+            if client.role != ROLE_RAW:
+                self._send(client, {"status": msg, "connected": connected})
+
+    def _on_line(self, line):
+        raw = (line + "\n").encode()
+        push = {"rx": line}
+        for client in self.clients:
+            if client.role == ROLE_RAW:
+                self._write(client, raw)
+            elif client.subscribed:
+                self._send(client, push)
+
+        if line.startswith(MODE_PREFIX):
+            self.mode = line[len(MODE_PREFIX):]
+            # Display mode prints its summary table on entry; keep it away
+            # from whatever request is running
+            self._entry = StatsResponse() if self.mode == "dis" else None
+            return
+        if self._entry is not None:
+            try:
+                if self._entry.feed(line):
+                    self._entry = None
+                return
+            except ValueError:
+                self._entry = None
+
+        request = self._active
+        if request is None:
+            return  # unsolicited output (board buttons)
+        request.lines.append(line)
+        if request.settle:
+            request.timer.cancel()
+            delay = min(QUIET_GAP, request.deadline - self._loop.time())
+            request.timer = self._loop.call_later(max(0.0, delay), self._on_timer)
+            return
+        try:
+            done = request.response.feed(line)
+        except ValueError as e:
+            self._finish(request, f"Unexpected line {line!r}: {e}")
+            return
+        if done:
+            self._finish(request)
+
+
+class DaemonClient:
+    """
+    Blocking client for scripts. Events the daemon pushes (rx lines for a
+    subscribed control client, everything for a monitor) go to on_event on
+    the reader thread.
+    """
+    def __init__(self, socket_path=DEFAULT_SOCKET, role=ROLE_CONTROL, on_event=None, timeout=DEFAULT_TIMEOUT * 2):
+        self.role = role
+        self.on_event = on_event
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        hello = {"hello": role}
+        if role == ROLE_CONTROL and on_event is not None:
+            hello["subscribe"] = True
+        self.sock.sendall((json.dumps(hello) + "\n").encode())
+        self._ids = itertools.count(1)
+        self._waiting = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def wait_closed(self):
+        self._reader.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_loop(self):
+        with self.sock.makefile("rb") as f:
+            for line in f:
+                msg = json.loads(line)
+                waiter = self._waiting.get(msg.get("reply")) if "reply" in msg else None
+                if waiter is not None:
+                    waiter[1] = msg
+                    waiter[0].set()
+                elif self.on_event:
+                    try:
+                        self.on_event(msg)
+                    except Exception as e:
+                        print(f"Error handling daemon event: {e}")
+        for waiter in list(self._waiting.values()):
+            waiter[0].set()  # connection closed, waiters see no reply
+
+    def _call(self, msg):
+        rid = next(self._ids)
+        waiter = [threading.Event(), None]
+        self._waiting[rid] = waiter
+        try:
+            with self._lock:
+                self.sock.sendall((json.dumps({"id": rid, **msg}) + "\n").encode())
+            if not waiter[0].wait(self.timeout):
+                raise TimeoutError("No reply from the daemon")
+        finally:
+            del self._waiting[rid]
+        reply = waiter[1]
+        if reply is None:
+            raise ConnectionError("Daemon connection closed")
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    def request(self, data, expect=None):
+        """Send data (bytes, may be empty) and return the reply lines."""
+        msg = {"send": bytes(data).hex()}
+        if expect is not None:
+            msg["expect"] = expect
+        return self._call(msg)["lines"]
+
+    def lock(self):
+        self._call({"lock": True})
+
+    def unlock(self):
+        self._call({"lock": False})
+
+    def stats(self):
+        """Display mode: (total, {(m, n): count})."""
+        response = StatsResponse()
+        for line in self.request(bytes([0, 0]), {"type": "stats"}):
+            response.feed(line)
+        return response.result()
+
+    def fetch(self, m, n, count):
+        """Display mode: the stored m x n matrices as StoredMatrix tuples."""
+        response = MatrixBlockResponse(m, n, count)
+        for line in self.request(bytes([m, n]), {"type": "block", "rows": m, "cols": n, "count": count}):
+            response.feed(line)
+        return response.result()
+
+
+def format_event(msg):
+    if "rx" in msg:
+        return f"RX  {msg['rx']}"
+    if "tx" in msg:
+        return f"TX  [{msg['client']}] {msg['tx']}"
+    if "join" in msg:
+        return f"--  client {msg['join']} joined as {msg['role']}"
+    if "leave" in msg:
+        return f"--  client {msg['leave']} left"
+    if "status" in msg:
+        return f"--  {msg['status']}"
+    return json.dumps(msg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Share one board between several programs.")
+    parser.add_argument("port", nargs="?", help="serial port or URL (default: auto-detect)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--low-latency", action="store_true")
+    parser.add_argument("--monitor", action="store_true", help="print the traffic of a running daemon")
+    args = parser.parse_args()
+
+    if args.monitor:
+        client = DaemonClient(args.socket, ROLE_MONITOR, on_event=lambda msg: print(format_event(msg)))
+        try:
+            client.wait_closed()
+        except KeyboardInterrupt:
+            client.close()
+        return
+
+    port = args.port
+    if port is None:
+        from .port_probe import find_board
+        port, results = find_board(args.baud, use_daemon=False)
+        for r in results:
+            print(f"Probe {r}")
+        if port is None:
+            print("No board found")
+            return
+    daemon = DeviceDaemon(port, args.baud, args.socket, low_latency=args.low_latency)
+    print(f"Serving {port} on {args.socket} (clients: daemon://{args.socket})")
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Several boards driven as one: independent jobs go to whichever board is free.
+
+    async with DevicePool(["/dev/ttyUSB0", "/dev/ttyUSB1", "socket://..."]) as pool:
+        await pool.scan()                          # boards in display mode: learn storage
+        futs = [pool.submit_calc("add", a, b) for a, b in pairs]
+        results = await asyncio.gather(*futs)
+        print(pool.report())
+
+Each board is an AsyncDevice on the pool's loop with a worker and its own
+job queue. A job needs a board in the right mode (the switches decide it:
+input jobs need mode-inp, generate mode-gen, calc mode-cal, scan mode-dis),
+and calc jobs also need both operands stored on that board. Jobs are queued
+on the least loaded board that can run them; a worker with nothing of its
+own to do steals the newest job it can run from the longest other queue.
+
+Calc operands are given by value (lists of int rows) and looked up in what
+the pool knows each board holds: matrices it stored through input/generate
+jobs, and everything a scan saw. A board keeps PHYSICAL_MAX_PER_DIM
+matrices per size and overwrites the oldest, which is tracked the same way.
+"""
+import asyncio
+import collections
+
+import numpy as np
+
+from .async_device import AsyncDevice
+from .fixed_width import decode_matrices, decode_rows
+from .matrix import Matrix
+from .protocol import MODE_PREFIX, PHYSICAL_MAX_PER_DIM, matrix_id
+
+JOB_INPUT = "input"
+JOB_GENERATE = "generate"
+JOB_CALC = "calc"
+JOB_SCAN = "scan"
+JOB_MODES = {JOB_INPUT: "inp", JOB_GENERATE: "gen", JOB_CALC: "cal", JOB_SCAN: "dis"}
+
+
+class BoardStorage:
+    """
+    What one board holds, as far as the pool has seen. The values of all
+    slots of a size are one (PHYSICAL_MAX_PER_DIM, m, n) array, so a scan's
+    decoded block goes in as it is and find() compares every slot of the
+    size in one pass.
+    """
+    def __init__(self):
+        self.slots = {}  # (m, n) -> [StoredMatrix or None] * PHYSICAL_MAX_PER_DIM
+        self.values = {}  # (m, n) -> int32 array of shape (PHYSICAL_MAX_PER_DIM, m, n)
+        self.next_slot = {}
+
+    def _size(self, size):
+        if size not in self.slots:
+            self.slots[size] = [None] * PHYSICAL_MAX_PER_DIM
+            self.values[size] = np.zeros((PHYSICAL_MAX_PER_DIM,) + size, dtype=np.int32)
+        return self.slots[size], self.values[size]
+
+    def store(self, mat):
+        """Record a new matrix; without an ID (generated) it gets the slot the board will use."""
+        size = (mat.rows, mat.cols)
+        if mat.id is None:
+            k = self.next_slot.get(size, 0)
+            mat = mat._replace(id=matrix_id(mat.rows, mat.cols, k))
+        else:
+            k = mat.id % PHYSICAL_MAX_PER_DIM
+        slots, values = self._size(size)
+        values[k] = decode_rows(mat.lines, mat.cols)
+        slots[k] = mat
+        self.next_slot[size] = (k + 1) % PHYSICAL_MAX_PER_DIM
+        return mat
+
+    def load(self, by_size):
+        """Replace the known contents with a scan result ({(m, n): [StoredMatrix]})."""
+        self.slots = {}
+        self.values = {}
+        for size, mats in by_size.items():
+            if not mats:
+                continue
+            slots, values = self._size(size)
+            ks = [mat.id % PHYSICAL_MAX_PER_DIM for mat in mats]
+            # One fixed-width pass per size, kept as the array it decodes to
+            values[ks] = decode_matrices(mats)
+            for k, mat in zip(ks, mats):
+                slots[k] = mat
+
+    def find(self, rows):
+        """The stored matrix equal to rows (list of int rows or a Matrix), or None."""
+        wanted = rows.numpy() if isinstance(rows, Matrix) else np.array(rows, dtype=np.int32)
+        slots = self.slots.get(wanted.shape)
+        if slots is None:
+            return None
+        for k in np.flatnonzero((self.values[wanted.shape] == wanted).all(axis=(1, 2))):
+            if slots[k] is not None:
+                return slots[k]
+        return None
+
+    def count(self):
+        return sum(mat is not None for slots in self.slots.values() for mat in slots)
+
+
+class Job:
+    def __init__(self, kind, args, future, pin=None):
+        self.kind = kind
+        self.mode = JOB_MODES[kind]
+        self.args = args
+        self.future = future
+        self.pin = pin
+        self.board = None
+
+
+class Board:
+    def __init__(self, name, device):
+        self.name = name
+        self.device = device
+        self.storage = BoardStorage()
+        self.queue = collections.deque()
+        self.wake = asyncio.Event()
+        self.worker = None
+        self.current = None
+        self.jobs = 0
+        self.failed = 0
+        self.stolen = 0
+        self.busy = 0.0
+
+    @property
+    def mode(self):
+        return self.device.ready_mode
+
+    def can_run(self, job):
+        if job.pin is not None and job.pin is not self:
+            return False
+        if self.mode != job.mode:
+            return False
+        if job.kind == JOB_CALC:
+            _, a, b = job.args
+            return self.storage.find(a) is not None and (b is None or self.storage.find(b) is not None)
+        return True
+
+
+class DevicePool:
+    def __init__(self, ports, baudrate=115200, work_stealing=True, modes=None, **device_options):
+        """
+        ports: serial ports or URLs, one per board. modes optionally gives
+        each board's current mode when its banner is not going to be seen
+        (the banner is printed when the switches change, before we open).
+        """
+        self.work_stealing = work_stealing
+        self.boards = []
+        for i, port in enumerate(ports):
+            device = AsyncDevice(port, baudrate, **device_options)
+            if modes:
+                device.mode = modes[i]
+            self.boards.append(Board(port, device))
+        self._loop = None
+        self._started = None
+        self._pending = set()
+
+    async def open(self):
+        self._loop = asyncio.get_running_loop()
+        for board in self.boards:
+            board.device.on_line = self._line_hook(board, board.device.on_line)
+            await board.device.open()
+            board.worker = asyncio.create_task(self._worker(board))
+        self._started = self._loop.time()
+        return self
+
+    async def close(self):
+        for board in self.boards:
+            if board.worker:
+                board.worker.cancel()
+        await asyncio.gather(*(b.worker for b in self.boards if b.worker), return_exceptions=True)
+        for board in self.boards:
+            for job in board.queue:
+                job.future.cancel()
+            board.queue.clear()
+            await board.device.close()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _line_hook(self, board, on_line):
+        def hook(line):
+            if on_line:
+                on_line(line)
+            if line.startswith(MODE_PREFIX) or board.device.ready_mode is None:
+                # The device updates its mode after this callback returns
+                self._loop.call_soon(self._poke)
+        return hook
+
+    # --- submitting ---
+
+    def _submit(self, kind, args, pin=None):
+        job = Job(kind, args, self._loop.create_future(), pin)
+        self._pending.add(job.future)
+        job.future.add_done_callback(self._pending.discard)
+        if pin is not None:
+            target = pin
+        else:
+            able = [b for b in self.boards if b.can_run(job)]
+            # Nobody can run it yet (e.g. no board in that mode): park it on
+            # the shortest queue; whoever can run it first will steal it
+            target = min(able or self.boards, key=self._load)
+        target.queue.append(job)
+        self._poke()
+        return job.future
+
+    def _load(self, board):
+        return len(board.queue) + (board.current is not None)
+
+    def submit_input(self, rows):
+        """Store rows (list of int rows) on a board in input mode. Resolves to the StoredMatrix."""
+        return self._submit(JOB_INPUT, (rows,))
+
+    def submit_generate(self, m, n, count=1):
+        """Generate count random m x n matrices on a board in gen mode. Resolves to [StoredMatrix]."""
+        return self._submit(JOB_GENERATE, (m, n, count))
+
+    def submit_calc(self, op, a, b=None):
+        """Run op on operands given by value on a board in calc mode that holds them. Resolves to CalcResult."""
+        return self._submit(JOB_CALC, (op, a, b))
+
+    async def broadcast_input(self, rows):
+        """Store rows on every board in input mode (operands for calcs anywhere). Returns [StoredMatrix]."""
+        return await asyncio.gather(*(self._submit(JOB_INPUT, (rows,), pin=b) for b in self.boards
+                                      if b.mode == "inp"))
+
+    async def wait_mode(self, mode, timeout=None):
+        """Wait until every board is in mode-<mode> and ready for input."""
+        await asyncio.wait_for(asyncio.gather(*(b.device.wait_mode(mode) for b in self.boards)), timeout)
+
+    async def scan(self):
+        """Learn the storage of every board currently in display mode."""
+        futs = [self._submit(JOB_SCAN, (), pin=b) for b in self.boards if b.mode == "dis"]
+        await asyncio.gather(*futs)
+
+    async def drain(self):
+        """Wait until every submitted job has finished (failures included)."""
+        while self._pending:
+            await asyncio.wait(set(self._pending))
+
+    # --- workers ---
+
+    def _poke(self):
+        for board in self.boards:
+            board.wake.set()
+
+    def _take(self, board):
+        for job in board.queue:
+            if board.can_run(job):
+                board.queue.remove(job)
+                return job
+        if not self.work_stealing:
+            return None
+        for victim in sorted(self.boards, key=lambda b: -len(b.queue)):
+            if victim is board:
+                continue
+            # Newest first: the victim is about to work on its oldest jobs
+            for job in reversed(victim.queue):
+                if board.can_run(job):
+                    victim.queue.remove(job)
+                    board.stolen += 1
+                    return job
+        return None
+
+    async def _worker(self, board):
+        while True:
+            board.wake.clear()
+            job = self._take(board)
+            if job is None:
+                await board.wake.wait()
+                continue
+            if job.future.done():
+                continue
+            job.board = board
+            board.current = job
+            t0 = self._loop.time()
+            try:
+                result = await self._run(board, job)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                board.failed += 1
+                # The caller may have given up on it (wait_for timeout, cancelled gather)
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            board.current = None
+            board.jobs += 1
+            board.busy += self._loop.time() - t0
+            self._poke()  # storage or mode may have changed what others can run
+
+    async def _run(self, board, job):
+        dev = board.device
+        if job.kind == JOB_INPUT:
+            return board.storage.store(await dev.input_matrix(*job.args))
+        if job.kind == JOB_GENERATE:
+            return [board.storage.store(mat) for mat in await dev.generate(*job.args)]
+        if job.kind == JOB_SCAN:
+            _, by_size = await dev.fetch_many()
+            board.storage.load(by_size)
+            return by_size
+        op, a, b = job.args
+        return await dev.calc(op, board.storage.find(a), board.storage.find(b) if b is not None else None)
+
+    # --- reporting ---
+
+    def reset_stats(self):
+        """Start a new measurement window for stats() and report()."""
+        self._started = self._loop.time()
+        for b in self.boards:
+            b.jobs = b.failed = b.stolen = 0
+            b.busy = 0.0
+
+    def stats(self):
+        """Per-board and aggregate counters since open()."""
+        wall = self._loop.time() - self._started if self._started is not None else 0.0
+        boards = [{
+            "name": b.name,
+            "mode": b.mode,
+            "jobs": b.jobs,
+            "failed": b.failed,
+            "stolen": b.stolen,
+            "queued": len(b.queue),
+            "stored": b.storage.count(),
+            "busy": b.busy,
+            "utilization": b.busy / wall if wall else 0.0,
+        } for b in self.boards]
+        jobs = sum(b["jobs"] for b in boards)
+        return {"wall": wall, "jobs": jobs, "throughput": jobs / wall if wall else 0.0, "boards": boards}
+
+    def report(self):
+        s = self.stats()
+        lines = [f"{s['jobs']} jobs in {s['wall']:.2f} s = {s['throughput']:.1f} jobs/s on {len(self.boards)} boards"]
+        for b in s["boards"]:
+            lines.append(f"  {b['name']:<24} {str(b['mode']):<4} jobs {b['jobs']:>4}  stolen {b['stolen']:>3}  "
+                         f"failed {b['failed']:>2}  queued {b['queued']:>3}  util {b['utilization'] * 100:5.1f}%")
+        return "\n".join(lines)
@@ -0,0 +1,102 @@
+import collections
+import threading
+import time
+
+# What put() does when the queue is full:
+#   "block"       - wait for the consumer to make room (backpressure; bytes
+#                   keep accumulating in the OS / driver buffer meanwhile)
+#   "drop_oldest" - discard the oldest queued item to make room
+#   "drop_newest" - discard the item being put
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+
+
+class DispatchQueue:
+    """
+    Bounded hand-off between a producer thread (the serial reader) and a
+    consumer thread (the dispatcher feeding parsers and UI), with an explicit
+    overflow policy and depth statistics.
+    """
+
+    def __init__(self, maxsize=4096, policy=OVERFLOW_BLOCK):
+        if policy not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+        self.enqueued = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+
+    def put(self, item):
+        """Queue an item. Returns False if it was dropped or the queue is closed."""
+        with self._lock:
+            if self._closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                if self.policy == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == OVERFLOW_DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    t0 = time.perf_counter()
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        self._not_full.wait()
+                    self.blocked_seconds += time.perf_counter() - t0
+                    if self._closed:
+                        return False
+            self._items.append(item)
+            self.enqueued += 1
+            depth = len(self._items)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._not_empty.notify()
+            return True
+
+    def get_batch(self, max_items=256):
+        """
+        Block until items are available and return up to max_items of them.
+        Returns an empty list once the queue is closed and fully drained.
+        """
+        with self._lock:
+            while not self._items and not self._closed:
+                self._not_empty.wait()
+            n = min(max_items, len(self._items))
+            batch = [self._items.popleft() for _ in range(n)]
+            self.dispatched += n
+            if n:
+                self._not_full.notify_all()
+            return batch
+
+    def close(self):
+        """Stop accepting items; the consumer still drains what is queued."""
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": len(self._items),
+                "max_depth": self.max_depth,
+                "capacity": self.maxsize,
+                "policy": self.policy,
+                "enqueued": self.enqueued,
+                "dispatched": self.dispatched,
+                "dropped": self.dropped,
+                "blocked_seconds": self.blocked_seconds,
+            }
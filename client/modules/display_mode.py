@@ -1,11 +1,15 @@
 import flet as ft
-import re
+from .line_tokenizer import LineTokenizer, MatrixRow, StatsRow, TableBorder, TableHeader
 from .ui_components import StyledCard
+from .matrix_gallery import MatrixGallery
+from .ui_scheduler import UpdateScheduler
 
 class DisplayMode(ft.Container):
-    def __init__(self, serial_manager):
+    def __init__(self, serial_manager, tokenizer=None, scheduler=None):
         super().__init__()
         self.serial = serial_manager
+        self.tokens = tokenizer or LineTokenizer()
+        self.ui = scheduler or UpdateScheduler(rate=0)
         self.expand = True
         self.padding = 20
         
@@ -16,17 +20,11 @@ class DisplayMode(ft.Container):
         self.current_req_m = 0
         self.current_req_n = 0
         
-        # Matrix parsing state
-        self.current_matrix_lines_left = 0
-        self.current_matrix_buffer = []
-        self.current_id = ""
-
         # UI
         self.stats_list = ft.ListView(expand=True, spacing=5)
         
-        # Use a Flow layout (Row with wrap) inside a scrollable Column for matrices
-        self.matrix_wrap = ft.Row(wrap=True, spacing=15, run_spacing=15, alignment=ft.MainAxisAlignment.START)
-        self.matrix_scroll = ft.Column([self.matrix_wrap], scroll=ft.ScrollMode.AUTO, expand=True)
+        # Pooled, paged card gallery (see modules/matrix_gallery.py)
+        self.gallery = MatrixGallery(title=lambda m: f"ID: {m.id}", expand=True)
         
         left_col = StyledCard(
             title="Statistics", icon=ft.Icons.ANALYTICS,
@@ -40,7 +38,7 @@ class DisplayMode(ft.Container):
         right_col = StyledCard(
             title="Matrices", icon=ft.Icons.GRID_VIEW,
             expand=True,
-            content=ft.Container(content=self.matrix_scroll, expand=True, bgcolor="background", border_radius=8, padding=15)
+            content=ft.Container(content=self.gallery, expand=True, bgcolor="background", border_radius=8, padding=15)
         )
 
         self.content = ft.Row([left_col, right_col], expand=True, spacing=20)
@@ -49,69 +47,53 @@ class DisplayMode(ft.Container):
         if self.serial.is_connected:
             # Send 0x00 0x00 as binary
             self.serial.send_bytes(bytes([0, 0]))
+            self.tokens.clear_expected()
             self.stats_list.controls.clear()
             self.parsing_table = False
             self.table_lines = []
-            self.update()
+            self.ui.mark(self)
 
     def request_matrices(self, m, n, count):
         if self.serial.is_connected:
             # Send m, n as binary bytes
             self.serial.send_bytes(bytes([m, n]))
+            self.tokens.clear_expected()
+            self.tokens.expect_matrices(m, count, each_row=False)
             
-            self.matrix_wrap.controls.clear()
+            self.gallery.clear()
             if self.page:
                 self.update()
             
             self.waiting_matrices_count = count
             self.current_req_m = m
             self.current_req_n = n
-            self.current_matrix_lines_left = 0
 
-    def handle_line(self, line):
-        # Check if it's a table line
-        if "+----" in line:
+    def handle_event(self, event):
+        kind = event.__class__
+        if kind is TableBorder:
             if not self.parsing_table:
                 # New table started, clear previous stats to prevent duplication
                 self.stats_list.controls.clear()
-                self.update()
+                self.ui.mark(self)
             self.parsing_table = True
             return
-        
-        if self.parsing_table:
-            # We are inside the table block
-            # Check if it's a data line like "| 2 | 2 | 1 |"
-            # Regex to match: | m | n | cnt |
-            match = re.search(r'\|\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|', line)
-            if match:
-                m, n, cnt = map(int, match.groups())
-                self.add_stat_item(m, n, cnt)
-                return
-            else:
-                # If line doesn't match and doesn't look like table border, table ended.
-                # Stop parsing table and fall through to matrix parsing
-                self.parsing_table = False
+        if kind is TableHeader:
+            return
+        if kind is StatsRow:
+            if self.parsing_table:
+                self.add_stat_item(event.m, event.n, event.count)
+            return
 
-        # If not parsing table, maybe we are receiving matrices?
-        if self.waiting_matrices_count > 0:
-            if self.current_matrix_lines_left == 0:
-                # Expecting ID
-                if not line.strip(): return # Skip empty lines between matrices
-                self.current_id = line.strip()
-                self.current_matrix_buffer = []
-                self.current_matrix_lines_left = self.current_req_m
+        # Anything else ends the table
+        self.parsing_table = False
+        if self.waiting_matrices_count <= 0:
+            return
+        if kind is MatrixRow and event.last:
+            if event.matrix is None:
+                print(f"Display Parse Error: matrix ending with {event.text!r}")
             else:
-                # Expecting Row
-                self.current_matrix_buffer.append(line)
-                self.current_matrix_lines_left -= 1
-                
-                if self.current_matrix_lines_left == 0:
-                    # Matrix Done
-                    self.add_matrix_card(self.current_id, self.current_matrix_buffer)
-                    self.waiting_matrices_count -= 1
-                    if self.waiting_matrices_count == 0:
-                        if self.page:
-                            self.update()
+                self.add_matrix_card(event.matrix)
+            self.waiting_matrices_count -= 1
 
     def add_stat_item(self, m, n, cnt):
         btn = ft.ElevatedButton(
@@ -119,34 +101,8 @@ class DisplayMode(ft.Container):
             on_click=lambda e: self.request_matrices(m, n, cnt)
         )
         self.stats_list.controls.append(btn)
-        self.stats_list.update()
+        self.ui.mark(self.stats_list)
 
-    def add_matrix_card(self, mid, lines):
-        text_block = "\n".join(lines)
-        card = ft.Container(
-            content=ft.Column([
-                ft.Container(
-                    content=ft.Text(f"ID: {mid}", weight=ft.FontWeight.BOLD, size=12, color="primary"),
-                    alignment=ft.alignment.center
-                ),
-                ft.Divider(height=1, color="outlineVariant"),
-                ft.Container(
-                    content=ft.Text(text_block, font_family="Consolas", size=16, weight=ft.FontWeight.BOLD),
-                    alignment=ft.alignment.center,
-                    padding=5
-                )
-            ], spacing=5),
-            bgcolor="surfaceVariant",
-            padding=10,
-            border_radius=8,
-            border=ft.border.all(1, "outlineVariant"),
-            shadow=ft.BoxShadow(
-                spread_radius=1,
-                blur_radius=3,
-                color="#4D000000",
-                offset=ft.Offset(0, 2),
-            )
-        )
-        self.matrix_wrap.controls.append(card)
-        if self.page:
-            self.update()
+    def add_matrix_card(self, matrix):
+        self.gallery.add(matrix)
+        self.ui.mark(self.gallery)
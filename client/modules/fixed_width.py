@@ -0,0 +1,81 @@
+"""
+Fixed-width decoding of whole blocks of matrix rows, for the device pool's
+storage arrays (modules/device_pool.py).
+
+matrix_uart_sender.sv left-aligns every element in NORM_WIDTH columns.
+With that layout known, a block of rows is one byte array: the (stripped)
+lines are padded back to full width, viewed as cells of NORM_WIDTH bytes
+and the digits of all cells are accumulated at once, one character column
+at a time.
+
+Rows that do not fit the layout (a value too wide for its column, which
+the board prints without any separator; extra spaces; a stray character)
+are decoded again the tolerant way, by whitespace split. What still does
+not parse raises ValueError.
+"""
+import numpy as np
+
+NORM_WIDTH = 5
+
+SPACE = ord(" ")
+MINUS = ord("-")
+ZERO = ord("0")
+
+
+def _pack(lines, width):
+    """lines padded to width as a (len(lines), width) uint8 array; longer or non-ASCII lines come out blank."""
+    text = "".join(line.ljust(width) for line in lines)
+    if len(text) != len(lines) * width or not text.isascii():
+        text = "".join(line.ljust(width) if len(line) <= width and line.isascii() else " " * width
+                       for line in lines)
+    return np.frombuffer(text.encode("ascii"), dtype=np.uint8).reshape(len(lines), width)
+
+
+def _cells(buf):
+    """
+    Values of the left-aligned cells along the last axis of buf, and which
+    of them are well formed: optional '-', digits, at least one space.
+    """
+    chars = np.ascontiguousarray(np.moveaxis(buf, -1, 0))  # one character position per plane
+    num = chars - np.uint8(ZERO)
+    digit = num < 10  # uint8 wraps around below '0'
+    space = chars == SPACE
+    neg = chars[0] == MINUS
+    ok = space[-1] & (digit[0] | (neg & digit[1]))
+    # Nothing but spaces after the first space, digits before it
+    ok &= ~(space[:-1] & ~space[1:]).any(axis=0)
+    ok &= (digit | space)[1:].all(axis=0)
+    # acc = acc * 10 + digit where there is one, acc * 1 + 0 elsewhere
+    scale = digit.view(np.uint8) * np.uint8(9) + np.uint8(1)
+    num *= digit
+    acc = np.zeros(buf.shape[:-1], dtype=np.int32)
+    for p in range(len(chars) - 1):
+        acc *= scale[p]
+        acc += num[p]
+    np.negative(acc, out=acc, where=neg)
+    return acc, ok
+
+
+def _tolerant_row(line, cols):
+    row = line.split()
+    if len(row) != cols:
+        raise ValueError(f"expected a row of {cols} values: {line!r}")
+    return [int(v) for v in row]
+
+
+def decode_rows(lines, cols):
+    """Matrix rows of cols elements each -> int array of shape (len(lines), cols)."""
+    buf = _pack(lines, cols * NORM_WIDTH)
+    values, ok = _cells(buf.reshape(len(lines), cols, NORM_WIDTH))
+    for i in np.flatnonzero(~ok.all(axis=1)):
+        values[i] = _tolerant_row(lines[i], cols)
+    return values
+
+
+def decode_matrices(mats):
+    """StoredMatrix list of one size -> int array of shape (count, rows, cols)."""
+    if not mats:
+        return np.zeros((0, 0, 0), dtype=np.int32)
+    rows, cols = mats[0].rows, mats[0].cols
+    return decode_rows([line for mat in mats for line in mat.lines], cols).reshape(len(mats), rows, cols)
+
@@ -1,10 +1,15 @@
 import flet as ft
-from .ui_components import StyledCard, MatrixDisplay
+from .line_tokenizer import LineTokenizer, MatrixRow
+from .ui_components import StyledCard
+from .matrix_gallery import MatrixGallery
+from .ui_scheduler import UpdateScheduler
 
 class GenMode(ft.Container):
-    def __init__(self, serial_manager):
+    def __init__(self, serial_manager, tokenizer=None, scheduler=None):
         super().__init__()
         self.serial = serial_manager
+        self.tokens = tokenizer or LineTokenizer()
+        self.ui = scheduler or UpdateScheduler(rate=0)
         self.expand = True
         self.padding = 20
         
@@ -13,18 +18,14 @@ class GenMode(ft.Container):
         self.gen_n = 3
         self.gen_k = 1
         self.matrices_to_receive = 0
-        self.current_matrix_lines_left = 0
-        self.current_matrix_buffer = []
-        self.current_id = ""
 
         # UI
         self.m_input = ft.TextField(label="Rows", value="3", width=60)
         self.n_input = ft.TextField(label="Cols", value="3", width=60)
         self.k_input = ft.TextField(label="Count", value="1", width=60)
         
-        # Use a Flow layout (Row with wrap) inside a scrollable Column
-        self.results_wrap = ft.Row(wrap=True, spacing=15, run_spacing=15, alignment=ft.MainAxisAlignment.START)
-        self.results_scroll = ft.Column([self.results_wrap], scroll=ft.ScrollMode.AUTO, expand=True)
+        # Pooled, paged card gallery (see modules/matrix_gallery.py)
+        self.gallery = MatrixGallery(expand=True)
 
         self.content = ft.Column([
             StyledCard(
@@ -47,7 +48,7 @@ class GenMode(ft.Container):
             StyledCard(
                 title="Generated Results", icon=ft.Icons.GRID_VIEW,
                 expand=True,
-                content=ft.Container(content=self.results_scroll, expand=True, bgcolor="background", border_radius=8, padding=15)
+                content=ft.Container(content=self.gallery, expand=True, bgcolor="background", border_radius=8, padding=15)
             )
         ])
 
@@ -97,60 +98,31 @@ class GenMode(ft.Container):
             self.serial.send_bytes(bytes([m, n, k]))
             
             self.matrices_to_receive = k
-            self.current_matrix_lines_left = m # Start expecting rows immediately
-            self.current_matrix_buffer = []
+            # Rows start immediately, no ID lines
+            self.tokens.clear_expected()
+            self.tokens.expect_matrices(m, k, ids=False, each_row=False)
             
             # Clear previous results
-            self.results_wrap.controls.clear()
+            self.gallery.clear()
             if self.page:
                 self.update()
             
         except ValueError:
             self.show_validation_error("请输入有效的数字")
 
-    def handle_line(self, line):
-        if self.matrices_to_receive <= 0:
+    def handle_event(self, event):
+        if self.matrices_to_receive <= 0 or event.__class__ is not MatrixRow or not event.last:
             return
 
-        # Directly collect matrix rows (No ID line)
-        self.current_matrix_buffer.append(line)
-        self.current_matrix_lines_left -= 1
+        # Matrix complete
+        # Do not generate ID as per user request
+        if event.matrix is None:
+            print(f"Gen Parse Error: matrix ending with {event.text!r}")
+        else:
+            self.add_matrix_to_ui(event.matrix)
         
-        if self.current_matrix_lines_left == 0:
-            # Matrix complete
-            # Do not generate ID as per user request
-            self.add_matrix_to_ui(self.current_matrix_buffer)
-            
-            self.matrices_to_receive -= 1
-            self.current_matrix_buffer = []
-            self.current_matrix_lines_left = self.gen_m
-            
-            if self.matrices_to_receive == 0:
-                # Generation complete
-                if self.page:
-                    self.update()
+        self.matrices_to_receive -= 1
 
-    def add_matrix_to_ui(self, lines):
-        text_block = "\n".join(lines)
-        card = ft.Container(
-            content=ft.Column([
-                ft.Container(
-                    content=ft.Text(text_block, font_family="Consolas", size=16, weight=ft.FontWeight.BOLD),
-                    alignment=ft.alignment.center,
-                    padding=10
-                )
-            ]),
-            bgcolor="surfaceVariant",
-            padding=5,
-            border_radius=8,
-            border=ft.border.all(1, "outlineVariant"),
-            shadow=ft.BoxShadow(
-                spread_radius=1,
-                blur_radius=3,
-                color="#4D000000", # 0.3 opacity black
-                offset=ft.Offset(0, 2),
-            )
-        )
-        self.results_wrap.controls.append(card)
-        if self.page:
-            self.update()
+    def add_matrix_to_ui(self, matrix):
+        self.gallery.add(matrix)
+        self.ui.mark(self.gallery)
@@ -1,11 +1,15 @@
 import flet as ft
+from .line_tokenizer import LineTokenizer, MatrixId, MatrixRow
 from .ui_components import StyledCard, MatrixInputGrid, MatrixDisplay
+from .ui_scheduler import UpdateScheduler
 
 class InputMode(ft.Container):
-    def __init__(self, serial_manager, config):
+    def __init__(self, serial_manager, config, tokenizer=None, scheduler=None):
         super().__init__()
         self.serial = serial_manager
         self.config = config
+        self.tokens = tokenizer or LineTokenizer()
+        self.ui = scheduler or UpdateScheduler(rate=0)
         self.expand = True
         self.padding = 20
         
@@ -13,9 +17,8 @@ class InputMode(ft.Container):
         self.current_rows = 3
         self.current_cols = 3
         self.expecting_response = False
-        self.response_lines_left = 0
-        self.collected_matrix_lines = []
-        self.collected_id = ""
+        self.stored_matrix = None
+        self.echo_rows = None
 
         # UI Components
         self.rows_input = ft.TextField(label="Rows", value="3", width=60, on_change=self.update_grid_dims)
@@ -143,33 +146,39 @@ class InputMode(ft.Container):
         
         # Prepare to receive response
         self.expecting_response = True
-        self.response_lines_left = self.current_rows
-        self.collected_matrix_lines = []
-        self.collected_id = ""
+        self.stored_matrix = None
+        # The board echoes the stored matrix: its ID, then its rows
+        self.tokens.clear_expected()
+        self.tokens.expect_matrices(self.current_rows)
         
         self.result_display.update_matrix("Waiting...")
         self.result_id_display.value = "ID: ??"
         self.update()
 
-    def handle_line(self, line):
-        """Called by main loop when a line is received in this mode"""
+    def handle_event(self, event):
+        """Called by main loop with each tokenized line received in this mode"""
         if not self.expecting_response:
             return
 
-        if not self.collected_id:
-            # First line is ID
-            self.collected_id = line.strip()
-            self.result_id_display.value = f"ID: {self.collected_id}"
-            if self.result_id_display.page:
-                self.result_id_display.update()
-        else:
-            # Subsequent lines are matrix rows
-            self.collected_matrix_lines.append(line)
-            self.response_lines_left -= 1
-            
-            # Update display progressively
-            full_text = "\n".join(self.collected_matrix_lines)
-            self.result_display.update_matrix(full_text)
-            
-            if self.response_lines_left <= 0:
-                self.expecting_response = False
+        kind = event.__class__
+        if kind is MatrixId:
+            self.result_id_display.value = f"ID: {event.id}"
+            self.ui.mark(self.result_id_display)
+        elif kind is MatrixRow and event.row is not None:
+            # Show each echoed row as it arrives
+            if event.row == 0:
+                self.echo_rows = self.result_display.start_rows()
+                self.ui.mark(self.result_display)
+            try:
+                changed = self.echo_rows.append_row(event.values)
+            except ValueError:
+                changed = self.echo_rows.append_row(event.text)
+            self.ui.mark(changed)
+            if not event.last:
+                return
+            self.expecting_response = False
+            if event.matrix is None:
+                print(f"Input Parse Error: echo ending with {event.text!r}")
+                self.result_display.update_matrix("Unreadable echo")
+                return
+            self.stored_matrix = event.matrix
@@ -0,0 +1,42 @@
+class LineFramer:
+    """
+    Splits a serial byte stream into newline-terminated lines.
+
+    Only the incomplete tail of the stream is buffered, in one growable
+    bytearray. A chunk without a newline is appended to it and nothing
+    else; a chunk with one is split at its last newline, the part before
+    it (joined to the buffered tail, if any) is split into lines in a
+    single C-level pass, and the part after it becomes the new tail. Every
+    byte is searched once and copied a bounded number of times, however
+    the stream is chunked. Lines are returned as raw bytes; decoding is
+    left to whoever dispatches them. There is no size limit: a burst of
+    any length is split into its lines.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    @property
+    def pending(self):
+        """Number of buffered bytes that do not form a complete line yet."""
+        return len(self._buf)
+
+    def reset(self):
+        self._buf.clear()
+
+    def feed(self, data):
+        """Append a chunk (bytes) and return the complete lines it finished,
+        without their line terminators (surrounding whitespace is kept)."""
+        end = data.rfind(b"\n")
+        buf = self._buf
+        if end < 0:
+            buf += data
+            return []
+        if buf:
+            buf += data[:end]
+            block = bytes(buf)
+            buf.clear()
+        else:
+            block = data[:end]
+        buf += data[end + 1:]
+        return block.split(b"\n")
@@ -0,0 +1,214 @@
+"""
+One-pass classification of the board's text lines into typed events.
+
+Every line is looked at once, by its first character, and turned into a
+small __slots__ event. The GUI modes consume those instead of re-matching
+strings, and the table / total / ID heuristics live only here.
+
+A line holding a single number is ambiguous on its own: it can be the
+total above a summary table, a matrix ID or a row of a one-column matrix.
+Whoever sends a request that is answered with matrices tells the tokenizer
+what to expect (expect_matrices); single numbers are then IDs or rows as
+that layout says, and summary totals otherwise.
+
+Rows of an expected matrix are collected as they come, and the row that
+completes it carries them; its matrix property parses them into a Matrix
+on first use, so the modes never parse row text themselves and nobody
+pays for a Matrix that is not looked at. A mode that only wants whole
+matrices says so (each_row=False), and the rows before the last then
+come as one shared MatrixLine instead of an event each: the bulk of a
+browse costs a list append per line.
+"""
+import collections
+
+from .matrix import Matrix
+from .protocol import MODE_PREFIX
+
+
+class Event:
+    __slots__ = ()
+
+
+class ModeSwitch(Event):
+    __slots__ = ("mode",)
+
+    def __init__(self, mode):
+        self.mode = mode
+
+
+class StatsTotal(Event):
+    __slots__ = ("total",)
+
+    def __init__(self, total):
+        self.total = total
+
+
+class StatsRow(Event):
+    __slots__ = ("m", "n", "count")
+
+    def __init__(self, m, n, count):
+        self.m = m
+        self.n = n
+        self.count = count
+
+
+class TableBorder(Event):
+    __slots__ = ()
+
+
+class TableHeader(Event):
+    __slots__ = ()
+
+
+class MatrixId(Event):
+    __slots__ = ("id", "rows")
+
+    def __init__(self, mid, rows):
+        self.id = mid
+        self.rows = rows
+
+
+class MatrixRow(Event):
+    """
+    row is the index within the expected matrix (None if none was expected);
+    last closes it and carries the whole matrix (None if a row did not
+    parse). values and the matrix are only parsed when asked for, so a
+    consumer that only wants the text pays nothing for them.
+    """
+    __slots__ = ("text", "row", "last", "_lines", "_id", "_matrix", "_values")
+
+    def __init__(self, text, row=None, last=False, lines=None, mid=None):
+        self.text = text
+        self.row = row
+        self.last = last
+        self._lines = lines
+        self._id = mid
+
+    @property
+    def lines(self):
+        """Text of every row of the matrix this row completes (None unless last)."""
+        return self._lines
+
+    @property
+    def values(self):
+        try:
+            return self._values
+        except AttributeError:
+            self._values = [int(v) for v in self.text.split()]
+            return self._values
+
+    @property
+    def matrix(self):
+        try:
+            return self._matrix
+        except AttributeError:
+            pass
+        matrix = None
+        if self._lines is not None:
+            try:
+                matrix = Matrix.from_lines(self._lines, self._id)
+            except ValueError:
+                pass
+        self._matrix = matrix
+        return matrix
+
+
+class MatrixLine(Event):
+    """A row of an expected matrix that is not its last, when its rows were not asked for one by one."""
+    __slots__ = ()
+
+
+class Text(Event):
+    """Anything else (banners, prompts, damaged lines)."""
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+# Field-less events are shared
+BORDER = TableBorder()
+HEADER = TableHeader()
+MATRIX_LINE = MatrixLine()
+NUMBER_START = frozenset("-0123456789")
+
+
+class LineTokenizer:
+    def __init__(self):
+        self._expected = collections.deque()  # (rows, with_id, each_row) per matrix still to come
+        self._rows = 0
+        self._row = None  # index of the next row of the current matrix, None between matrices
+        self._each_row = True
+        self._id = None
+        self._lines = []
+
+    def expect_matrices(self, rows, count=1, ids=True, each_row=True):
+        """
+        count matrices of rows lines each are coming, each after an ID line
+        if ids. Unless each_row, only their last rows are MatrixRow events
+        and the others are MATRIX_LINE.
+        """
+        self._expected.extend([(rows, ids, each_row)] * count)
+
+    def clear_expected(self):
+        self._expected.clear()
+        self._row = None
+
+    @property
+    def expecting(self):
+        return self._row is not None or bool(self._expected)
+
+    def feed(self, line):
+        """Classify one stripped line."""
+        first = line[:1]
+        if first in NUMBER_START:
+            row = self._row
+            if row is not None:
+                # Inside an expected matrix, the bulk of the traffic
+                self._lines.append(line)
+                if row + 1 >= self._rows:
+                    self._row = None
+                    return MatrixRow(line, row, True, self._lines, self._id)
+                self._row = row + 1
+                return MatrixRow(line, row, False) if self._each_row else MATRIX_LINE
+            return self._number(line)
+        if first == "+":
+            return BORDER
+        if first == "|":
+            # |m   |n   |cnt   |
+            cells = line.split("|")
+            try:
+                return StatsRow(int(cells[1]), int(cells[2]), int(cells[3]))
+            except (ValueError, IndexError):
+                return HEADER
+        if first == "m" and line.startswith(MODE_PREFIX):
+            self.clear_expected()
+            return ModeSwitch(line[len(MODE_PREFIX):])
+        return Text(line)
+
+    def _number(self, line):
+        # Not inside a matrix: an ID, a total, the first row of a matrix
+        # without ID, or a row nobody asked for
+        single = None
+        if " " not in line:
+            try:
+                single = int(line)
+            except ValueError:
+                return Text(line)
+        if not self._expected:
+            return MatrixRow(line) if single is None else StatsTotal(single)
+        rows, ids, self._each_row = self._expected.popleft()
+        self._rows = rows
+        self._lines = []
+        if ids and single is not None:
+            self._id = single
+            self._row = 0
+            return MatrixId(single, rows)
+        # No ID expected, or the ID line is missing: this is the first row
+        self._id = None
+        self._lines.append(line)
+        if rows <= 1:
+            self._row = None
+            return MatrixRow(line, 0, True, self._lines, self._id)
+        self._row = 1
+        return MatrixRow(line, 0, False) if self._each_row else MATRIX_LINE
@@ -0,0 +1,177 @@
+"""
+Link health: round-trip time, jitter and byte errors on a live connection.
+
+Every interval the monitor pings the board with a UART break
+(send_break): the line is held low for PING_BREAK, longer than any byte,
+so the ping is out of band and cannot be taken as data in any mode. The
+board answers with PONG (0x06) and the number of pings it has received
+(8 bits, wrapping), slotted in between the bytes of whatever it is
+printing. SerialManager strips those pairs from the stream before line
+framing and reports them here with their arrival time.
+
+- RTT is measured from the start of the break to the pong arriving (OS,
+  USB-UART and wire included; the board answers about a byte time into
+  the break).
+- Jitter is the RFC 3550 running estimate of RTT variation.
+- A ping with no pong within timeout is lost. The count in the next pong
+  tells whether the board got it and only the pong was lost (pong_lost).
+- Byte errors are RX bytes that cannot be part of a reply (the board only
+  prints ASCII text and newlines) and pong counts that do not add up.
+
+A break needs a real UART: ptys and socket:// ports drop it, so every ping
+there is lost.
+"""
+import statistics
+import threading
+import time
+
+from .protocol import PING_BREAK
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_TIMEOUT = 0.5
+# Recent RTT samples kept for min / mean / p95
+RTT_WINDOW = 64
+# Bytes the board can print: printable ASCII, \r, \n, tab
+TEXT_BYTES = bytes(range(0x20, 0x7F)) + b"\r\n\t"
+
+
+def send_break(ser, started=None):
+    """
+    Ping the board on ser: wait for queued output to go out (a break would
+    cut a byte short), then hold the line low for PING_BREAK. started() is
+    called as the break begins.
+    """
+    ser.flush()
+    ser.break_condition = True
+    try:
+        if started:
+            started()
+        time.sleep(PING_BREAK)
+    finally:
+        ser.break_condition = False
+
+
+class LinkMonitor:
+    def __init__(self, send_ping, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT):
+        """
+        send_ping(started): sends one ping and calls started() as it goes
+        out; not at all if the port cannot send (SerialManager.send_ping).
+        """
+        self.send_ping = send_ping
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._outstanding = None  # send time of the ping in flight
+        self._last_count = None
+        self._missed = 0  # pings written off since the last pong
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pings = 0
+            self.pongs = 0
+            self.lost = 0
+            self.pong_lost = 0
+            self.late = 0
+            self._missed = 0
+            self.rx_bytes = 0
+            self.byte_errors = 0
+            self.rtts = []
+            self.rtt_last = None
+            self.jitter = 0.0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                if self._outstanding is not None:
+                    if time.perf_counter() - self._outstanding < self.timeout:
+                        continue
+                    self.lost += 1
+                    self._missed += 1
+                    self._outstanding = None
+            self.send_ping(self._started)
+
+    def _started(self):
+        with self._lock:
+            self._outstanding = time.perf_counter()
+            self.pings += 1
+
+    # --- called from the reader thread ---
+
+    def on_rx(self, data):
+        """Raw RX bytes with the pong pairs already taken out."""
+        bad = len(data.translate(None, TEXT_BYTES))
+        with self._lock:
+            self.rx_bytes += len(data)
+            self.byte_errors += bad
+
+    def on_pong(self, count, now):
+        with self._lock:
+            self.rx_bytes += 2
+            received = None
+            if self._last_count is not None:
+                received = (count - self._last_count) & 0xFF
+            self._last_count = count
+            if self._outstanding is None:
+                # Answer to a ping already written off as lost
+                self.late += 1
+                self.lost = max(0, self.lost - 1)
+                self._missed = 0
+                return
+            rtt = now - self._outstanding
+            self._outstanding = None
+            self.pongs += 1
+            if received == 0 or (received is not None and received > 1 + self._missed):
+                # The board cannot have seen more pings than were sent
+                self.byte_errors += 1
+            elif received is not None and received > 1:
+                # Earlier pings got there; their pongs did not
+                self.pong_lost += received - 1
+            self._missed = 0
+            if self.rtt_last is not None:
+                self.jitter += (abs(rtt - self.rtt_last) - self.jitter) / 16
+            self.rtt_last = rtt
+            self.rtts.append(rtt)
+            if len(self.rtts) > RTT_WINDOW:
+                del self.rtts[0]
+
+    def stats(self):
+        with self._lock:
+            rtts = sorted(self.rtts)
+            return {
+                "pings": self.pings,
+                "pongs": self.pongs,
+                "lost": self.lost,
+                "pong_lost": self.pong_lost,
+                "late": self.late,
+                "loss": self.lost / self.pings if self.pings else 0.0,
+                "rtt_last": self.rtt_last,
+                "rtt_min": rtts[0] if rtts else None,
+                "rtt_mean": statistics.fmean(rtts) if rtts else None,
+                "rtt_p95": rtts[int(len(rtts) * 0.95)] if rtts else None,
+                "jitter": self.jitter,
+                "rx_bytes": self.rx_bytes,
+                "byte_errors": self.byte_errors,
+                "byte_error_rate": self.byte_errors / self.rx_bytes if self.rx_bytes else 0.0,
+            }
+
+    def summary(self):
+        s = self.stats()
+        if not s["pongs"]:
+            return f"Link: {s['pings']} pings, no replies yet"
+        return (f"Link: RTT {s['rtt_last'] * 1000:.1f} ms (min {s['rtt_min'] * 1000:.1f}, "
+                f"p95 {s['rtt_p95'] * 1000:.1f}), jitter {s['jitter'] * 1000:.2f} ms, "
+                f"lost {s['lost']}/{s['pings']}, byte errors {s['byte_errors']}/{s['rx_bytes']}")
@@ -0,0 +1,254 @@
+import threading
+import time
+
+import flet as ft
+
+from .log_index import LogIndex, SEARCH_LIMIT, message_text
+
+DEFAULT_CAPACITY = 50_000
+# Rows that exist as controls at any time
+DEFAULT_WINDOW = 200
+# Records paged in when the view is scrolled to an edge
+PAGE = 100
+HIGHLIGHT = ft.Colors.with_opacity(0.25, ft.Colors.PRIMARY)
+
+
+class LogRing:
+    """
+    Fixed-capacity ring of log records; once full, each append overwrites
+    the oldest. Records are addressed by sequence number (0 for the first
+    record ever appended), so a position stays valid while the ring wraps.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self._buf = [None] * self.capacity
+        self.total = 0  # records ever appended, i.e. the next sequence number
+
+    def append(self, record):
+        self._buf[self.total % self.capacity] = record
+        self.total += 1
+
+    @property
+    def first(self):
+        """Sequence number of the oldest record still held."""
+        return max(0, self.total - self.capacity)
+
+    def __len__(self):
+        return self.total - self.first
+
+    def get(self, seq):
+        return self._buf[seq % self.capacity]
+
+    def range(self, start, stop):
+        """(seq, record) for the records held in [start, stop)."""
+        buf, cap = self._buf, self.capacity
+        return [(seq, buf[seq % cap]) for seq in range(max(start, self.first), min(stop, self.total))]
+
+
+class LogConsole(ft.ListView):
+    """
+    Drop-in for the console ListView. Lines are stored as compact records
+    (time, kind, text, cont) in a LogRing and only a window of them exists
+    as controls. append() only records; rows are built when the view is
+    next pushed (before_update), and only for the newest `window` records,
+    so a burst between two frames costs one row per visible line at most.
+    Scrolling to the top pages older records in, scrolling back to the
+    bottom pages forward until the view follows the tail again. Memory is
+    bounded by the ring capacity however long the session runs.
+
+    render(record) builds the row control for a record; cont marks a line
+    continuing the previous entry (v1 groups RX bursts that way). When the
+    window starts inside such a group, its first row is rendered as a
+    header (cont cleared) so no row is shown without one. append() does
+    not push anything, the caller updates or marks the view.
+
+    Every record is also added to a LogIndex as it arrives; search() queries
+    it and show() jumps the view to a result. A message may be bytes (sent
+    data): it is kept raw and only turned into hex (message_text) when its
+    row is rendered, so recording TX costs nothing while nobody looks.
+    """
+
+    def __init__(self, render, capacity=DEFAULT_CAPACITY, window=DEFAULT_WINDOW, **kwargs):
+        super().__init__(spacing=2, auto_scroll=True, on_scroll=self._on_scroll,
+                         on_scroll_interval=100, **kwargs)
+        self.render = render
+        self.ring = LogRing(capacity)
+        self.index = LogIndex(self.ring)
+        self.window = min(window, capacity)
+        self.start = 0  # sequence number of the first row shown
+        self.follow = True
+        self._built = 0  # records up to here have rows (while following)
+        self._lock = threading.Lock()
+
+    def append(self, kind, msg, cont=False):
+        record = (time.time(), kind, msg, cont)
+        with self._lock:
+            self.index.add(self.ring.total, msg)
+            self.ring.append(record)
+
+    def before_update(self):
+        # Called by Flet while building the update: catch up with the tail
+        with self._lock:
+            total = self.ring.total
+            if not self.follow or self._built == total:
+                return
+            rows = self.controls
+            first = rows[0] if rows else None
+            rows += [self._row(seq, record) for seq, record in self.ring.range(max(self._built, total - self.window), total)]
+            if len(rows) > self.window:
+                del rows[:len(rows) - self.window]
+            self.start = total - len(rows)
+            self._built = total
+            if rows[0] is not first:
+                self._head()
+
+    def clear(self):
+        with self._lock:
+            self.ring.clear()
+            self.index.clear()
+            self.controls.clear()
+            self.start = 0
+            self._built = 0
+            self.follow = True
+            self.auto_scroll = True
+
+    def _row(self, seq, record):
+        row = self.render(record)
+        row.key = str(seq)
+        return row
+
+    def _head(self):
+        # The window starts inside a grouped burst whose header row is not
+        # in it: the first continuation row is rendered as a header instead
+        rows = self.controls
+        if rows:
+            record = self.ring.get(self.start)
+            if record[3]:
+                rows[0] = self._row(self.start, record[:3] + (False,))
+
+    def _show(self, start):
+        # Caller holds the lock
+        ring = self.ring
+        self.start = max(start, ring.first)
+        self.follow = self.start + self.window >= ring.total
+        self.auto_scroll = self.follow
+        self.controls = [self._row(seq, record) for seq, record in ring.range(self.start, self.start + self.window)]
+        self._built = self.start + len(self.controls)
+        self._head()
+
+    def page_back(self):
+        with self._lock:
+            if self.start <= self.ring.first:
+                return
+            anchor = self.start
+            self._show(self.start - PAGE)
+            self.follow = False
+            self.auto_scroll = False
+        self.update()
+        # Keep the line that was on top in place
+        self.scroll_to(key=str(anchor), duration=0)
+
+    def page_forward(self):
+        with self._lock:
+            if self.follow:
+                return
+            anchor = self.start + len(self.controls) - 1
+            self._show(min(self.start + PAGE, self.ring.total - self.window))
+        self.update()
+        if not self.follow:
+            self.scroll_to(key=str(anchor), duration=0)
+
+    def search(self, query, kinds=None, limit=SEARCH_LIMIT, substring=False):
+        """Sequence numbers of matching records, newest first (see LogIndex.search)."""
+        with self._lock:
+            return self.index.search(query, kinds, limit, substring)
+
+    def show(self, seq):
+        """Move the window around record seq and scroll to it; False if it was overwritten."""
+        with self._lock:
+            if not self.ring.first <= seq < self.ring.total:
+                return False
+            self._show(seq - self.window // 2)
+            self.follow = False
+            self.auto_scroll = False
+            self.controls[seq - self.start].bgcolor = HIGHLIGHT
+        self.update()
+        self.scroll_to(key=str(seq), duration=300)
+        return True
+
+    def _on_scroll(self, e):
+        if e.event_type != "end":
+            return
+        if e.pixels <= e.min_scroll_extent:
+            self.page_back()
+        elif e.pixels >= e.max_scroll_extent:
+            self.page_forward()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "records": len(self.ring),
+                "capacity": self.ring.capacity,
+                "total": self.ring.total,
+                "overwritten": self.ring.first,
+                "rows": len(self.controls),
+                "start": self.start,
+                "follow": self.follow,
+            }
+
+
+class LogSearchBar(ft.Row):
+    """
+    Search field for a LogConsole. Enter searches (tokens, or an exact
+    substring in double quotes), the arrows step through the hits from the
+    newest to older ones and the console jumps to each.
+    """
+
+    def __init__(self, console):
+        super().__init__(spacing=0, vertical_alignment=ft.CrossAxisAlignment.CENTER)
+        self.console = console
+        self.hits = []
+        self.pos = 0
+        self.field = ft.TextField(hint_text='Search log: ID 7, mode-cal, "exact"', dense=True, width=240,
+                                  text_size=12, on_submit=self.run)
+        self.kind = ft.Dropdown(
+            value="all", width=90, dense=True, text_size=12,
+            options=[ft.dropdown.Option(key, label) for key, label in
+                     (("all", "All"), ("rx", "RX"), ("tx", "TX"), ("info", "INF"), ("error", "ERR"))],
+            on_change=self.run,
+        )
+        self.count = ft.Text("", size=11, color=ft.Colors.OUTLINE)
+        self.controls = [
+            self.field, self.kind, self.count,
+            ft.IconButton(ft.Icons.KEYBOARD_ARROW_UP, icon_size=16, tooltip="Older", on_click=lambda e: self.step(1)),
+            ft.IconButton(ft.Icons.KEYBOARD_ARROW_DOWN, icon_size=16, tooltip="Newer", on_click=lambda e: self.step(-1)),
+        ]
+
+    def run(self, e=None):
+        query = self.field.value or ""
+        substring = len(query) > 2 and query[0] == query[-1] == '"'
+        if substring:
+            query = query[1:-1]
+        kinds = None if self.kind.value == "all" else {self.kind.value}
+        self.hits = self.console.search(query, kinds, substring=substring) if query.strip() else []
+        self.pos = 0
+        self._jump()
+
+    def step(self, delta):
+        if self.hits:
+            self.pos = (self.pos + delta) % len(self.hits)
+            self._jump()
+
+    def _jump(self):
+        if self.hits:
+            more = "+" if len(self.hits) >= SEARCH_LIMIT else ""
+            self.count.value = f"{self.pos + 1}/{len(self.hits)}{more}"
+            if not self.console.show(self.hits[self.pos]):
+                self.count.value += " (overwritten)"
+        else:
+            self.count.value = "no match" if self.field.value else ""
+        self.count.update()
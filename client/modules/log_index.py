@@ -0,0 +1,133 @@
+"""
+Incremental search index over the records of a LogRing.
+
+Every record's text is split into lower-cased tokens (runs of letters,
+digits and '_', joined by '-', so "mode-dis" and "ID" are tokens, and -7 is
+found as "7"). Each token maps to the ascending sequence numbers of the
+records containing it, kept in an array('q'). A token query intersects the
+posting lists of its tokens, starting from the shortest and walking it
+newest first. A query of several tokens is then matched as a phrase: they
+must appear next to each other and in the query's order, punctuation
+between them ignored, so "ID 7" finds "ID: 7" but neither "7 ID" nor
+"ID = 0x 7". Its cost depends on how often the rarest query token occurs
+(and stops at limit hits), not on the number of lines held.
+
+Memory: 8 bytes per distinct token per record, plus one dict entry per
+distinct token (board output has a few hundred: numbers and keywords).
+Records the ring has overwritten are trimmed from the lists every
+`capacity` appends, so the lists never hold more than two ring-fulls.
+
+Substring queries (exact and case-sensitive, e.g. "ode-ca") have no index;
+they scan the held records newest first, 0.1-0.2 us a record.
+
+Sent data (TX records) is held as raw bytes; its tokens are the bytes in
+hex, and it is matched as the upper-case hex it is shown as (message_text).
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r"\w+(?:-\w+)*")
+SEARCH_LIMIT = 500
+
+
+def message_text(msg):
+    """A record's message as it is shown: bytes as upper-case hex."""
+    return msg.hex(" ").upper() if isinstance(msg, bytes) else msg
+
+
+def _contains(postings, seq):
+    i = bisect_left(postings, seq)
+    return i < len(postings) and postings[i] == seq
+
+
+class LogIndex:
+    def __init__(self, ring):
+        self.ring = ring
+        self.clear()
+
+    def clear(self):
+        self.postings = {}
+        self._since_trim = 0
+
+    def add(self, seq, text):
+        """Index the record appended to the ring as seq (in ascending order)."""
+        postings = self.postings
+        if isinstance(text, bytes):
+            tokens = set(text.hex(" ").split())
+        else:
+            tokens = set(TOKEN_RE.findall(text.lower()))
+        for token in tokens:
+            p = postings.get(token)
+            if p is None:
+                postings[token] = array("q", (seq,))
+            else:
+                p.append(seq)
+        self._since_trim += 1
+        if self._since_trim >= self.ring.capacity:
+            self.trim()
+
+    def trim(self):
+        """Drop postings of overwritten records."""
+        first = self.ring.first
+        for token in list(self.postings):
+            p = self.postings[token]
+            i = bisect_left(p, first)
+            if i == len(p):
+                del self.postings[token]
+            elif i:
+                del p[:i]
+        self._since_trim = 0
+
+    def search(self, query, kinds=None, limit=SEARCH_LIMIT, substring=False):
+        """
+        Sequence numbers of the records matching query, newest first (at
+        most limit): its tokens as one phrase, or the exact text if
+        substring. kinds: optional set of record kinds to keep.
+        """
+        ring = self.ring
+        first = ring.first
+        hits = []
+        if substring:
+            for seq in range(ring.total - 1, first - 1, -1):
+                record = ring.get(seq)
+                if query in message_text(record[2]) and (not kinds or record[1] in kinds):
+                    hits.append(seq)
+                    if len(hits) >= limit:
+                        break
+            return hits
+
+        tokens = TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return hits
+        lists = []
+        for token in set(tokens):
+            p = self.postings.get(token)
+            if p is None:
+                return hits
+            lists.append(p)
+        lists.sort(key=len)
+        shortest, others = lists[0], lists[1:]
+        phrase = f" {' '.join(tokens)} " if len(tokens) > 1 else None
+        for i in range(len(shortest) - 1, -1, -1):
+            seq = shortest[i]
+            if seq < first:
+                break
+            if others and not all(_contains(p, seq) for p in others):
+                continue
+            record = ring.get(seq)
+            if kinds and record[1] not in kinds:
+                continue
+            if phrase and phrase not in f" {' '.join(TOKEN_RE.findall(message_text(record[2]).lower()))} ":
+                continue
+            hits.append(seq)
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def stats(self):
+        return {
+            "tokens": len(self.postings),
+            "postings": sum(len(p) for p in self.postings.values()),
+            "bytes": sum(p.itemsize * len(p) for p in self.postings.values()),
+        }
@@ -0,0 +1,194 @@
+"""
+Persistent log of the console and the serial traffic, written off the UI
+and reader threads.
+
+Records are JSON lines, {"t": wall time, "kind": ..., "msg": ...}, kinds
+being the console's ("info", "error", ...) plus "rx" (a received line),
+"tx" (sent bytes, as hex) and "status". They go to gzip-compressed files
+
+    <directory>/log-YYYYmmdd-HHMMSS.jsonl.gz
+
+that are rotated after max_bytes of uncompressed records or max_age
+seconds, keeping the newest `keep` files. A file cut short by a crash is
+readable up to its last flush (at most FLUSH_INTERVAL old).
+
+    python -m modules.log_sink logs/log-20250101-120000.jsonl.gz     # print records
+"""
+import argparse
+import datetime
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+
+from .dispatch_queue import DispatchQueue, OVERFLOW_DROP_NEWEST
+
+DEFAULT_DIRECTORY = "logs"
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_AGE = 3600
+DEFAULT_KEEP = 10
+# Records waiting for the writer; beyond that new ones are dropped (counted)
+DEFAULT_QUEUE_SIZE = 16384
+# Compressed data is made readable at least this often
+FLUSH_INTERVAL = 1.0
+PATTERN = "log-*.jsonl.gz"
+
+
+class LogSink:
+    """
+    put() only appends to a bounded DispatchQueue and never blocks: when the
+    disk cannot keep up the queue fills and further records are dropped and
+    counted (and a "sink" record says how many), instead of stalling the
+    serial reader or the UI. A writer thread takes records in batches,
+    encodes them and feeds the gzip stream.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 keep=DEFAULT_KEEP, queue_size=DEFAULT_QUEUE_SIZE, compresslevel=6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.compresslevel = compresslevel
+        self.queue = DispatchQueue(queue_size, OVERFLOW_DROP_NEWEST)
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = None
+        self._file = None
+        self._gz = None
+        self._opened = 0.0
+        self._size = 0
+
+        self.records = 0
+        self.bytes_in = 0
+        self.files = 0
+        self.write_seconds = 0.0
+        self._reported_drops = 0
+
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def put(self, kind, msg):
+        """Queue a record; msg is text, or bytes (logged as hex). Safe from any thread."""
+        self.queue.put((time.time(), kind, msg))
+
+    def close(self):
+        """Write what is queued and close the current file."""
+        self.queue.close()
+        self.thread.join()
+
+    def _open(self):
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"log-{stamp}.jsonl.gz")
+        n = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"log-{stamp}-{n}.jsonl.gz")
+            n += 1
+        self.path = path
+        self._file = open(path, "wb")
+        self._gz = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=self.compresslevel)
+        self._opened = time.time()
+        self._size = 0
+        self.files += 1
+        self._prune()
+
+    def _close_file(self):
+        if self._gz is not None:
+            self._gz.close()
+            self._file.close()
+            self._gz = self._file = None
+
+    def _prune(self):
+        try:
+            paths = sorted(glob.glob(os.path.join(self.directory, PATTERN)), key=os.path.getmtime)
+            for path in paths[:max(0, len(paths) - self.keep)]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Log Sink Error: {e}")
+
+    def _encode(self, batch):
+        lines = []
+        for t, kind, msg in batch:
+            if isinstance(msg, (bytes, bytearray)):
+                msg = msg.hex(" ").upper()
+            lines.append(json.dumps({"t": round(t, 6), "kind": kind, "msg": msg}, ensure_ascii=False))
+        dropped = self.queue.dropped
+        if dropped != self._reported_drops:
+            lines.append(json.dumps({"t": round(time.time(), 6), "kind": "sink",
+                                     "msg": f"{dropped - self._reported_drops} records dropped (queue full)"}))
+            self._reported_drops = dropped
+        lines.append("")
+        return "\n".join(lines).encode("utf-8")
+
+    def _write_loop(self):
+        flushed = time.perf_counter()
+        try:
+            while True:
+                batch = self.queue.get_batch(1024)
+                if not batch:
+                    break  # closed and drained
+                t0 = time.perf_counter()
+                data = self._encode(batch)
+                if self._gz is None or self._size >= self.max_bytes or time.time() - self._opened >= self.max_age:
+                    self._close_file()
+                    self._open()
+                self._gz.write(data)
+                self._size += len(data)
+                self.records += len(batch)
+                self.bytes_in += len(data)
+                now = time.perf_counter()
+                if now - flushed >= FLUSH_INTERVAL:
+                    self._gz.flush(zlib.Z_SYNC_FLUSH)
+                    flushed = now
+                self.write_seconds += now - t0
+        except Exception as e:
+            print(f"Log Sink Error: {e}")
+        finally:
+            self._close_file()
+
+    def stats(self):
+        q = self.queue.stats()
+        return {
+            "path": self.path,
+            "records": self.records,
+            "queued": q["depth"],
+            "max_queued": q["max_depth"],
+            "dropped": q["dropped"],
+            "bytes_in": self.bytes_in,
+            "files": self.files,
+            "write_seconds": self.write_seconds,
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"Log: {s['records']} records, {s['bytes_in'] / 1e6:.1f} MB in {s['files']} file(s), "
+                f"{s['dropped']} dropped, queue peak {s['max_queued']}")
+
+
+def read_log(path):
+    """Yields the records of a log file as dicts; stops quietly where a crash cut it short."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return  # partial last line
+        except (EOFError, zlib.error):
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the records of a console log file.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    for r in read_log(args.path):
+        stamp = datetime.datetime.fromtimestamp(r["t"]).strftime("%H:%M:%S.%f")[:-3]
+        print(f"{stamp} {r['kind']:<6} {r['msg']}")
+
+
+if __name__ == "__main__":
+    main()
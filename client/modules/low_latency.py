@@ -0,0 +1,121 @@
+"""
+Opt-in "low latency" profile for USB-UART bridges.
+
+On Linux, USB-serial drivers batch received bytes behind a latency timer
+(16 ms by default on FTDI parts) unless the port has ASYNC_LOW_LATENCY set.
+apply_low_latency() tries every knob that exists for the given port and
+records what it could and could not change, so ptys and non-Linux hosts
+simply fall back to the normal configuration. A setting that already had
+the low-latency value is reported but not counted as applied: the profile
+is only active when it changed something. Remote links (socket://
+stand-ins, daemon:// shared boards) have no local tty to tune; they are
+reported as not applicable rather than unsupported.
+"""
+import os
+import sys
+
+# URL schemes whose bytes travel over a socket, not a local tty
+REMOTE_SCHEMES = ("socket://", "daemon://")
+
+try:
+    import termios
+except ImportError:  # Windows
+    termios = None
+
+
+class LowLatencyReport:
+    """Outcome of each tuning step: (setting, applied, detail)."""
+    def __init__(self, port):
+        self.port = port
+        self.items = []
+
+    def add(self, setting, applied, detail):
+        self.items.append((setting, applied, detail))
+
+    @property
+    def applied(self):
+        """Settings this profile changed."""
+        return [name for name, ok, _ in self.items if ok]
+
+    @property
+    def active(self):
+        return bool(self.applied)
+
+    def summary(self):
+        if not self.items:
+            return "nothing to tune"
+        return ", ".join(f"{name}: {detail}" for name, _, detail in self.items)
+
+    def __str__(self):
+        return f"{self.port} low latency -> {self.summary()}"
+
+
+def apply_low_latency(ser, port):
+    report = LowLatencyReport(port)
+    if port.startswith(REMOTE_SCHEMES):
+        report.add("tty", False, "not applicable: remote/daemon link")
+        return report
+    if not hasattr(ser, "fileno"):
+        report.add("tty", False, f"no fd on {sys.platform}")
+        return report
+
+    _set_async_low_latency(ser, report)
+    _set_latency_timer(port, report)
+    _set_vmin_vtime(ser, report)
+    return report
+
+
+def _set_async_low_latency(ser, report):
+    # pyserial wraps the TIOCGSERIAL/TIOCSSERIAL dance on Linux only
+    if not hasattr(ser, "set_low_latency_mode"):
+        report.add("ASYNC_LOW_LATENCY", False, "unsupported on this platform")
+        return
+    try:
+        ser.set_low_latency_mode(True)
+        report.add("ASYNC_LOW_LATENCY", True, "set")
+    except (ValueError, OSError, NotImplementedError) as e:
+        # ptys and many CDC-ACM drivers reject TIOCSSERIAL
+        report.add("ASYNC_LOW_LATENCY", False, f"rejected ({_reason(e)})")
+
+
+def _set_latency_timer(port, report):
+    # FTDI-style drivers expose the batching timer in sysfs (milliseconds)
+    name = os.path.basename(os.path.realpath(port))
+    path = f"/sys/bus/usb-serial/devices/{name}/latency_timer"
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path) as f:
+            before = f.read().strip()
+        if before == "1":
+            report.add("latency_timer", False, "already 1 ms")
+            return
+        with open(path, "w") as f:
+            f.write("1")
+        report.add("latency_timer", True, f"{before} -> 1 ms")
+    except OSError as e:
+        report.add("latency_timer", False, f"not writable ({_reason(e)})")
+
+
+def _set_vmin_vtime(ser, report):
+    # The reader waits in select(), so reads must return whatever is buffered
+    # at once: no minimum byte count and no inter-byte timer.
+    if termios is None:
+        return
+    try:
+        fd = ser.fileno()
+        attrs = termios.tcgetattr(fd)
+        cc = attrs[6]
+        if cc[termios.VMIN] == 0 and cc[termios.VTIME] == 0:
+            report.add("VMIN/VTIME", False, "already 0/0")
+            return
+        cc[termios.VMIN] = 0
+        cc[termios.VTIME] = 0
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        report.add("VMIN/VTIME", True, "set 0/0")
+    except (termios.error, OSError, ValueError) as e:
+        report.add("VMIN/VTIME", False, f"rejected ({_reason(e)})")
+
+
+def _reason(e):
+    return str(e).split(":")[-1].strip() or e.__class__.__name__
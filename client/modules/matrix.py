@@ -0,0 +1,91 @@
+"""
+Compact matrix value shared by the modes, the tokenizer and the device pool.
+
+Elements live in one flat array: array('b') while they all fit in int8
+(everything the board stores), array('i') otherwise (calculation results).
+A Matrix is built once from what the board printed and compared, hashed,
+formatted and handed to NumPy without going back to text. Treat it as
+immutable.
+"""
+from array import array
+
+NORM_WIDTH = 5
+# typecode -> dtype name
+DTYPES = {"b": "int8", "i": "int32"}
+
+
+def format_row(values, width=NORM_WIDTH):
+    """One row as the board prints it: values left-aligned in width columns."""
+    return "".join(f"{v:<{width}}" for v in values).rstrip()
+
+
+class Matrix:
+    __slots__ = ("id", "rows", "cols", "data")
+
+    def __init__(self, rows, cols, values, mid=None):
+        """values: the rows * cols elements, row by row (a sequence of ints)."""
+        try:
+            data = array("b", values)
+        except OverflowError:
+            data = array("i", values)
+        if len(data) != rows * cols:
+            raise ValueError(f"{len(data)} values for a {rows}x{cols} matrix")
+        self.id = mid
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, rows, mid=None):
+        """From a list of int rows."""
+        cols = len(rows[0]) if rows else 0
+        if any(len(row) != cols for row in rows):
+            raise ValueError("rows of different lengths")
+        return cls(len(rows), cols, [v for row in rows for v in row], mid)
+
+    @classmethod
+    def from_lines(cls, lines, mid=None):
+        """From row lines as the board prints them (whitespace-separated values)."""
+        cols = len(lines[0].split()) if lines else 0
+        if any(len(line.split()) != cols for line in lines):
+            raise ValueError("rows of different lengths")
+        return cls(len(lines), cols, list(map(int, " ".join(lines).split())), mid)
+
+    @property
+    def dtype(self):
+        return DTYPES[self.data.typecode]
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def row(self, i):
+        return self.data[i * self.cols:(i + 1) * self.cols].tolist()
+
+    def tolist(self):
+        """List of int rows."""
+        return [self.row(i) for i in range(self.rows)]
+
+    def __getitem__(self, index):
+        i, j = index
+        return self.data[i * self.cols + j]
+
+    def text(self, width=NORM_WIDTH):
+        """Rows as the board prints them: values left-aligned in width columns."""
+        return "\n".join(format_row(self.row(i), width) for i in range(self.rows))
+
+    def numpy(self):
+        import numpy as np
+        return np.frombuffer(self.data, dtype=self.dtype).reshape(self.rows, self.cols)
+
+    def __eq__(self, other):
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        # Values only: the same matrix stored under two IDs is equal
+        return self.rows == other.rows and self.cols == other.cols and self.data == other.data
+
+    def __hash__(self):
+        return hash((self.rows, self.cols, tuple(self.data)))
+
+    def __repr__(self):
+        return f"Matrix({self.rows}x{self.cols}, id={self.id}, {self.dtype}, {self.tolist()})"
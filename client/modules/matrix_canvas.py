@@ -0,0 +1,100 @@
+import base64
+import threading
+
+import flet as ft
+
+from .matrix import Matrix
+
+# Flet shows src_base64 as SVG when the document carries this attribute
+SVG_NS = ' xmlns="http://www.w3.org/2000/svg"'
+
+CELL_FILL = "#ECEFF1"
+TEXT_FILL = "#263238"
+# Heatmap: negative values shade to blue, positive to red, 0 stays white
+HEAT_NEG = (69, 117, 180)
+HEAT_POS = (215, 48, 39)
+
+
+def heat_color(value, scale):
+    t = max(-1.0, min(1.0, value / scale)) if scale else 0.0
+    r, g, b = HEAT_POS if t > 0 else HEAT_NEG
+    t = abs(t)
+    return "#%02X%02X%02X" % (round(255 + (r - 255) * t), round(255 + (g - 255) * t), round(255 + (b - 255) * t))
+
+
+class MatrixCanvas(ft.Image):
+    """
+    A whole matrix drawn as one SVG image: one control and one property per
+    update, whatever the matrix size, where a grid of Text cells costs two
+    controls per cell. Each cell's SVG fragment is kept, so set_cell() only
+    re-renders that cell (and re-joins the document) before the caller
+    updates the control.
+
+    heatmap colors cells by value, scaled to the largest magnitude shown;
+    a set_cell() beyond that scale recolors the other cells too.
+    """
+
+    def __init__(self, matrix=None, cell=36, font_size=13, heatmap=False, **kwargs):
+        kwargs.setdefault("gapless_playback", True)
+        super().__init__(**kwargs)
+        self.cell = cell
+        self.font_size = font_size
+        self.heatmap = heatmap
+        self.rows = 0
+        self.cols = 0
+        self.values = []  # flat, row by row
+        self.scale = 0
+        self._cells = []  # SVG fragment per cell
+        self._lock = threading.Lock()
+        self.set_matrix(matrix if matrix is not None else [])
+
+    def set_matrix(self, matrix):
+        """matrix: a Matrix or a list of int rows."""
+        if isinstance(matrix, Matrix):
+            rows, cols, values = matrix.rows, matrix.cols, matrix.data.tolist()
+        else:
+            rows, cols = len(matrix), len(matrix[0]) if matrix else 0
+            values = [v for row in matrix for v in row]
+        with self._lock:
+            self.rows, self.cols, self.values = rows, cols, values
+            self.scale = max(map(abs, values), default=0)
+            self._cells = [self._cell(k) for k in range(len(values))]
+            self._render()
+
+    def set_cell(self, i, j, value):
+        with self._lock:
+            k = i * self.cols + j
+            self.values[k] = value
+            if self.heatmap and abs(value) > self.scale:
+                self.scale = abs(value)
+                self._cells = [self._cell(n) for n in range(len(self.values))]
+            else:
+                self._cells[k] = self._cell(k)
+            self._render()
+
+    def set_heatmap(self, on):
+        with self._lock:
+            if on != self.heatmap:
+                self.heatmap = on
+                self._cells = [self._cell(k) for k in range(len(self.values))]
+                self._render()
+
+    def _cell(self, k):
+        i, j = divmod(k, self.cols)
+        size = self.cell
+        value = self.values[k]
+        fill = heat_color(value, self.scale) if self.heatmap else CELL_FILL
+        # Text is centered on the cell; y is its baseline
+        x = j * size + size / 2
+        y = i * size + size / 2 + self.font_size * 0.35
+        return (f'<rect x="{j * size + 1}" y="{i * size + 1}" width="{size - 2}" height="{size - 2}" rx="4" '
+                f'fill="{fill}"/><text x="{x:g}" y="{y:g}">{value}</text>')
+
+    def _render(self):
+        width, height = max(1, self.cols * self.cell), max(1, self.rows * self.cell)
+        svg = (f'<svg{SVG_NS} width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+               f'<g font-family="Consolas, monospace" font-size="{self.font_size}" fill="{TEXT_FILL}" '
+               f'text-anchor="middle">{"".join(self._cells)}</g></svg>')
+        self.src_base64 = base64.b64encode(svg.encode()).decode()
+        self.width = width
+        self.height = height
@@ -0,0 +1,131 @@
+import threading
+
+import flet as ft
+
+# Cards that exist as controls; more matrices are reached with the pager
+DEFAULT_PAGE_SIZE = 48
+
+
+class MatrixCard(ft.Container):
+    """A gallery card. show() refills it in place, so one control serves many matrices."""
+
+    def __init__(self, titled, size, on_select=None):
+        super().__init__()
+        self.matrix = None
+        self.title = ft.Text("", weight=ft.FontWeight.BOLD, size=12, color="primary")
+        self.body = ft.Text("", font_family="Consolas", size=size, weight=ft.FontWeight.BOLD)
+        column = []
+        if titled:
+            column.append(ft.Container(content=self.title, alignment=ft.alignment.center))
+            column.append(ft.Divider(height=1, color="outlineVariant"))
+        column.append(ft.Container(content=self.body, alignment=ft.alignment.center, padding=5))
+        if on_select:
+            column.append(ft.Container(
+                content=ft.Text("SELECT", size=10, weight=ft.FontWeight.BOLD, color="onPrimary"),
+                bgcolor="primary", padding=5, border_radius=4,
+                alignment=ft.alignment.center
+            ))
+            # Reads the card's current matrix, so recycling needs no new handler
+            self.on_click = lambda e: on_select(self.matrix)
+            self.animate_scale = ft.Animation(100, ft.AnimationCurve.EASE_OUT)
+        self.content = ft.Column(column, spacing=5)
+        self.bgcolor = "surfaceVariant"
+        self.padding = 10
+        self.border_radius = 8
+        self.border = ft.border.all(1, "outlineVariant")
+        self.shadow = ft.BoxShadow(
+            spread_radius=1,
+            blur_radius=3,
+            color="#4D000000",
+            offset=ft.Offset(0, 2),
+        )
+
+    def show(self, matrix, title):
+        self.matrix = matrix
+        self.title.value = title
+        self.body.value = matrix.text()
+        self.visible = True
+
+
+class MatrixGallery(ft.Column):
+    """
+    Wrapping card gallery shared by the display, generation and calculation
+    modes. Only one page of cards (page_size) exists as controls. Cards come
+    from a pool that grows to page_size and is never cleared: clear() hides
+    them, add() and paging refill them in place. After the first fill, a new
+    request or a page turn only changes two texts per card instead of
+    building and diffing a card tree per matrix.
+
+    title(matrix) gives a card's header (no header if title is None).
+    on_select(matrix) makes the cards clickable. The gallery scrolls by
+    itself unless scroll=None is passed (inside a scrolling parent). add()
+    and clear() do not push anything; the caller updates or marks the
+    gallery.
+    """
+
+    def __init__(self, title=None, size=16, on_select=None, page_size=DEFAULT_PAGE_SIZE, **kwargs):
+        kwargs.setdefault("scroll", ft.ScrollMode.AUTO)
+        super().__init__(**kwargs)
+        self.title = title
+        self.size = size
+        self.on_select = on_select
+        self.page_size = page_size
+        self.matrices = []
+        self.first = 0  # index of the matrix on the first card
+        self.cards_created = 0
+        self._lock = threading.Lock()
+
+        self.wrap = ft.Row(wrap=True, spacing=15, run_spacing=15, alignment=ft.MainAxisAlignment.START)
+        self.pager_text = ft.Text("", size=11, color=ft.Colors.OUTLINE)
+        self.pager = ft.Row([
+            ft.IconButton(ft.Icons.CHEVRON_LEFT, icon_size=18, on_click=lambda e: self.turn(-1)),
+            self.pager_text,
+            ft.IconButton(ft.Icons.CHEVRON_RIGHT, icon_size=18, on_click=lambda e: self.turn(1)),
+        ], alignment=ft.MainAxisAlignment.CENTER, visible=False)
+        self.controls = [self.wrap, self.pager]
+
+    def add(self, matrix):
+        with self._lock:
+            self.matrices.append(matrix)
+            slot = len(self.matrices) - 1 - self.first
+            if slot < self.page_size:
+                self._fill(slot, matrix)
+            self._update_pager()
+
+    def clear(self):
+        with self._lock:
+            self.matrices = []
+            self.first = 0
+            for card in self.wrap.controls:
+                card.visible = False
+            self._update_pager()
+
+    def turn(self, delta):
+        """Show the next (1) or previous (-1) page."""
+        with self._lock:
+            last = max(0, (len(self.matrices) - 1) // self.page_size * self.page_size)
+            first = min(max(0, self.first + delta * self.page_size), last)
+            if first == self.first:
+                return
+            self.first = first
+            shown = self.matrices[first:first + self.page_size]
+            for slot, matrix in enumerate(shown):
+                self._fill(slot, matrix)
+            for card in self.wrap.controls[len(shown):]:
+                card.visible = False
+            self._update_pager()
+        self.update()
+        if self.scroll:
+            self.scroll_to(offset=0, duration=0)
+
+    def _fill(self, slot, matrix):
+        cards = self.wrap.controls
+        if slot == len(cards):
+            cards.append(MatrixCard(self.title is not None, self.size, self.on_select))
+            self.cards_created += 1
+        cards[slot].show(matrix, self.title(matrix) if self.title else "")
+
+    def _update_pager(self):
+        n = len(self.matrices)
+        self.pager.visible = n > self.page_size
+        self.pager_text.value = f"{self.first + 1}-{min(self.first + self.page_size, n)} of {n}"
@@ -0,0 +1,117 @@
+HEADER = 0xAA
+MAX_DIM = 5
+# Turned into spaces before splitting into tokens
+SEPARATORS = str.maketrans("|\r\n\t", "    ")
+# A run of text this long without a separator is not a number
+MAX_TOKEN = 32
+
+
+def _is_int(token):
+    return (token[1:] if token.startswith("-") else token).isdecimal()
+
+
+class PacketFramer:
+    """
+    Streaming parser for the matrix packets of the text console: the header
+    170 (0xAA), rows, cols and rows * cols values, as whitespace or '|'
+    separated numbers.
+
+    Each chunk is split and converted to ints once (a token that is not a
+    number becomes None); only the unfinished token after its last
+    separator and the values of an unfinished packet (at most
+    3 + MAX_DIM * MAX_DIM) are carried over. A read cursor then walks the
+    values: headers are found with list.index from the cursor and packets
+    are sliced out whole, so the cost is linear in the input however large
+    the burst, and nothing is truncated. Other console output (tables,
+    banners, words) is expected and only counted; framing failures are
+    counted apart, so callers can report them:
+
+    - skipped: tokens outside any packet (other console output)
+    - resyncs: headers rejected for out-of-range or missing dimensions; the
+      170 is skipped and the scan resumes right after it
+    - truncated: packets cut short by a token that is not a number (or a
+      run of more than MAX_TOKEN characters) before all their values came;
+      the scan resumes at that token
+    """
+
+    def __init__(self):
+        self.packets = 0
+        self.skipped = 0
+        self.resyncs = 0
+        self.truncated = 0
+        self.reset()
+
+    def reset(self):
+        self._tail = ""
+        self._packet = []
+
+    @property
+    def pending(self):
+        """Values of the packet being collected (header included)."""
+        return len(self._packet)
+
+    def feed(self, text):
+        """Append a chunk of console text and return the packets it completed, as (rows, cols, values)."""
+        text = (self._tail + text).translate(SEPARATORS)
+        cut = text.rfind(" ")
+        self._tail = text[cut + 1:]
+        overlong = len(self._tail) > MAX_TOKEN
+        if overlong:
+            self._tail = ""
+        elif cut < 0:
+            return []
+        tokens = text[:cut].split() if cut > 0 else []
+        try:
+            values = list(map(int, tokens))
+            gaps = overlong
+        except ValueError:
+            values = [int(t) if _is_int(t) else None for t in tokens]
+            gaps = True
+        if overlong:
+            values.append(None)
+        if self._packet:
+            values = self._packet + values
+        return self._frame(values, gaps)
+
+    def _frame(self, values, gaps):
+        out = []
+        i = 0
+        end = len(values)
+        rest = []
+        while i < end:
+            try:
+                start = values.index(HEADER, i)
+            except ValueError:
+                self.skipped += end - i
+                break
+            self.skipped += start - i
+            if start + 3 > end:
+                if gaps and None in values[start + 1:]:
+                    # Not a header after all: resume right after the 170
+                    self.resyncs += 1
+                    self.skipped += 1
+                    i = start + 1
+                    continue
+                rest = values[start:]
+                break
+            rows, cols = values[start + 1], values[start + 2]
+            if rows is None or cols is None or not (0 < rows <= MAX_DIM and 0 < cols <= MAX_DIM):
+                # Not a header after all: the dimensions may hold the real one
+                self.resyncs += 1
+                self.skipped += 1
+                i = start + 1
+                continue
+            stop = start + 3 + rows * cols
+            packet = values[start + 3:stop]
+            if gaps and None in packet:
+                self.truncated += 1
+                i = start + 3 + packet.index(None)
+                continue
+            if stop > end:
+                rest = values[start:]
+                break
+            out.append((rows, cols, packet))
+            i = stop
+        self._packet = rest
+        self.packets += len(out)
+        return out
@@ -0,0 +1,175 @@
+"""
+Find the matrix calculator among the serial ports.
+
+Every candidate port is opened concurrently and sent the link ping, a UART
+break (see modules/link_monitor.py): the board answers it in every mode with
+PONG and a count, and nothing about its state changes, so probing never
+disturbs a session. A port counts as identified once it replies to the ping,
+or prints a mode-xxx banner or a summary table. A port that opens but says
+nothing is not the board. All probes share one deadline, and the last port
+that was identified is remembered so the next start can try it alone first.
+While a device daemon is running it owns the board, so its daemon:// URL is
+used without probing anything.
+"""
+import json
+import os
+import threading
+import time
+
+import serial
+
+from .line_framer import LineFramer
+from .link_monitor import send_break
+from .protocol import MODE_PREFIX, PONG, SUMMARY_BORDER, SUMMARY_HEADER
+from .protocol_daemon import DEFAULT_URL, daemon_running
+
+PROBE_DEADLINE = 1.5
+QUICK_PROBE = 0.3
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".fpga_matrix_client.json")
+
+
+class ProbeResult:
+    def __init__(self, device, description=""):
+        self.device = device
+        self.description = description
+        self.opened = False
+        self.identified = False
+        self.evidence = ""
+        self.error = ""
+        self.elapsed = 0.0
+
+    def __str__(self):
+        if self.identified:
+            state = f"board ({self.evidence})"
+        elif self.opened:
+            state = "no answer"
+        else:
+            state = self.error or "timed out"
+        return f"{self.device}: {state} in {self.elapsed * 1000:.0f} ms"
+
+
+def candidate_ports():
+    """USB serial ports, higher numbers first (the board usually enumerates last)."""
+    import serial.tools.list_ports  # off the startup path (slow on Windows)
+    ports = [p for p in serial.tools.list_ports.comports() if "USB" in p.description or "USB" in p.hwid]
+    return list(reversed(ports))
+
+
+def probe_port(device, baudrate=115200, deadline=None, stop=None, description=""):
+    """Open device, ping it and watch the reply until deadline (perf_counter)."""
+    result = ProbeResult(device, description)
+    t0 = time.perf_counter()
+    if deadline is None:
+        deadline = t0 + PROBE_DEADLINE
+    ser = None
+    try:
+        ser = serial.Serial(device, baudrate, timeout=0.02, write_timeout=0.2)
+        result.opened = True
+        send_break(ser)
+        framer = LineFramer()
+        # The last chunk ended with PONG; its count byte is still to come
+        pong = False
+        while time.perf_counter() < deadline and not (stop and stop.is_set()):
+            data = ser.read(256)
+            if not data:
+                continue
+            if pong or PONG in data[:-1]:
+                result.identified, result.evidence = True, "ping reply"
+                break
+            pong = data[-1] == PONG
+            for line in framer.feed(data):
+                line = line.strip().decode("utf-8", errors="replace")
+                if line.startswith(MODE_PREFIX):
+                    result.identified, result.evidence = True, line
+                elif line in (SUMMARY_BORDER, SUMMARY_HEADER):
+                    result.identified, result.evidence = True, "summary table"
+            if result.identified:
+                break
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+    finally:
+        if ser is not None:
+            try:
+                ser.close()
+            except Exception:
+                pass
+        result.elapsed = time.perf_counter() - t0
+    return result
+
+
+def probe_ports(ports, baudrate=115200, timeout=PROBE_DEADLINE):
+    """
+    Probe all ports (devices or ListPortInfo) at once. Returns one
+    ProbeResult per port, in the given order, as soon as a board is
+    identified or the shared deadline passes.
+    """
+    deadline = time.perf_counter() + timeout
+    found = threading.Event()
+    results = {}
+
+    def worker(device, description):
+        r = probe_port(device, baudrate, deadline, found, description)
+        results[device] = r
+        if r.identified:
+            found.set()
+
+    threads = []
+    for p in ports:
+        device = getattr(p, "device", p)
+        description = getattr(p, "description", "")
+        t = threading.Thread(target=worker, args=(device, description), daemon=True)
+        t.start()
+        threads.append((device, description, t))
+    for _, _, t in threads:
+        # A port stuck in open() must not hold up the rest
+        t.join(max(0.0, deadline - time.perf_counter()) + 0.05)
+    out = []
+    for device, description, _ in threads:
+        r = results.get(device)
+        if r is None:
+            r = ProbeResult(device, description)
+            r.elapsed = timeout
+        out.append(r)
+    return out
+
+
+def find_board(baudrate=115200, timeout=PROBE_DEADLINE, use_cache=True, ports=None, use_daemon=True):
+    """
+    Returns (device or None, [ProbeResult]). ports defaults to
+    candidate_ports(). The cached last-good port is tried alone first;
+    otherwise every candidate is probed. Only a port that identified
+    itself is returned: one that merely opened is never a guess.
+    """
+    if use_daemon and daemon_running():
+        return DEFAULT_URL, []
+    if ports is None:
+        ports = candidate_ports()
+    devices = [getattr(p, "device", p) for p in ports]
+    last = load_last_port() if use_cache else None
+    if last and last in devices:
+        r = probe_port(last, baudrate, time.perf_counter() + QUICK_PROBE)
+        if r.identified:
+            return last, [r]
+
+    results = probe_ports(ports, baudrate, timeout)
+    for r in results:
+        if r.identified:
+            save_last_port(r.device)
+            return r.device, results
+    return None, results
+
+
+def load_last_port():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f).get("last_port")
+    except (OSError, ValueError):
+        return None
+
+
+def save_last_port(device):
+    try:
+        with open(CACHE_PATH, "w") as f:
+            json.dump({"last_port": device}, f)
+    except OSError as e:
+        print(f"Could not save last port: {e}")
@@ -0,0 +1,177 @@
+"""
+Text protocol spoken by the board (see src/common/matrix_uart_sender.sv).
+
+Every reply the FPGA prints is a fixed sequence of lines, so each one has a
+small response object here: feed() it lines until it returns True (or until
+finished() says no lines are coming), then read its result. The framer
+already drops blank lines, so none of them rely on the empty separator lines
+the board prints.
+"""
+import re
+from collections import namedtuple
+
+CMD_CONFIRM = 0xFF
+CMD_ESC = 0xFE
+# Link ping: a UART break (the line held low for longer than a byte), so no
+# byte value is taken from the data in any mode. Answered with PONG and an
+# 8-bit ping count, slotted in between the bytes of whatever the board prints.
+PING_BREAK = 0.002
+PONG = 0x06
+
+# Calculation opcodes accepted in SELECT_OP
+OP_ADD = "add"
+OP_MUL = "mul"
+OP_SCALAR = "scalar"
+OP_TRANSPOSE = "transpose"
+OP_CONV = "conv"
+OP_CODES = {
+    OP_ADD: b"A",
+    OP_MUL: b"B",
+    OP_SCALAR: b"C",
+    OP_TRANSPOSE: b"T",
+    OP_CONV: b"J",
+}
+
+MODE_PREFIX = "mode-"
+MAX_DIM = 5
+PHYSICAL_MAX_PER_DIM = 2
+CONV_RESULT_ROWS = 8
+
+SUMMARY_BORDER = "+----+----+------+"
+SUMMARY_HEADER = "|  m |  n |  cnt |"
+STAT_ROW_RE = re.compile(r'\|\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|')
+
+StoredMatrix = namedtuple("StoredMatrix", "id rows cols lines")
+CalcResult = namedtuple("CalcResult", "op a b rows")
+
+
+def matrix_id(m, n, k=0):
+    """ID of the k-th stored matrix of size m x n."""
+    return ((m - 1) * MAX_DIM + (n - 1)) * PHYSICAL_MAX_PER_DIM + k
+
+
+def result_rows(op, a, b=None):
+    if op == OP_CONV:
+        return CONV_RESULT_ROWS
+    if op == OP_TRANSPOSE:
+        return a.cols
+    return a.rows
+
+
+def check_operands(op, a, b=None):
+    """Raise ValueError for operand shapes the board would reject."""
+    if op not in OP_CODES:
+        raise ValueError(f"Unknown operation: {op}")
+    if op in (OP_ADD, OP_MUL):
+        if b is None:
+            raise ValueError(f"{op} needs two operands")
+        if op == OP_ADD and (a.rows, a.cols) != (b.rows, b.cols):
+            raise ValueError(f"Cannot add {a.rows}x{a.cols} and {b.rows}x{b.cols}")
+        if op == OP_MUL and a.cols != b.rows:
+            raise ValueError(f"Cannot multiply {a.rows}x{a.cols} by {b.rows}x{b.cols}")
+    if op == OP_CONV and (a.rows, a.cols) != (3, 3):
+        raise ValueError("Convolution kernel must be 3x3")
+
+
+def is_border(line):
+    return line.startswith("+--")
+
+
+class StatsResponse:
+    """
+    Summary table: total count, border, header, border, then one data row and
+    one border per stored size. Done on the border closing the last row.
+    """
+    def __init__(self):
+        self.total = None
+        self.counts = {}
+        self.borders = 0
+
+    def feed(self, line):
+        if self.total is None:
+            if not line.isdigit():
+                raise ValueError("expected the summary total")
+            self.total = int(line)
+            return False
+        if is_border(line):
+            self.borders += 1
+            return self.borders >= 2 and sum(self.counts.values()) >= self.total
+        match = STAT_ROW_RE.search(line)
+        if match:
+            m, n, cnt = map(int, match.groups())
+            self.counts[(m, n)] = cnt
+        return False
+
+    def finished(self):
+        return False
+
+    def result(self):
+        return self.total, dict(self.counts)
+
+
+class MatrixBlockResponse:
+    """
+    `count` matrices of one size, each an ID line followed by its rows. The
+    count may instead come from a StatsResponse queued ahead of this one; it
+    is only read once that reply is complete. IDs and row widths are checked
+    against the requested size, so a reply that belongs to another request
+    is rejected instead of silently misparsed.
+    """
+    def __init__(self, rows, cols, count=None, stats=None):
+        self.rows = rows
+        self.cols = cols
+        self.count = count
+        self.stats = stats
+        self.matrices = []
+        self._id = None
+        self._lines = []
+
+    @property
+    def expected(self):
+        if self.count is not None:
+            return self.count
+        return self.stats.counts.get((self.rows, self.cols), 0)
+
+    def feed(self, line):
+        if self._id is None:
+            mid = int(line)
+            if mid // PHYSICAL_MAX_PER_DIM != matrix_id(self.rows, self.cols) // PHYSICAL_MAX_PER_DIM:
+                raise ValueError(f"ID {mid} is not a {self.rows}x{self.cols} matrix")
+            self._id = mid
+            self._lines = []
+            return False
+        if len(line.split()) != self.cols:
+            raise ValueError(f"expected a row of {self.cols} values")
+        self._lines.append(line)
+        if len(self._lines) == self.rows:
+            self.matrices.append(StoredMatrix(self._id, self.rows, self.cols, self._lines))
+            self._id = None
+        return self.finished()
+
+    def finished(self):
+        # Nothing stored of this size: the board prints nothing at all
+        return len(self.matrices) >= self.expected
+
+    def result(self):
+        return self.matrices
+
+
+class RowsResponse:
+    """A fixed number of bare rows (calculation result)."""
+    def __init__(self, count):
+        self.count = count
+        self.lines = []
+
+    def feed(self, line):
+        self.lines.append(line)
+        return len(self.lines) >= self.count
+
+    def finished(self):
+        return False
+
+    def result(self):
+        return self.lines
+
+
+def parse_row(line):
+    return [int(v) for v in line.split()]
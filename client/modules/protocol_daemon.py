@@ -0,0 +1,79 @@
+"""
+pyserial URL handler for daemon://<socket path>.
+
+Makes a port shared through DeviceDaemon look like a plain serial port to
+anything built on pyserial (both GUIs, AsyncDevice): received lines are read
+as bytes, written bytes are queued by the daemon as requests of their own.
+"daemon://" alone uses the default socket path. Importing this module
+registers the scheme; serial_manager and async_device do so.
+"""
+import os
+import socket
+import tempfile
+import urllib.parse
+
+import serial
+from serial.serialutil import PortNotOpenError, SerialException
+from serial.urlhandler import protocol_socket
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "fpga_matrix.sock")
+DEFAULT_URL = "daemon://" + DEFAULT_SOCKET
+HELLO_RAW = b'{"hello": "raw"}\n'
+CONNECT_TIMEOUT = 5
+
+# pyserial looks for <package>.protocol_<scheme> in these packages
+if __package__ and __package__ not in serial.protocol_handler_packages:
+    serial.protocol_handler_packages.append(__package__)
+
+
+def daemon_running(path=DEFAULT_SOCKET):
+    """True if a device daemon accepts connections on path."""
+    if not os.path.exists(path):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class Serial(protocol_socket.Serial):
+    def open(self):
+        self.logger = None
+        if self._port is None:
+            raise SerialException("Port must be configured before it can be used.")
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        try:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(CONNECT_TIMEOUT)
+            self._socket.connect(self.from_url(self.portstr))
+            self._socket.sendall(HELLO_RAW)
+        except Exception as e:
+            self._socket = None
+            raise SerialException(f"Could not open port {self.portstr}: {e}")
+        self._socket.setblocking(False)
+        self._reconfigure_port()
+        self.is_open = True
+        self.reset_input_buffer()
+
+    def from_url(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme != "daemon":
+            raise SerialException(f'expected a string in the form "daemon://<socket path>": {url!r}')
+        path = parts.netloc + parts.path
+        return path or DEFAULT_SOCKET
+
+    @property
+    def in_waiting(self):
+        # The socket handler only reports 0 or 1; callers that read(in_waiting)
+        # would then go byte by byte
+        if not self.is_open:
+            raise PortNotOpenError()
+        try:
+            return len(self._socket.recv(65536, socket.MSG_PEEK | socket.MSG_DONTWAIT))
+        except BlockingIOError:
+            return 0
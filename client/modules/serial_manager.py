@@ -1,90 +1,487 @@
+import os
+import queue
+import select
 import serial
-import serial.tools.list_ports
 import threading
 import time
 import traceback
+from concurrent.futures import Future, InvalidStateError
+from .line_framer import LineFramer
+from .dispatch_queue import DispatchQueue, OVERFLOW_BLOCK
+from .link_monitor import DEFAULT_INTERVAL, DEFAULT_TIMEOUT, LinkMonitor, send_break
+from .low_latency import apply_low_latency
+from .protocol import PONG
+from .protocol_daemon import DEFAULT_URL, daemon_running
+from .session_recorder import SessionRecorder, play
+
+# Reader modes:
+#   "event" - block in select() on the port (or in a timed read() where the
+#             port has no selectable fd) and wake as soon as bytes arrive.
+#   "poll"  - legacy loop: check in_waiting, then sleep 10 ms.
+READ_MODE_EVENT = "event"
+READ_MODE_POLL = "poll"
+
+READ_CHUNK = 4096
+
+# Sends queued within this window of each other go out in one write()
+TX_COALESCE_WINDOW = 0.001
+TX_BATCH_LIMIT = 4096
+
+PONG_BYTE = bytes([PONG])
+
+
+def _settle(fut, result=None, exc=None):
+    # The sender may have cancelled its future meanwhile
+    try:
+        if exc is None:
+            fut.set_result(result)
+        else:
+            fut.set_exception(exc)
+    except InvalidStateError:
+        pass
+
 
 class SerialManager:
-    def __init__(self, on_data_received, on_status_changed, on_data_sent=None):
+    """
+    Owns the serial port. The read thread only frames incoming bytes into lines
+    and hands them to a bounded DispatchQueue; a separate dispatch thread
+    decodes them and runs on_data_received (parsers and UI), so a busy UI
+    never stops the UART from being drained.
+
+    Outgoing bytes go through a writer thread: send_bytes() only queues them,
+    and sends arriving within coalesce_window are merged into a single write().
+    on_data_sent gets each send's bytes as they were; formatting them is left
+    to whoever shows them.
+
+    start_recording() captures every RX/TX chunk to a session file;
+    replay() feeds such a file back through the same RX path instead of a
+    port, so parsers and UI can be exercised without hardware. With log_sink
+    set (a LogSink), received lines and sent bytes are also queued to the
+    persistent text log; that never blocks either thread.
+
+    Link ping replies (PONG + count) are taken out of the byte stream before
+    framing; start_link_monitor() pings the board in the background and
+    link_stats() reports RTT, jitter and byte errors.
+    """
+    def __init__(self, on_data_received, on_status_changed, on_data_sent=None, read_mode=READ_MODE_EVENT,
+                 queue_size=4096, overflow_policy=OVERFLOW_BLOCK, coalesce_window=TX_COALESCE_WINDOW):
         self.ser = None
         self.is_connected = False
         self.on_data_received = on_data_received
         self.on_status_changed = on_status_changed
         self.on_data_sent = on_data_sent
+        self.read_mode = read_mode
         self.stop_event = threading.Event()
         self.read_thread = None
-        self.buffer = ""
+        self.dispatch_thread = None
+        self.framer = LineFramer()
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.rx_queue = DispatchQueue(queue_size, overflow_policy)
+        self.coalesce_window = coalesce_window
+        self.tx_queue = None
+        self.write_thread = None
+        # Held around each write and each ping, so a break never cuts a byte
+        self._tx_lock = threading.Lock()
+        self.tx_sends = 0
+        self.tx_writes = 0
+        self.low_latency_report = None
+        self.recorder = None
+        self.log_sink = None
+        self.replaying = None
+        self.link_monitor = None
+        # The last chunk ended between a PONG and its count byte
+        self._pong_split = False
+        # Self-pipe used to wake a reader blocked in select() on disconnect
+        self._wake_r = None
+        self._wake_w = None
 
     def get_ports(self):
-        return [port.device for port in serial.tools.list_ports.comports()]
+        # Imported on first use, off the startup path (slow on Windows)
+        import serial.tools.list_ports
+        ports = [port.device for port in serial.tools.list_ports.comports()]
+        # A running device daemon shares its board under this URL
+        if daemon_running():
+            ports.append(DEFAULT_URL)
+        return ports
+
+    def _can_select(self):
+        # select() works on POSIX tty fds and on sockets; Windows COM handles
+        # have no selectable fd, so those fall back to a timed blocking read.
+        return self.read_mode == READ_MODE_EVENT and os.name == "posix"
 
-    def connect(self, port, baudrate):
+    def connect(self, port, baudrate, low_latency=False):
         try:
-            if port.startswith("socket://"):
-                self.ser = serial.serial_for_url(port, baudrate=baudrate, timeout=0.1)
+            # With select() doing the waiting, reads only drain what is already
+            # buffered, so they must not block.
+            timeout = 0 if self._can_select() else 0.1
+            if "://" in port:  # socket:// stand-ins, daemon:// shared boards
+                self.ser = serial.serial_for_url(port, baudrate=baudrate, timeout=timeout)
             else:
-                self.ser = serial.Serial(port, baudrate, timeout=0.1)
-            
+                self.ser = serial.Serial(port, baudrate, timeout=timeout)
+
+            status = f"Connected to {port}"
+            self.low_latency_report = None
+            if low_latency:
+                self.low_latency_report = apply_low_latency(self.ser, port)
+                if self.low_latency_report.active:
+                    status += f" (low latency: {', '.join(self.low_latency_report.applied)})"
+                else:
+                    status += " (low latency: nothing changed)"
+
             self.is_connected = True
+            self.framer.reset()
+            self._pong_split = False
             self.stop_event.clear()
+            if self._can_select():
+                self._wake_r, self._wake_w = os.pipe()
+            self.rx_queue = DispatchQueue(self.queue_size, self.overflow_policy)
+            self.dispatch_thread = threading.Thread(target=self._dispatch_loop, args=(self.rx_queue,), daemon=True)
+            self.dispatch_thread.start()
+            self.tx_queue = queue.SimpleQueue()
+            self.write_thread = threading.Thread(target=self._write_loop, args=(self.tx_queue,), daemon=True)
+            self.write_thread.start()
             self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
             self.read_thread.start()
-            self.on_status_changed(True, f"Connected to {port}")
+            self.on_status_changed(True, status)
             return True
         except Exception as e:
             self.on_status_changed(False, str(e))
             return False
 
     def disconnect(self):
+        self.stop_link_monitor()
         self.stop_event.set()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+        # Unblocks a reader waiting for room; the dispatcher drains what is left
+        self.rx_queue.close()
+        if self.read_thread and self.read_thread is not threading.current_thread():
+            self.read_thread.join(timeout=1.0)
+        self._stop_writer()
         if self.ser and self.ser.is_open:
             self.ser.close()
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+        self.stop_recording()
+        self.replaying = None
         self.is_connected = False
         self.on_status_changed(False, "Disconnected")
 
-    def send_bytes(self, data: bytes):
-        if self.ser and self.ser.is_open:
-            self.ser.write(data)
+    def start_recording(self, path):
+        """Append every RX/TX chunk to the session file at path (until stop_recording/disconnect)."""
+        self.stop_recording()
+        self.recorder = SessionRecorder(path)
+        return self.recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.close()
+
+    def start_link_monitor(self, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT):
+        """
+        Ping the board every interval seconds (see modules.link_monitor). Not
+        available while replaying, or on a daemon:// port, where the daemon
+        owns the link and other clients share it.
+        """
+        self.stop_link_monitor()
+        if not self.is_connected or self.replaying or self.ser.port.startswith("daemon://"):
+            return None
+        self.link_monitor = LinkMonitor(self.send_ping, interval, timeout)
+        self.link_monitor.start()
+        return self.link_monitor
+
+    def stop_link_monitor(self):
+        monitor, self.link_monitor = self.link_monitor, None
+        if monitor:
+            monitor.stop()
+
+    def link_stats(self):
+        """Link monitor counters, or None when it is not running."""
+        return self.link_monitor.stats() if self.link_monitor else None
+
+    def replay(self, path, speed=1.0):
+        """
+        Play a session recording as if it came from the port: RX chunks go
+        through the framer, dispatch queue and on_data_received, recorded TX
+        through on_data_sent. speed: 1 = real time, N = N times faster,
+        None = as fast as possible. Nothing is sent anywhere while replaying.
+        """
+        if self.is_connected:
+            self.disconnect()
+        self.framer.reset()
+        self._pong_split = False
+        self.stop_event.clear()
+        self.rx_queue = DispatchQueue(self.queue_size, self.overflow_policy)
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, args=(self.rx_queue,), daemon=True)
+        self.dispatch_thread.start()
+        self.replaying = path
+        self.is_connected = True
+        self.read_thread = threading.Thread(target=self._replay_loop, args=(path, speed), daemon=True)
+        self.read_thread.start()
+        self.on_status_changed(True, f"Replaying {os.path.basename(path)}" + (f" at {speed}x" if speed else " at max speed"))
+
+    def _replay_loop(self, path, speed):
+        def on_tx(data):
             if self.on_data_sent:
-                # Always log as HEX for clarity as requested
-                hex_str = " ".join([f"{b:02X}" for b in data])
-                self.on_data_sent(hex_str)
-            return True
+                self.on_data_sent(data)
+        try:
+            t0 = time.perf_counter()
+            chunks = play(path, self._handle_raw, on_tx, speed, self.stop_event)
+            if not self.stop_event.is_set():
+                self.on_status_changed(True, f"Replay finished: {chunks} chunks in {time.perf_counter() - t0:.2f} s")
+        except (OSError, ValueError) as e:
+            print(f"Replay Error: {e}")
+            self.on_status_changed(True, f"Replay Error: {e}")
+
+    def send_bytes(self, data: bytes):
+        """
+        Queue data for the writer thread. Returns a Future that resolves to the
+        number of bytes once they are written and flushed to the port, or False
+        if the port is not open.
+        """
+        if self.ser and self.ser.is_open and self.tx_queue is not None:
+            fut = Future()
+            self.tx_queue.put((bytes(data), fut))
+            return fut
         return False
 
     def send_string(self, text: str):
         return self.send_bytes(text.encode('utf-8'))
 
+    def send_ping(self, started=None):
+        """
+        Send a link ping (a break, see modules.link_monitor) from the calling
+        thread, between two writer batches. False if the port is not open or
+        cannot send a break.
+        """
+        ser = self.ser
+        if not (ser and ser.is_open):
+            return False
+        with self._tx_lock:
+            try:
+                send_break(ser, started)
+            except Exception as e:
+                print(f"Serial Break Error: {e}")
+                return False
+        return True
+
+    def tx_stats(self):
+        return {"sends": self.tx_sends, "writes": self.tx_writes}
+
+    def _stop_writer(self):
+        if self.tx_queue is None:
+            return
+        tx_queue = self.tx_queue
+        self.tx_queue = None
+        tx_queue.put(None)
+        if self.write_thread and self.write_thread is not threading.current_thread():
+            self.write_thread.join(timeout=1.0)
+        # Anything queued behind the stop marker will never be written
+        while True:
+            try:
+                item = tx_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                _settle(item[1], exc=serial.SerialException("Port closed before write"))
+
+    def _write_loop(self, tx_queue):
+        batch = []
+        try:
+            stopping = False
+            while not stopping:
+                item = tx_queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                size = len(item[0])
+                deadline = time.perf_counter() + self.coalesce_window
+                while size < TX_BATCH_LIMIT:
+                    try:
+                        remaining = deadline - time.perf_counter()
+                        item = tx_queue.get(timeout=remaining) if remaining > 0 else tx_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    size += len(item[0])
+                self._write_batch(batch)
+        except Exception as e:
+            # Write errors are handled per batch; this is a recorder, log sink
+            # or on_data_sent failure. Without a writer nothing would resolve
+            # the queued futures, so fail them and drop the connection.
+            print(f"Serial Writer Error: {e}")
+            print(traceback.format_exc())
+            for _, fut in batch:
+                _settle(fut, exc=e)
+            self._writer_failed(tx_queue, e)
+
+    def _writer_failed(self, tx_queue, exc):
+        if self.tx_queue is not tx_queue:
+            return  # already disconnecting
+        self.tx_queue = None
+        while True:
+            try:
+                item = tx_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                _settle(item[1], exc=exc)
+        self.disconnect()
+        if self.on_status_changed:
+            self.on_status_changed(False, f"Write Error: {exc}")
+
+    def _write_batch(self, batch):
+        payload = batch[0][0] if len(batch) == 1 else b"".join(data for data, _ in batch)
+        try:
+            with self._tx_lock:
+                self.ser.write(payload)
+                self.ser.flush()
+        except Exception as e:
+            print(f"Serial Write Error: {e}")
+            for _, fut in batch:
+                _settle(fut, exc=e)
+            return
+        if self.recorder:
+            self.recorder.tx(payload)
+        if self.log_sink:
+            self.log_sink.put("tx", payload)
+        self.tx_sends += len(batch)
+        self.tx_writes += 1
+        for data, fut in batch:
+            _settle(fut, len(data))
+        if self.on_data_sent:
+            for data, _ in batch:
+                self.on_data_sent(data)
+
     def _read_loop(self):
+        if self.read_mode == READ_MODE_POLL:
+            self._poll_read_loop()
+        elif self._can_select():
+            self._select_read_loop()
+        else:
+            self._blocking_read_loop()
+
+    def _poll_read_loop(self):
         while not self.stop_event.is_set():
             try:
                 if self.ser and self.ser.in_waiting:
                     raw_data = self.ser.read(self.ser.in_waiting)
-                    try:
-                        text_data = raw_data.decode('utf-8', errors='replace')
-                        self._process_buffer(text_data)
-                    except Exception as e:
-                        print(f"Error processing serial data: {e}")
-                        print(traceback.format_exc())
-                        if self.on_status_changed:
-                            self.on_status_changed(f"Data Error: {e}")
+                    self._handle_raw(raw_data)
             except Exception as e:
                 print(f"Serial Read Error: {e}")
                 break
             time.sleep(0.01)
 
-    def _process_buffer(self, new_data):
-        self.buffer += new_data
-        
-        # Prevent overflow
-        if len(self.buffer) > 10000:
-            # If buffer gets too big, just dump it to avoid memory issues
-            self.on_data_received(self.buffer)
-            self.buffer = ""
-            return
+    def _select_read_loop(self):
+        fd = self.ser.fileno()
+        while not self.stop_event.is_set():
+            try:
+                # No timeout: an idle line costs no wake-ups at all, and
+                # disconnect() interrupts us through the wake pipe.
+                ready, _, _ = select.select([fd, self._wake_r], [], [])
+                if self.stop_event.is_set():
+                    break
+                if fd in ready:
+                    # pyserial raises here if the device or socket peer is gone
+                    raw_data = self.ser.read(READ_CHUNK)
+                    if raw_data:
+                        self._handle_raw(raw_data)
+            except Exception as e:
+                if self.stop_event.is_set():
+                    break
+                print(f"Serial Read Error: {e}")
+                break
+
+    def _blocking_read_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                # read(1) blocks until the first byte or the port timeout
+                # (so stop_event is re-checked); then drain the rest in one go.
+                raw_data = self.ser.read(1)
+                if not raw_data:
+                    continue
+                waiting = self.ser.in_waiting
+                if waiting:
+                    raw_data += self.ser.read(waiting)
+                self._handle_raw(raw_data)
+            except Exception as e:
+                if self.stop_event.is_set():
+                    break
+                print(f"Serial Read Error: {e}")
+                break
+
+    def _handle_raw(self, raw_data):
+        if self.recorder:
+            self.recorder.rx(raw_data)
+        try:
+            self._process_buffer(raw_data)
+        except Exception as e:
+            print(f"Error processing serial data: {e}")
+            print(traceback.format_exc())
+            if self.on_status_changed:
+                self.on_status_changed(self.is_connected, f"Data Error: {e}")
 
-        while '\n' in self.buffer:
-            line, self.buffer = self.buffer.split('\n', 1)
+    def _process_buffer(self, raw_data):
+        if self._pong_split or PONG_BYTE in raw_data:
+            raw_data = self._strip_pongs(raw_data)
+        monitor = self.link_monitor
+        if monitor:
+            monitor.on_rx(raw_data)
+        put = self.rx_queue.put
+        for line in self.framer.feed(raw_data):
+            # Blank lines never reach the queue
             line = line.strip()
             if line:
-                self.on_data_received(line)
+                put(line)
+
+    def _strip_pongs(self, raw_data):
+        # The count byte can be anything, '\n' included, so pairs have to go
+        # before framing; PONG itself never occurs in the board's text
+        monitor = self.link_monitor
+        now = time.perf_counter()
+        out = bytearray()
+        pos = 0
+        if self._pong_split:
+            self._pong_split = False
+            if monitor:
+                monitor.on_pong(raw_data[0], now)
+            pos = 1
+        while True:
+            i = raw_data.find(PONG_BYTE, pos)
+            if i < 0:
+                out += raw_data[pos:]
+                return bytes(out)
+            out += raw_data[pos:i]
+            if i + 1 == len(raw_data):
+                self._pong_split = True
+                return bytes(out)
+            if monitor:
+                monitor.on_pong(raw_data[i + 1], now)
+            pos = i + 2
+
+    def _dispatch_loop(self, rx_queue):
+        while True:
+            batch = rx_queue.get_batch()
+            if not batch:
+                break  # closed and drained
+            sink = self.log_sink
+            for line in batch:
+                try:
+                    text = line.decode('utf-8', errors='replace')
+                    if sink:
+                        sink.put("rx", text)
+                    self.on_data_received(text)
+                except Exception as e:
+                    print(f"Error handling serial line: {e}")
+                    print(traceback.format_exc())
+
+    def queue_stats(self):
+        """Depth / throughput / drop counters of the RX dispatch queue."""
+        return self.rx_queue.stats()
@@ -0,0 +1,197 @@
+"""
+Compact append-only recording of serial traffic, and its replay.
+
+File layout: the 16-byte header MAGIC + start wall time (float64), then one
+record per RX/TX chunk:
+
+    kind (1 byte) | time since the previous record, us (varint) | length (varint) | payload
+
+A later session appended to an existing file starts with a KIND_SESSION
+record whose payload is its wall start time; its first delta is 0. A
+record cut short by a crash ends the file. Typical overhead is 3 bytes per
+chunk, against ~3 text bytes per payload byte for the hex TX log.
+
+    python -m modules.session_recorder capture.fpgarec            # summary
+    python -m modules.session_recorder capture.fpgarec --dump     # every chunk
+"""
+import argparse
+import datetime
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"FPGAREC\x01"
+HEADER = struct.Struct("<8sd")
+KIND_RX = 0
+KIND_TX = 1
+KIND_SESSION = 2
+KIND_NAMES = {KIND_RX: "RX", KIND_TX: "TX", KIND_SESSION: "--"}
+# Buffered records are flushed at least this often
+FLUSH_INTERVAL = 1.0
+
+
+def _varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return out
+
+
+def _read_varint(buf, pos):
+    value = shift = 0
+    while True:
+        b = buf[pos]  # IndexError on a truncated record
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+class SessionRecorder:
+    """Appends RX/TX chunks to path; safe to call from the reader and writer threads."""
+    def __init__(self, path):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self._last = time.perf_counter()
+        self._flushed = self._last
+        self.chunks = 0
+        self.bytes = 0
+        if new:
+            self._file.write(HEADER.pack(MAGIC, time.time()))
+        else:
+            self._record(KIND_SESSION, struct.pack("<d", time.time()), self._last)
+
+    def rx(self, data):
+        self._record(KIND_RX, data, time.perf_counter())
+
+    def tx(self, data):
+        self._record(KIND_TX, data, time.perf_counter())
+
+    def _record(self, kind, data, now):
+        with self._lock:
+            if self._file is None:
+                return
+            dt = max(0, int((now - self._last) * 1e6))
+            self._last = now
+            self._file.write(bytes([kind]) + _varint(dt) + _varint(len(data)))
+            self._file.write(data)
+            self.chunks += 1
+            self.bytes += len(data)
+            if now - self._flushed >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._flushed = now
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def new_session_path(directory="sessions"):
+    """A fresh, timestamped recording path in directory (created if needed)."""
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, datetime.datetime.now().strftime("session-%Y%m%d-%H%M%S.fpgarec"))
+
+
+def read_session(path):
+    """Yields (kind, seconds since the session started, payload) for every record."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    if len(buf) < HEADER.size or buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a session recording")
+    pos = HEADER.size
+    t = 0.0
+    while pos < len(buf):
+        try:
+            kind = buf[pos]
+            dt, pos2 = _read_varint(buf, pos + 1)
+            size, pos2 = _read_varint(buf, pos2)
+        except IndexError:
+            return  # cut short by a crash
+        if pos2 + size > len(buf):
+            return
+        data = buf[pos2:pos2 + size]
+        pos = pos2 + size
+        if kind == KIND_SESSION:
+            t = 0.0
+        else:
+            t += dt / 1e6
+        yield kind, t, data
+
+
+def play(path, on_rx, on_tx=None, speed=1.0, stop=None):
+    """
+    Feed a recording to on_rx(bytes) / on_tx(bytes) with its original
+    timing divided by speed (None or 0: as fast as possible). stop is an
+    optional threading.Event that ends playback early. Returns the number
+    of chunks played.
+    """
+    played = 0
+    t0 = time.perf_counter()
+    base = last = 0.0
+    for kind, t, data in read_session(path):
+        if kind == KIND_SESSION:
+            # A later session plays right after the one before it
+            base += last
+            last = 0.0
+            continue
+        last = t
+        if speed:
+            delay = t0 + (base + t) / speed - time.perf_counter()
+            if delay > 0:
+                if stop is not None:
+                    if stop.wait(delay):
+                        break
+                else:
+                    time.sleep(delay)
+        if stop is not None and stop.is_set():
+            break
+        if kind == KIND_RX:
+            on_rx(data)
+        elif kind == KIND_TX and on_tx is not None:
+            on_tx(data)
+        played += 1
+    return played
+
+
+def summarize(path):
+    counts = {KIND_RX: [0, 0], KIND_TX: [0, 0]}
+    sessions = 1
+    duration = 0.0
+    for kind, t, data in read_session(path):
+        if kind == KIND_SESSION:
+            sessions += 1
+            continue
+        if kind not in counts:
+            continue
+        counts[kind][0] += 1
+        counts[kind][1] += len(data)
+        duration = max(duration, t)
+    payload = sum(c[1] for c in counts.values())
+    size = os.path.getsize(path)
+    return (f"{path}: {sessions} session(s), {size} bytes on disk for {payload} payload bytes, "
+            f"RX {counts[KIND_RX][0]} chunks / {counts[KIND_RX][1]} B, "
+            f"TX {counts[KIND_TX][0]} chunks / {counts[KIND_TX][1]} B, longest session {duration:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a serial session recording.")
+    parser.add_argument("path")
+    parser.add_argument("--dump", action="store_true", help="print every chunk")
+    args = parser.parse_args()
+    print(summarize(args.path))
+    if args.dump:
+        for kind, t, data in read_session(args.path):
+            text = data.hex(" ").upper() if kind == KIND_TX else data.decode("utf-8", errors="replace")
+            print(f"{t:10.6f} {KIND_NAMES.get(kind, kind)} {text!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import flet as ft
+from .matrix import Matrix, format_row
+from .matrix_canvas import MatrixCanvas
 
 class StyledCard(ft.Container):
     """统一风格的卡片容器"""
@@ -64,51 +66,87 @@ class MatrixDisplay(ft.Column):
         If the FPGA sends pre-formatted text lines, we might just display them as text?
         "每个元素都是左对齐到3位" -> This suggests we receive text lines.
         Let's support both: raw text lines OR 2D array.
+        A Matrix is shown as text in the board's layout.
         """
         self.grid_container.controls.clear()
         
-        if isinstance(matrix_data, str):
+        if isinstance(matrix_data, Matrix):
+            # Same layout as the board prints
+            self.grid_container.controls.append(
+                ft.Text(matrix_data.text(), font_family="Consolas", size=14)
+            )
+        elif isinstance(matrix_data, str):
             # Display raw pre-formatted text
             self.grid_container.controls.append(
                 ft.Text(matrix_data, font_family="Consolas", size=14)
             )
         elif isinstance(matrix_data, list):
-            # Render grid
-            for row in matrix_data:
-                row_controls = []
-                for val in row:
-                    row_controls.append(
-                        ft.Container(
-                            content=ft.Text(str(val), text_align=ft.TextAlign.CENTER, size=12),
-                            width=40, height=30,
-                            alignment=ft.alignment.center,
-                            bgcolor="background",
-                            border_radius=4
-                        )
-                    )
-                self.grid_container.controls.append(ft.Row(row_controls, alignment=ft.MainAxisAlignment.CENTER))
+            # Render grid as one image instead of a Container + Text per cell
+            self.grid_container.controls.append(MatrixCanvas(matrix_data))
         
         if self.page:
             self.update()
 
+    def start_rows(self):
+        """Replace the shown matrix with an empty MatrixRowView and return it."""
+        view = MatrixRowView(size=14)
+        self.grid_container.controls = [view]
+        return view
+
+class MatrixRowView(ft.Column):
+    """
+    Append-only matrix view for rows streaming in from the board. Rows go
+    into a block Text of at most block_rows lines; append_row() returns the
+    control to push, which is that block, or the view itself when a new
+    block starts. Flet diffs a control's whole subtree on update, so a row
+    never costs more than one block, however many rows came before.
+    placeholder is shown until the first row.
+    """
+    def __init__(self, size=14, weight=None, placeholder=None, block_rows=8, **kwargs):
+        super().__init__(spacing=0, **kwargs)
+        self.size = size
+        self.weight = weight
+        self.block_rows = block_rows
+        self.rows = 0
+        if placeholder is not None:
+            self.controls.append(ft.Text(placeholder, font_family="Consolas", size=size, weight=weight))
+
+    def append_row(self, values):
+        """values: the row's ints, or its text as received if it did not parse."""
+        line = values if isinstance(values, str) else format_row(values)
+        if self.rows == 0:
+            self.controls.clear()
+        self.rows += 1
+        if (self.rows - 1) % self.block_rows:
+            block = self.controls[-1]
+            block.value += "\n" + line
+            return block
+        self.controls.append(ft.Text(line, font_family="Consolas", size=self.size, weight=self.weight))
+        return self
+
 class MatrixInputGrid(ft.Column):
-    """用于输入的矩阵网格"""
-    def __init__(self, on_change=None):
+    """
+    用于输入的矩阵网格
+
+    All max_rows x max_cols TextFields are built once; set_dimensions()
+    only toggles row and cell visibility, so a resize pushes a few changed
+    properties instead of a new grid. Cells that stay visible keep their
+    values; cells that come back into view start again at "0".
+    """
+    def __init__(self, on_change=None, max_rows=5, max_cols=5):
         super().__init__()
         self.spacing = 10
-        self.inputs = [] # 2D list of TextFields
+        self.rows = 0
+        self.cols = 0
+        self.inputs = [] # 2D list of the visible TextFields
+        self.cells = [] # 2D pool of all TextFields
         self.grid_col = ft.Column(spacing=5)
         self.controls = [self.grid_col]
         self.on_change = on_change
 
-    def set_dimensions(self, r, c):
-        self.inputs = []
-        self.grid_col.controls.clear()
-        
-        for i in range(r):
-            row_inputs = []
-            row_controls = []
-            for j in range(c):
+        for i in range(max_rows):
+            row_cells = []
+            for j in range(max_cols):
                 tf = ft.TextField(
                     value="0", 
                     width=50, 
@@ -119,12 +157,26 @@ class MatrixInputGrid(ft.Column):
                     bgcolor=ft.Colors.SURFACE,
                     border_color=ft.Colors.OUTLINE,
                     focused_border_color=ft.Colors.PRIMARY,
-                    on_change=self.on_change
+                    on_change=on_change,
+                    visible=False
                 )
-                row_inputs.append(tf)
-                row_controls.append(tf)
-            self.inputs.append(row_inputs)
-            self.grid_col.controls.append(ft.Row(row_controls, alignment=ft.MainAxisAlignment.CENTER))
+                row_cells.append(tf)
+            self.cells.append(row_cells)
+            self.grid_col.controls.append(ft.Row(row_cells, alignment=ft.MainAxisAlignment.CENTER, visible=False))
+
+    def set_dimensions(self, r, c):
+        if (r, c) == (self.rows, self.cols):
+            return
+        for i, row in enumerate(self.grid_col.controls):
+            row.visible = i < r
+            for j, tf in enumerate(self.cells[i]):
+                shown = i < r and j < c
+                if shown and not tf.visible:
+                    tf.value = "0"
+                    tf.border_color = ft.Colors.OUTLINE
+                tf.visible = shown
+        self.rows, self.cols = r, c
+        self.inputs = [row[:c] for row in self.cells[:r]]
         
         if self.page:
             self.update()
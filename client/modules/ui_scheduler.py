@@ -0,0 +1,138 @@
+import threading
+import time
+
+import flet as ft
+
+DEFAULT_RATE = 30
+
+
+class UpdateScheduler:
+    """
+    Coalesces Flet updates. Code that changed a control calls mark(control)
+    instead of control.update(); marked controls are pushed together with
+    one page.update(*controls), at most `rate` times per second.
+
+    A mark() arriving when nothing was flushed for a whole frame is flushed
+    right away on the caller's thread, so a single change after a quiet
+    spell costs no latency. Marks within a frame of the last flush are
+    collected and flushed by a worker thread at the next frame boundary.
+    rate=0 flushes on every mark, i.e. plain update() calls.
+
+    stats() reports how many marks were folded into how many flushes and
+    how long the flushes took.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.rate = rate
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._dirty = {}  # id -> control, in mark order
+        self._scheduled = False
+        self._last_flush = 0.0
+        self._closed = False
+        self._thread = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.marks = 0
+            self.flushes = 0
+            self.idle_flushes = 0
+            self.controls_flushed = 0
+            self.errors = 0
+            self.flush_seconds = 0.0
+            self.flush_max = 0.0
+            self.flush_last = 0.0
+
+    def mark(self, *controls):
+        """Schedule controls (or a page) for the next flush."""
+        with self._lock:
+            for control in controls:
+                self._dirty[id(control)] = control
+            self.marks += len(controls)
+            if self._scheduled:
+                return
+            if time.perf_counter() - self._last_flush < self.interval:
+                self._scheduled = True
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True)
+                    self._thread.start()
+                self._wake.notify()
+                return
+            self.idle_flushes += 1
+        self.flush()
+
+    def flush(self):
+        """Push everything marked so far now."""
+        with self._lock:
+            dirty = list(self._dirty.values())
+            self._dirty.clear()
+            self._scheduled = False
+            self._last_flush = time.perf_counter()
+        # The whole page was marked: one update covers the rest
+        whole = next((c for c in dirty if isinstance(c, ft.Page)), None)
+        if whole is None:
+            # Controls not (or no longer) on a page have nothing to push
+            dirty = [c for c in dirty if c.page is not None]
+            if not dirty:
+                return
+        t0 = time.perf_counter()
+        try:
+            if whole is not None:
+                whole.update()
+            else:
+                dirty[0].page.update(*dirty)
+        except Exception as e:
+            print(f"UI Update Error: {e}")
+            with self._lock:
+                self.errors += 1
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.flushes += 1
+            self.controls_flushed += len(dirty)
+            self.flush_seconds += elapsed
+            self.flush_last = elapsed
+            if elapsed > self.flush_max:
+                self.flush_max = elapsed
+
+    def close(self):
+        """Flush what is pending and stop the worker."""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self.flush()
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                while not self._scheduled and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                wait = self._last_flush + self.interval - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "marks": self.marks,
+                "flushes": self.flushes,
+                "idle_flushes": self.idle_flushes,
+                "controls_flushed": self.controls_flushed,
+                "pending": len(self._dirty),
+                "errors": self.errors,
+                "flush_mean": self.flush_seconds / self.flushes if self.flushes else 0.0,
+                "flush_max": self.flush_max,
+                "flush_last": self.flush_last,
+                "flush_seconds": self.flush_seconds,
+            }
+
+    def summary(self):
+        s = self.stats()
+        rate = f"{s['rate']} Hz" if s["rate"] else "unthrottled"
+        return (f"UI: {s['marks']} updates in {s['flushes']} flushes ({rate}), "
+                f"flush mean {s['flush_mean'] * 1000:.1f} ms, max {s['flush_max'] * 1000:.1f} ms")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The client runs from client/ (python matrix_client.py), so its modules import as modules.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,34 @@
+import pytest
+
+from modules.fixed_width import decode_matrices, decode_rows
+from modules.matrix import format_row
+from modules.protocol import StoredMatrix
+
+
+def test_rows_as_the_board_prints_them():
+    rows = [[-128, 0, 127], [5, -7, 42], [1, 2, 3]]
+    lines = [format_row(row) for row in rows]
+    values = decode_rows(lines, 3)
+    assert values.shape == (3, 3)
+    assert values.tolist() == rows
+
+
+def test_rows_off_the_layout_are_decoded_tolerantly():
+    # A value too wide for its column, doubled spaces and a leading space
+    lines = ["1    2    12345", "3  4     5", " 6   7    8"]
+    assert decode_rows(lines, 3).tolist() == [[1, 2, 12345], [3, 4, 5], [6, 7, 8]]
+
+
+def test_unparseable_row_raises():
+    with pytest.raises(ValueError):
+        decode_rows(["1    2", "1    x"], 2)
+    with pytest.raises(ValueError):
+        decode_rows(["1    2    3"], 2)
+
+
+def test_stored_matrices_of_one_size():
+    mats = [StoredMatrix(k, 2, 2, [format_row([k, -k]), format_row([2 * k, 3])]) for k in range(3)]
+    values = decode_matrices(mats)
+    assert values.shape == (3, 2, 2)
+    assert values[2].tolist() == [[2, -2], [4, 3]]
+    assert decode_matrices([]).shape == (0, 0, 0)
@@ -0,0 +1,70 @@
+from modules.line_tokenizer import (BORDER, HEADER, MATRIX_LINE, LineTokenizer, MatrixId, MatrixRow,
+                                    ModeSwitch, StatsRow, StatsTotal, Text)
+
+
+def feed(tokens, lines):
+    return [tokens.feed(line) for line in lines]
+
+
+def test_summary_table():
+    events = feed(LineTokenizer(), ["3", "+----+----+------+", "|  m |  n |  cnt |", "+----+----+------+",
+                                    "|2   |2   |3     |"])
+    total, border, header, _, row = events
+    assert isinstance(total, StatsTotal) and total.total == 3
+    assert border is BORDER and header is HEADER
+    assert isinstance(row, StatsRow) and (row.m, row.n, row.count) == (2, 2, 3)
+
+
+def test_mode_banner_clears_expectations():
+    tokens = LineTokenizer()
+    tokens.expect_matrices(2)
+    event = tokens.feed("mode-cal")
+    assert isinstance(event, ModeSwitch) and event.mode == "cal"
+    assert not tokens.expecting
+
+
+def test_expected_matrices_with_ids():
+    tokens = LineTokenizer()
+    tokens.expect_matrices(2, count=2)
+    events = feed(tokens, ["6", "1    2", "3    4", "7", "-5   6", "7    8"])
+    assert [e.__class__ for e in events] == [MatrixId, MatrixRow, MatrixRow] * 2
+    assert events[0].id == 6 and events[0].rows == 2
+    assert [e.row for e in events[1:3]] == [0, 1]
+    assert not events[1].last and events[1].matrix is None
+    last = events[5]
+    assert last.last and last.lines == ["-5   6", "7    8"]
+    assert last.matrix.id == 7 and last.matrix.tolist() == [[-5, 6], [7, 8]]
+    assert last.values == [7, 8]
+    assert not tokens.expecting
+
+
+def test_whole_matrices_only_emit_their_last_row():
+    tokens = LineTokenizer()
+    tokens.expect_matrices(3, ids=False, each_row=False)
+    events = feed(tokens, ["1 2", "3 4", "5 6"])
+    assert events[:2] == [MATRIX_LINE, MATRIX_LINE]
+    assert events[2].last and events[2].lines == ["1 2", "3 4", "5 6"]
+    assert events[2].matrix.id is None
+
+
+def test_single_numbers_without_expectations_are_totals():
+    tokens = LineTokenizer()
+    total, row, text = feed(tokens, ["12", "1 2 3", "12abc"])
+    assert isinstance(total, StatsTotal)
+    assert isinstance(row, MatrixRow) and row.row is None and row.matrix is None
+    assert isinstance(text, Text)
+
+
+def test_missing_id_line_starts_the_matrix():
+    tokens = LineTokenizer()
+    tokens.expect_matrices(2)
+    first, last = feed(tokens, ["1 2", "3 4"])
+    assert first.row == 0 and last.last
+    assert last.matrix.id is None
+
+
+def test_damaged_matrix_has_no_matrix():
+    tokens = LineTokenizer()
+    tokens.expect_matrices(2, ids=False)
+    _, last = feed(tokens, ["1 2", "3"])
+    assert last.last and last.matrix is None
@@ -0,0 +1,39 @@
+from modules.log_index import LogIndex, message_text
+
+
+class Ring:
+    """The part of LogRing that LogIndex uses, without flet."""
+    def __init__(self):
+        self.records = []
+        self.capacity = 1000
+        self.first = 0
+
+    @property
+    def total(self):
+        return len(self.records)
+
+    def get(self, seq):
+        return self.records[seq]
+
+    def add(self, index, kind, msg):
+        index.add(self.total, msg)
+        self.records.append((0.0, kind, msg, False))
+
+
+def test_tx_bytes_are_searchable_as_hex():
+    ring = Ring()
+    index = LogIndex(ring)
+    ring.add(index, "tx", bytes([0x05, 0x05, 0xFF]))
+    ring.add(index, "rx", "mode-cal")
+    ring.add(index, "tx", bytes([0xAB]))
+    assert index.search("ff") == [0]
+    assert index.search("05 FF") == [0]
+    assert index.search("FF 05") == []
+    assert index.search("05 FF", substring=True) == [0]
+    assert index.search("ab", kinds={"rx"}) == []
+    assert index.search("mode-cal") == [1]
+
+
+def test_message_text():
+    assert message_text(b"\x0a\xff") == "0A FF"
+    assert message_text("text") == "text"
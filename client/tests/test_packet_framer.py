@@ -0,0 +1,70 @@
+from modules.packet_framer import MAX_TOKEN, PacketFramer
+
+
+def feed_all(framer, chunks):
+    out = []
+    for chunk in chunks:
+        out += framer.feed(chunk)
+    return out
+
+
+def test_packet_in_one_chunk():
+    f = PacketFramer()
+    assert f.feed("170 | 2 | 2 | 1 | 2 | 3 | 4\n") == [(2, 2, [1, 2, 3, 4])]
+    assert (f.packets, f.skipped, f.resyncs, f.truncated) == (1, 0, 0, 0)
+
+
+def test_packet_split_across_chunks():
+    text = "170 2 3 1 2 3 4 5 6\n170 1 1 -7\n"
+    for size in (1, 2, 5, 64):
+        f = PacketFramer()
+        out = feed_all(f, [text[i:i + size] for i in range(0, len(text), size)])
+        assert out == [(2, 3, [1, 2, 3, 4, 5, 6]), (1, 1, [-7])]
+        assert f.pending == 0
+
+
+def test_other_console_output_is_not_a_failure():
+    f = PacketFramer()
+    table = ("+-----+-----+-----+\n| m   | n   | cnt |\n+-----+-----+-----+\n"
+             "| 2   | 2   | 3   |\n+-----+-----+-----+\nmode-dis\n")
+    assert f.feed(table) == []
+    assert f.feed("170 1 2 5 6\n") == [(1, 2, [5, 6])]
+    assert f.resyncs == 0 and f.truncated == 0
+    assert f.skipped > 0
+
+
+def test_invalid_header_resyncs_after_the_170():
+    f = PacketFramer()
+    # 170 9 is no header, but the 170 in its values starts a real one
+    assert f.feed("170 9 170 1 1 4\n") == [(1, 1, [4])]
+    assert f.resyncs == 1 and f.truncated == 0
+
+
+def test_header_followed_by_text_is_invalid():
+    f = PacketFramer()
+    assert f.feed("170 m 170 1 1 4\n") == [(1, 1, [4])]
+    assert f.resyncs == 1
+
+
+def test_packet_cut_short_by_text_is_truncated():
+    f = PacketFramer()
+    out = feed_all(f, ["170 2 2 1 2\n", "mode-dis\n", "170 1 1 9\n"])
+    assert out == [(1, 1, [9])]
+    assert f.truncated == 1 and f.resyncs == 0
+    assert f.pending == 0
+
+
+def test_overlong_run_cuts_a_packet():
+    f = PacketFramer()
+    assert f.feed("170 2 2 1 " + "x" * (MAX_TOKEN + 1)) == []
+    assert f.truncated == 1
+    assert f.feed(" 170 1 1 3\n") == [(1, 1, [3])]
+
+
+def test_reset_drops_the_unfinished_packet():
+    f = PacketFramer()
+    f.feed("170 2 2 1 ")
+    assert f.pending == 4
+    f.reset()
+    assert f.pending == 0
+    assert f.feed("2 3 4\n") == []
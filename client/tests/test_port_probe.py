@@ -0,0 +1,103 @@
+import pytest
+
+from modules import port_probe
+from modules.protocol import PONG
+
+
+class FakeSerial:
+    """A serial port whose device answers a break with the chunks in replies[port]."""
+    replies = {}
+    opened = []
+
+    def __init__(self, port, baudrate, timeout=None, write_timeout=None):
+        if port not in self.replies:
+            raise OSError(f"could not open port {port}")
+        self.port = port
+        self.written = b""
+        self.breaks = 0
+        self._pending = []
+        self._break = False
+        self.opened.append(self)
+
+    @property
+    def break_condition(self):
+        return self._break
+
+    @break_condition.setter
+    def break_condition(self, value):
+        if value and not self._break:
+            self.breaks += 1
+            self._pending += self.replies[self.port]
+        self._break = value
+
+    def write(self, data):
+        self.written += data
+
+    def flush(self):
+        pass
+
+    def read(self, size):
+        return self._pending.pop(0) if self._pending else b""
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def ports(monkeypatch, tmp_path):
+    FakeSerial.replies = {}
+    FakeSerial.opened = []
+    monkeypatch.setattr(port_probe.serial, "Serial", FakeSerial)
+    monkeypatch.setattr(port_probe, "CACHE_PATH", str(tmp_path / "client.json"))
+    return FakeSerial.replies
+
+
+def test_ping_reply_identifies_the_board_without_writing(ports):
+    # In input or generation mode the board prints nothing; only the pong comes back
+    ports["/dev/board"] = [bytes([PONG, 1])]
+    r = port_probe.probe_port("/dev/board", deadline=port_probe.time.perf_counter() + 0.2)
+    assert r.identified and r.evidence == "ping reply"
+    (ser,) = FakeSerial.opened
+    assert ser.breaks == 1 and ser.written == b""
+    assert not ser.break_condition
+
+
+def test_pong_split_from_its_count(ports):
+    ports["/dev/board"] = [b"mode", bytes([PONG]), bytes([2])]
+    r = port_probe.probe_port("/dev/board", deadline=port_probe.time.perf_counter() + 0.2)
+    assert r.identified and r.evidence == "ping reply"
+
+
+def test_banner_identifies_the_board(ports):
+    ports["/dev/board"] = [b"mode-dis\n"]
+    r = port_probe.probe_port("/dev/board", deadline=port_probe.time.perf_counter() + 0.2)
+    assert r.identified and r.evidence == "mode-dis"
+
+
+def test_silent_port_is_not_picked(ports):
+    ports["/dev/silent"] = []
+    device, results = port_probe.find_board(timeout=0.1, use_cache=False, ports=["/dev/silent"],
+                                            use_daemon=False)
+    assert device is None
+    assert results[0].opened and not results[0].identified
+
+
+def test_board_found_among_other_ports(ports):
+    ports["/dev/silent"] = []
+    ports["/dev/gps"] = [b"GPS $GPGGA,123519\r\n"] * 5
+    ports["/dev/board"] = [bytes([PONG, 7])]
+    devices = ["/dev/silent", "/dev/gps", "/dev/missing", "/dev/board"]
+    device, results = port_probe.find_board(timeout=0.3, use_cache=False, ports=devices, use_daemon=False)
+    assert device == "/dev/board"
+    assert [r.identified for r in results] == [False, False, False, True]
+    assert results[2].error
+
+
+def test_cached_port_is_tried_alone_first(ports):
+    ports["/dev/silent"] = []
+    ports["/dev/board"] = [bytes([PONG, 1])]
+    port_probe.save_last_port("/dev/board")
+    device, results = port_probe.find_board(ports=["/dev/silent", "/dev/board"], use_daemon=False)
+    assert device == "/dev/board"
+    assert [r.device for r in results] == ["/dev/board"]
+    assert [s.port for s in FakeSerial.opened] == ["/dev/board"]
@@ -0,0 +1,104 @@
+import os
+import threading
+import tty
+
+import pytest
+import serial
+
+from modules.serial_manager import SerialManager
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+
+
+@pytest.fixture
+def port():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    yield master, os.ttyname(slave)
+    for fd in (master, slave):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def read_exactly(fd, size):
+    data = b""
+    while len(data) < size:
+        data += os.read(fd, size - len(data))
+    return data
+
+
+def connect(port, on_data_sent=None, on_status=None, **kwargs):
+    mgr = SerialManager(lambda line: None, on_status or (lambda connected, msg: None), on_data_sent, **kwargs)
+    assert mgr.connect(port, 115200)
+    return mgr
+
+
+def test_send_without_port_returns_false():
+    mgr = SerialManager(lambda line: None, lambda connected, msg: None)
+    assert mgr.send_bytes(b"\x01") is False
+
+
+def test_futures_resolve_once_written(port):
+    master, url = port
+    sent = []
+    mgr = connect(url, sent.append, coalesce_window=0.05)
+    try:
+        futures = [mgr.send_bytes(data) for data in (b"A", bytes([2, 2]), bytes([0xFF]))]
+        assert [f.result(2) for f in futures] == [1, 2, 1]
+        assert read_exactly(master, 4) == b"A\x02\x02\xff"
+        # Merged into one write, logged per send and unformatted
+        assert mgr.tx_stats() == {"sends": 3, "writes": 1}
+        assert sent == [b"A", bytes([2, 2]), bytes([0xFF])]
+    finally:
+        mgr.disconnect()
+
+
+def test_write_error_fails_the_batch(port, monkeypatch):
+    _, url = port
+    mgr = connect(url)
+    try:
+        def broken(data):
+            raise serial.SerialException("unplugged")
+
+        monkeypatch.setattr(mgr.ser, "write", broken)
+        fut = mgr.send_bytes(b"\x01")
+        with pytest.raises(serial.SerialException):
+            fut.result(2)
+    finally:
+        mgr.disconnect()
+
+
+def test_writer_failure_fails_pending_sends_and_disconnects(port):
+    _, url = port
+    statuses = []
+    failed = threading.Event()
+
+    def on_status(connected, msg):
+        statuses.append((connected, msg))
+        if not connected:
+            failed.set()
+
+    def on_data_sent(data):
+        raise RuntimeError("console gone")
+
+    mgr = connect(url, on_data_sent, on_status)
+    first = mgr.send_bytes(b"\x01")
+    assert first.result(2) == 1
+    assert failed.wait(2)
+    assert not mgr.is_connected
+    assert statuses[-1] == (False, "Write Error: console gone")
+    assert mgr.send_bytes(b"\x02") is False
+
+
+def test_disconnect_settles_every_send(port):
+    _, url = port
+    mgr = connect(url, coalesce_window=0.5)
+    # The writer is still in its coalescing window when the stop marker comes
+    futures = [mgr.send_bytes(bytes([i])) for i in range(5)]
+    mgr.disconnect()
+    for fut in futures:
+        assert fut.done()
+        if fut.exception() is not None:
+            assert isinstance(fut.exception(), serial.SerialException)
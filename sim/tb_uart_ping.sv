@@ -0,0 +1,313 @@
+/*=============================================================================
+#
+# Project Name   : CS207_Project_Matrix_Calculator
+# File Name      : tb_uart_ping.sv
+# Module Name    : tb_uart_ping
+# University     : SUSTech
+#
+# Create Date    : 2026-10-17
+#
+# Description    :
+#     Testbench for the UART link ping (a break on RX: uart_rx_break,
+#     uart_ping_responder). Drives system_core over its RX pin and decodes
+#     its TX pin:
+#       1. In IDLE, each ping is answered with PONG (0x06) + ping count and
+#          no byte reaches the functional modules.
+#       2. In display mode a ping sent while the stats table is printing
+#          comes back as one intact pair, and the table text around it is
+#          unchanged (no byte lost or corrupted).
+#       3. In input mode a ping between the dimensions and the element is
+#          answered and does not disturb the input; 0xFD is still data (the
+#          element -3).
+#       4. In gen mode a ping is answered likewise; 0xFD is still data (the
+#          count 253).
+#
+#=============================================================================*/
+`timescale 1ns / 1ps
+import project_pkg::*;
+
+module tb_uart_ping;
+
+    // --- Signals ---
+    logic clk;
+    logic rst_n;
+    logic uart_rx;
+    logic uart_tx;
+    logic [7:0] sw_mode_sel;
+    logic [7:0] sw_scalar_val;
+    logic btn_confirm;
+    logic btn_reset_logic;
+    logic [15:0] led_status;
+    logic [7:0] seg_an;
+    logic [7:0] seg_data_0;
+    logic [7:0] seg_data_1;
+
+    // --- DUT Instantiation ---
+    system_core u_dut (
+        .clk(clk),
+        .rst_n(rst_n),
+        .uart_rx(uart_rx),
+        .uart_tx(uart_tx),
+        .sw_mode_sel(sw_mode_sel),
+        .sw_scalar_val(sw_scalar_val),
+        .btn_confirm(btn_confirm),
+        .btn_reset_logic(btn_reset_logic),
+        .led_status(led_status),
+        .seg_an(seg_an),
+        .seg_data_0(seg_data_0),
+        .seg_data_1(seg_data_1)
+    );
+
+    // --- Clock Generation ---
+    initial begin
+        clk = 0;
+        forever #5 clk = ~clk; // 100MHz
+    end
+
+    localparam BIT_PERIOD = 8680; // 115200 baud, in ns
+    localparam logic [7:0] PONG = 8'h06;
+    localparam logic [7:0] FD = 8'hFD; // once the ping byte, now plain data
+
+    // --- UART Driver ---
+    task send_byte(input logic [7:0] data);
+        integer i;
+        begin
+            uart_rx = 0;
+            #(BIT_PERIOD);
+            for (i = 0; i < 8; i = i + 1) begin
+                uart_rx = data[i];
+                #(BIT_PERIOD);
+            end
+            uart_rx = 1;
+            #(BIT_PERIOD);
+            #(BIT_PERIOD * 2);
+        end
+    endtask
+
+    // --- Ping: a break, the line held low for longer than a frame ---
+    task send_break();
+        begin
+            uart_rx = 0;
+            #(BIT_PERIOD * 12);
+            uart_rx = 1;
+            #(BIT_PERIOD * 3);
+        end
+    endtask
+
+    // --- UART Monitor: every byte the DUT sends, in order ---
+    logic [7:0] tx_log [0:4095];
+    integer tx_count = 0;
+
+    initial begin : monitor
+        integer i;
+        logic [7:0] b;
+        forever begin
+            @(negedge uart_tx);
+            #(BIT_PERIOD / 2);
+            if (uart_tx == 0) begin
+                for (i = 0; i < 8; i = i + 1) begin
+                    #(BIT_PERIOD);
+                    b[i] = uart_tx;
+                end
+                #(BIT_PERIOD);
+                if (uart_tx !== 1) $display("ERROR: framing error on TX byte %0d", tx_count);
+                tx_log[tx_count]  = b;
+                tx_count = tx_count + 1;
+            end
+        end
+    end
+
+    integer errors = 0;
+
+    // Bytes passed on to the functional modules, and how many of them were 0xFD
+    integer rx_delivered = 0;
+    integer fd_delivered = 0;
+    always @(posedge clk) begin
+        if (u_dut.rx_valid) rx_delivered <= rx_delivered + 1;
+        if (u_dut.rx_valid && u_dut.rx_byte == FD) fd_delivered <= fd_delivered + 1;
+    end
+
+    // Splits tx_log[from:to) into PONG pairs and everything else
+    integer pongs;
+    logic [7:0] last_cnt;
+    logic [7:0] text_log [0:4095];
+    integer text_count;
+
+    task split_log(input integer from, input integer to);
+        integer i;
+        begin
+            pongs = 0;
+            text_count = 0;
+            i = from;
+            while (i < to) begin
+                if (tx_log[i] == PONG && i + 1 < to) begin
+                    last_cnt = tx_log[i + 1];
+                    pongs = pongs + 1;
+                    i = i + 2;
+                end else begin
+                    text_log[text_count] = tx_log[i];
+                    text_count = text_count + 1;
+                    i = i + 1;
+                end
+            end
+        end
+    endtask
+
+    task wait_tx_idle();
+        integer last;
+        begin
+            last = -1;
+            while (last != tx_count) begin
+                last = tx_count;
+                #(BIT_PERIOD * 20);
+            end
+        end
+    endtask
+
+    task press_confirm();
+        begin
+            btn_confirm = 1;
+            #200;
+            btn_confirm = 0;
+            #200;
+        end
+    endtask
+
+    // --- Test Procedure ---
+    integer mark, ref_start, ref_len, i;
+    logic [7:0] ref_text [0:4095];
+
+    initial begin
+        rst_n = 0;
+        uart_rx = 1;
+        sw_mode_sel = 0;
+        sw_scalar_val = 0;
+        btn_confirm = 0;
+        btn_reset_logic = 0;
+
+        #100 rst_n = 1;
+        #1000;
+        $display("--- Test Start: UART Link Ping ---");
+
+        // 1. Pings in IDLE
+        $display("Step 1: Ping x3 in IDLE");
+        mark = tx_count;
+        rx_delivered = 0;
+        send_break();
+        wait_tx_idle();
+        send_break();
+        wait_tx_idle();
+        send_break();
+        wait_tx_idle();
+        split_log(mark, tx_count);
+        if (pongs != 3 || text_count != 0 || last_cnt != 8'd3) begin
+            $display("ERROR: expected 3 pongs ending at count 3, got %0d pongs (last %0d), %0d other bytes",
+                     pongs, last_cnt, text_count);
+            errors = errors + 1;
+        end
+        if (rx_delivered != 0) begin
+            $display("ERROR: %0d byte(s) delivered for 3 breaks, expected none", rx_delivered);
+            errors = errors + 1;
+        end
+
+        // 2. Reference stats table: enter display mode without pinging
+        $display("Step 2: Display mode table, with and without a ping mid-stream");
+        sw_mode_sel[6] = 1; // STATE_DISPLAY
+        press_confirm();
+        wait_tx_idle();
+        ref_start = tx_count;
+        send_byte(8'd0);
+        send_byte(8'd0);
+        wait_tx_idle();
+        ref_len = tx_count - ref_start;
+        for (i = 0; i < ref_len; i = i + 1) ref_text[i] = tx_log[ref_start + i];
+
+        // Same request, with a ping landing while the table is printing
+        mark = tx_count;
+        send_byte(8'd0);
+        send_byte(8'd0);
+        #(BIT_PERIOD * 30);
+        send_break();
+        wait_tx_idle();
+        split_log(mark, tx_count);
+        if (pongs != 1 || last_cnt != 8'd4) begin
+            $display("ERROR: expected 1 pong with count 4, got %0d (last %0d)", pongs, last_cnt);
+            errors = errors + 1;
+        end
+        if (text_count != ref_len) begin
+            $display("ERROR: table is %0d bytes with a ping, %0d without", text_count, ref_len);
+            errors = errors + 1;
+        end else begin
+            for (i = 0; i < ref_len; i = i + 1) begin
+                if (text_log[i] != ref_text[i]) begin
+                    $display("ERROR: table byte %0d is %h, expected %h", i, text_log[i], ref_text[i]);
+                    errors = errors + 1;
+                end
+            end
+        end
+        btn_reset_logic = 1; // Esc back to IDLE
+        #200;
+        btn_reset_logic = 0;
+        sw_mode_sel[6] = 0;
+        wait_tx_idle();
+
+        // 3. Input mode: a ping in the middle of a matrix, 0xFD as its element
+        $display("Step 3: Ping in input mode, 0xFD is data");
+        sw_mode_sel[4] = 1; // STATE_INPUT
+        press_confirm();
+        sw_mode_sel[4] = 0;
+        wait_tx_idle();
+        mark = tx_count;
+        rx_delivered = 0;
+        fd_delivered = 0;
+        send_byte(8'd1); // 1 x 1 matrix
+        send_byte(8'd1);
+        send_break();
+        send_byte(FD); // its element, -3
+        wait_tx_idle();
+        split_log(mark, tx_count);
+        if (pongs != 1 || last_cnt != 8'd5) begin
+            $display("ERROR: input mode: expected 1 pong with count 5, got %0d (last %0d)", pongs, last_cnt);
+            errors = errors + 1;
+        end
+        if (rx_delivered != 3 || fd_delivered != 1) begin
+            $display("ERROR: input mode: %0d byte(s) delivered (%0d of them 0xFD), expected 3 (1)",
+                     rx_delivered, fd_delivered);
+            errors = errors + 1;
+        end
+        btn_reset_logic = 1; // Back to IDLE
+        #200;
+        btn_reset_logic = 0;
+        wait_tx_idle();
+
+        // 4. Gen mode: a ping before the count, 0xFD as the count 253
+        $display("Step 4: Ping in gen mode, 0xFD is data");
+        sw_mode_sel[5] = 1; // STATE_GEN
+        press_confirm();
+        sw_mode_sel[5] = 0;
+        wait_tx_idle();
+        mark = tx_count;
+        fd_delivered = 0;
+        send_byte(8'd1); // 1 x 1 matrices
+        send_byte(8'd1);
+        send_break();
+        #(BIT_PERIOD * 4); // the pong pair is on the line
+        send_byte(FD); // count 253
+        #(BIT_PERIOD * 10);
+        split_log(mark, tx_count);
+        if (pongs != 1 || last_cnt != 8'd6) begin
+            $display("ERROR: gen mode: expected 1 pong with count 6, got %0d (last %0d)", pongs, last_cnt);
+            errors = errors + 1;
+        end
+        if (fd_delivered != 1 || u_dut.u_gen.mat_cnt != 8'd253) begin
+            $display("ERROR: gen mode: 0xFD delivered %0d times, generator count %0d, expected 1 and 253",
+                     fd_delivered, u_dut.u_gen.mat_cnt);
+            errors = errors + 1;
+        end
+
+        if (errors == 0) $display("--- PASS: UART Link Ping ---");
+        else $display("--- FAIL: %0d error(s) ---", errors);
+        $finish;
+    end
+
+endmodule
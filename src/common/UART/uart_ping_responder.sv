@@ -0,0 +1,105 @@
+/*=============================================================================
+#
+# Project Name   : CS207_Project_Matrix_Calculator
+# File Name      : uart_ping_responder.sv
+# Module Name    : uart_ping_responder
+# University     : SUSTech
+#
+# Create Date    : 2026-10-17
+#
+# Description    :
+#     Sits between matrix_uart_sender and uart_tx. Every ping (a UART
+#     break on RX, flagged by uart_rx) is answered with two bytes:
+#     PONG (0x06) and an 8-bit count of pings received so far, wrapping at
+#     256. The host measures round-trip time from the pair and spots lost
+#     pings / corrupted bytes from gaps in the count.
+#
+#     Sender bytes have priority. A PONG pair is never split, and a sender
+#     byte arriving while it is on the line is held for one slot; the sender
+#     sees tx_busy until its byte has gone out, so it never needs to know.
+#     0x06 never occurs in the ASCII output, so the host strips the pairs
+#     from anywhere in the byte stream.
+#
+# Revision History:
+# -----------------------------------------------------------------------------
+# Ver   |   Date     |   Author       |   Description
+# -----------------------------------------------------------------------------
+# v1.0  | 2026-10-17 |  DraTelligence |   Initial creation
+# v1.1  | 2026-10-18 |  DraTelligence |   Ping is a break, not the 0xFD byte
+#
+#=============================================================================*/
+
+module uart_ping_responder (
+    input logic clk,
+    input logic rst_n,
+
+    input logic ping,  // 收到 PING 命令 (单周期脉冲)
+
+    // --- From matrix_uart_sender ---
+    input  logic [7:0] snd_tx_data,
+    input  logic       snd_tx_start,
+    output logic       snd_tx_busy,
+
+    // --- To uart_tx ---
+    output logic [7:0] tx_data,
+    output logic       tx_start,
+    input  logic       tx_busy
+);
+
+  localparam logic [7:0] PONG = 8'h06;
+
+  logic       ping_pending;  // 待回复
+  logic [7:0] ping_cnt;  // 收到的 PING 总数
+  logic       cnt_owed;  // PONG 已发出, 计数待发
+  logic       snd_pending;  // 发送器字节暂存
+  logic [7:0] snd_latched;
+
+  // uart_tx raises busy one cycle after tx_start
+  wire line_free = !tx_busy && !tx_start;
+
+  assign snd_tx_busy = tx_busy | tx_start | snd_pending | cnt_owed;
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) begin
+      ping_pending <= 1'b0;
+      ping_cnt     <= 8'd0;
+      cnt_owed     <= 1'b0;
+      snd_pending  <= 1'b0;
+      snd_latched  <= 8'd0;
+      tx_data      <= 8'd0;
+      tx_start     <= 1'b0;
+    end else begin
+      tx_start <= 1'b0;
+
+      if (ping) begin
+        ping_pending <= 1'b1;
+        ping_cnt     <= ping_cnt + 8'd1;
+      end
+
+      if (snd_tx_start) begin
+        snd_pending <= 1'b1;
+        snd_latched <= snd_tx_data;
+      end
+
+      if (line_free) begin
+        if (cnt_owed) begin
+          // Second half of a pair goes out before anything else
+          tx_data    <= ping_cnt;
+          tx_start   <= 1'b1;
+          cnt_owed   <= 1'b0;
+        end else if (snd_pending) begin
+          tx_data     <= snd_latched;
+          tx_start    <= 1'b1;
+          snd_pending <= 1'b0;
+        end else if (ping_pending && !snd_tx_start) begin
+          // Pings arriving faster than pairs drain share one reply
+          tx_data      <= PONG;
+          tx_start     <= 1'b1;
+          cnt_owed     <= 1'b1;
+          ping_pending <= ping;
+        end
+      end
+    end
+  end
+
+endmodule
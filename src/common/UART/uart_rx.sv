@@ -9,6 +9,9 @@
 #
 # Description    :
 #     Responsible for UART input (reception).
+#     A frame whose data bits and stop bit are all low is a break (the line
+#     held low for longer than a byte): it raises uart_rx_break instead of
+#     uart_rx_done, so no data byte is delivered for it.
 #
 # References     :
 #     Original code from Alientek (正点原子)
@@ -21,6 +24,7 @@
 # Ver   |   Date     |   Author       |   Description
 # -----------------------------------------------------------------------------
 # v1.0  | 2025-11-23 |   [Your Name]  |   Initial creation
+# v1.1  | 2026-10-18 |  DraTelligence |   Break detection (uart_rx_break)
 #
 #=============================================================================*/
 
@@ -30,7 +34,8 @@ module uart_rx (
 
     input            uart_rxd,      // UART receive port
     output reg       uart_rx_done,  // UART receive complete signal
-    output reg [7:0] uart_rx_data   // UART received data
+    output reg [7:0] uart_rx_data,  // UART received data
+    output reg       uart_rx_break  // Break received (single-cycle pulse)
 );
 
   //parameter define
@@ -119,16 +124,27 @@ module uart_rx (
   // Assign value to receive complete signal and received data
   always @(posedge clk or negedge rst_n) begin
     if (!rst_n) begin
-      uart_rx_done <= 1'b0;
-      uart_rx_data <= 8'b0;
+      uart_rx_done  <= 1'b0;
+      uart_rx_data  <= 8'b0;
+      uart_rx_break <= 1'b0;
     end
     // When receive data counter counts to stop bit, and baud_cnt counts to the middle of stop bit
     else if (rx_cnt == 4'd9 && baud_cnt == BAUD_CNT_MAX / 2 - 1'b1) begin
-      uart_rx_done <= 1'b1;  // Pull receive complete signal high
-      uart_rx_data <= rx_data_t;  // Assign received data
+      if (!uart_rxd_d2 && rx_data_t == 8'd0) begin
+        // Line low through the stop bit: a break, not a byte. rx_flag drops
+        // here and the next frame needs a falling edge, so a break of any
+        // length is reported once.
+        uart_rx_done  <= 1'b0;
+        uart_rx_break <= 1'b1;
+      end else begin
+        uart_rx_done  <= 1'b1;  // Pull receive complete signal high
+        uart_rx_data  <= rx_data_t;  // Assign received data
+        uart_rx_break <= 1'b0;
+      end
     end else begin
-      uart_rx_done <= 1'b0;
-      uart_rx_data <= uart_rx_data;
+      uart_rx_done  <= 1'b0;
+      uart_rx_data  <= uart_rx_data;
+      uart_rx_break <= 1'b0;
     end
   end
 
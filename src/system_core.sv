@@ -79,6 +79,13 @@ module system_core (
   logic rx_valid;
   logic [7:0] tx_byte;
   logic tx_start, tx_busy;
+  logic uart_tx_start, uart_tx_busy;
+  logic [7:0] uart_tx_byte;
+
+  // --- Link Ping: a UART break (链路探测, 回复 PONG + 计数) ---
+  // Out of band: uart_rx delivers no byte for a break, so every byte value
+  // stays data in every mode and a ping never reaches the functional modules
+  logic rx_ping;
   logic sender_done;
 
   // --- Storage Interconnect ---
@@ -258,16 +265,29 @@ module system_core (
       .rst_n(rst_n),
       .uart_rxd(uart_rx),
       .uart_rx_done(rx_valid),
-      .uart_rx_data(rx_byte)
+      .uart_rx_data(rx_byte),
+      .uart_rx_break(rx_ping)
+  );
+
+  uart_ping_responder u_ping (
+      .clk(clk),
+      .rst_n(rst_n),
+      .ping(rx_ping),
+      .snd_tx_data(tx_byte),
+      .snd_tx_start(tx_start),
+      .snd_tx_busy(tx_busy),
+      .tx_data(uart_tx_byte),
+      .tx_start(uart_tx_start),
+      .tx_busy(uart_tx_busy)
   );
 
   uart_tx u_uart_tx (
       .clk(clk),
       .rst_n(rst_n),
-      .uart_tx_en(tx_start),
-      .uart_tx_data(tx_byte),
+      .uart_tx_en(uart_tx_start),
+      .uart_tx_data(uart_tx_byte),
       .uart_txd(uart_tx),
-      .uart_tx_busy(tx_busy)
+      .uart_tx_busy(uart_tx_busy)
   );
 
   //==========================================================================